@@ -1,21 +1,28 @@
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import os
+import json
+import base64
 import bcrypt
 import jwt
 import datetime
 import psycopg2
-from db import get_db_connection
+from db import db_connection, get_pool
 from model import ml_service
 from dotenv import load_dotenv
 
 load_dotenv()
 
 app = Flask(__name__, static_folder='../frontend')
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor'])  # Paging cursor readable by cross-origin frontends
 
 JWT_SECRET = os.getenv('JWT_SECRET', 'secret')
 
+# The model artifact loads on first prediction. Fork-based servers (gunicorn --preload)
+# can set PRELOAD_MODEL=1 to load it once in the master and share it with every worker.
+if os.getenv('PRELOAD_MODEL') == '1':
+    ml_service.load()
+
 # --- Middleware Helper ---
 def token_required(f):
     def decorator(*args, **kwargs):
@@ -57,33 +64,28 @@ def signup():
     
     hashed_pw = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
     
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    try:
-        cur.execute(
-            "INSERT INTO users (email, password_hash, full_name) VALUES (%s, %s, %s) RETURNING id, email, full_name, created_at",
-            (email, hashed_pw, full_name)
-        )
-        user = cur.fetchone()
-        conn.commit()
+    with db_connection() as conn, conn.cursor() as cur:
+        try:
+            cur.execute(
+                "INSERT INTO users (email, password_hash, full_name) VALUES (%s, %s, %s) RETURNING id, email, full_name, created_at",
+                (email, hashed_pw, full_name)
+            )
+            user = cur.fetchone()
+            conn.commit()
         
-        token = jwt.encode({
-            'id': user['id'],
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
-        }, JWT_SECRET, algorithm="HS256")
+            token = jwt.encode({
+                'id': user['id'],
+                'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
+            }, JWT_SECRET, algorithm="HS256")
         
-        return jsonify({'token': token, 'user': user}), 201
-    except psycopg2.errors.UniqueViolation:
-        conn.rollback()
-        return jsonify({'message': 'Email already exists'}), 400
-    except Exception as e:
-        conn.rollback()
-        print(e)
-        return jsonify({'message': 'Server error'}), 500
-    finally:
-        cur.close()
-        conn.close()
+            return jsonify({'token': token, 'user': user}), 201
+        except psycopg2.errors.UniqueViolation:
+            conn.rollback()
+            return jsonify({'message': 'Email already exists'}), 400
+        except Exception as e:
+            conn.rollback()
+            print(e)
+            return jsonify({'message': 'Server error'}), 500
 
 @app.route('/api/auth/login', methods=['POST'])
 def login():
@@ -91,30 +93,25 @@ def login():
     email = data.get('email')
     password = data.get('password')
     
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    try:
-        cur.execute("SELECT * FROM users WHERE email = %s", (email,))
-        user = cur.fetchone()
+    with db_connection() as conn, conn.cursor() as cur:
+        try:
+            cur.execute("SELECT * FROM users WHERE email = %s", (email,))
+            user = cur.fetchone()
         
-        if user and bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
-            token = jwt.encode({
-                'id': user['id'],
-                'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
-            }, JWT_SECRET, algorithm="HS256")
+            if user and bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
+                token = jwt.encode({
+                    'id': user['id'],
+                    'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
+                }, JWT_SECRET, algorithm="HS256")
             
-            # Remove password hash from response
-            user_resp = {k: v for k, v in user.items() if k != 'password_hash'}
-            return jsonify({'token': token, 'user': user_resp}), 200
-        else:
-            return jsonify({'message': 'Invalid credentials'}), 401
-    except Exception as e:
-        print(e)
-        return jsonify({'message': 'Server error'}), 500
-    finally:
-        cur.close()
-        conn.close()
+                # Remove password hash from response
+                user_resp = {k: v for k, v in user.items() if k != 'password_hash'}
+                return jsonify({'token': token, 'user': user_resp}), 200
+            else:
+                return jsonify({'message': 'Invalid credentials'}), 401
+        except Exception as e:
+            print(e)
+            return jsonify({'message': 'Server error'}), 500
 
 @app.route('/api/auth/profile', methods=['PUT'])
 @token_required
@@ -122,41 +119,32 @@ def update_profile(current_user_id):
     data = request.json
     full_name = data.get('fullName')
     
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    try:
-        cur.execute(
-            "UPDATE users SET full_name = %s WHERE id = %s RETURNING id, email, full_name",
-            (full_name, current_user_id)
-        )
-        user = cur.fetchone()
-        conn.commit()
-        return jsonify(user)
-    except Exception as e:
-        conn.rollback()
-        print(e)
-        return jsonify({'message': 'Server error'}), 500
-    finally:
-        cur.close()
-        conn.close()
+    with db_connection() as conn, conn.cursor() as cur:
+        try:
+            cur.execute(
+                "UPDATE users SET full_name = %s WHERE id = %s RETURNING id, email, full_name",
+                (full_name, current_user_id)
+            )
+            user = cur.fetchone()
+            conn.commit()
+            return jsonify(user)
+        except Exception as e:
+            conn.rollback()
+            print(e)
+            return jsonify({'message': 'Server error'}), 500
 
 # --- Application Routes ---
 @app.route('/api/applications', methods=['GET'])
 @token_required
 def get_applications(current_user_id):
-    conn = get_db_connection()
-    cur = conn.cursor()
-    try:
-        cur.execute("SELECT * FROM applications WHERE user_id = %s ORDER BY created_at DESC", (current_user_id,))
-        apps = cur.fetchall()
-        return jsonify(apps)
-    except Exception as e:
-        print(e)
-        return jsonify({'message': 'Server error'}), 500
-    finally:
-        cur.close()
-        conn.close()
+    with db_connection() as conn, conn.cursor() as cur:
+        try:
+            cur.execute("SELECT * FROM applications WHERE user_id = %s ORDER BY created_at DESC", (current_user_id,))
+            apps = cur.fetchall()
+            return jsonify(apps)
+        except Exception as e:
+            print(e)
+            return jsonify({'message': 'Server error'}), 500
 
 @app.route('/api/applications', methods=['POST'])
 @token_required
@@ -219,51 +207,82 @@ def submit_application(current_user_id):
     app_data['insights'] = insights
     app_data['decision'] = decision
     
-    conn = get_db_connection()
-    cur = conn.cursor()
-    
-    try:
-        import json
+    with db_connection() as conn, conn.cursor() as cur:
+        try:
+            import json
         
-        cur.execute(
-            """INSERT INTO applications (user_id, business_name, amount, status, ai_score, data) 
-               VALUES (%s, %s, %s, %s, %s, %s) 
-               RETURNING *""",
-            (current_user_id, business_name, amount, status, score, json.dumps(app_data))
-        )
-        new_app = cur.fetchone()
-        conn.commit()
-        return jsonify(new_app), 201
-    except Exception as e:
-        conn.rollback()
-        print(e)
-        return jsonify({'message': 'Server error'}), 500
-    finally:
-        cur.close()
-        conn.close()
+            cur.execute(
+                """INSERT INTO applications (user_id, business_name, amount, status, ai_score, data) 
+                   VALUES (%s, %s, %s, %s, %s, %s) 
+                   RETURNING *""",
+                (current_user_id, business_name, amount, status, score, json.dumps(app_data))
+            )
+            new_app = cur.fetchone()
+            conn.commit()
+            return jsonify(new_app), 201
+        except Exception as e:
+            conn.rollback()
+            print(e)
+            return jsonify({'message': 'Server error'}), 500
 
 # --- Admin Routes ---
+# Largest page the admin listing returns
+ADMIN_PAGE_SIZE_MAX = 500
+
+def encode_cursor(row):
+    """Opaque keyset cursor pointing just past an applications row"""
+    raw = json.dumps([row['created_at'].isoformat(), str(row['id'])])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    created_at, app_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.datetime.fromisoformat(created_at), app_id
+
 @app.route('/api/admin/applications', methods=['GET'])
 # @token_required # In a real app, verify admin role. For demo, allowing access or basic auth.
 def get_all_applications():
-    # Allow querying all applications for the Underwriter Dashboard
-    conn = get_db_connection()
-    cur = conn.cursor()
+    # Allow querying all applications for the Underwriter Dashboard, newest first.
+    # Pages are keyed on (created_at, id): pass the X-Next-Cursor header back as ?cursor=
     try:
-        cur.execute("""
-            SELECT a.*, u.email, u.full_name 
-            FROM applications a
-            JOIN users u ON a.user_id = u.id
-            ORDER BY a.created_at DESC
-        """)
-        apps = cur.fetchall()
-        return jsonify(apps)
-    except Exception as e:
-        print(e)
-        return jsonify({'message': 'Server error'}), 500
-    finally:
-        cur.close()
-        conn.close()
+        limit = max(1, min(int(request.args.get('limit', 100)), ADMIN_PAGE_SIZE_MAX))
+        cursor = request.args.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+    except (ValueError, TypeError):
+        return jsonify({'message': 'Invalid limit or cursor'}), 400
+    status = request.args.get('status')
+    
+    filters, params = [], []
+    if status:
+        filters.append("a.status = %s")
+        params.append(status)
+    if after:
+        filters.append("(a.created_at, a.id) < (%s, %s)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    
+    with db_connection() as conn, conn.cursor() as cur:
+        try:
+            cur.execute(f"""
+                SELECT a.*, u.email, u.full_name 
+                FROM applications a
+                JOIN users u ON a.user_id = u.id
+                {where}
+                ORDER BY a.created_at DESC, a.id DESC
+                LIMIT %s
+            """, (*params, limit + 1))
+            apps = cur.fetchall()
+            response = jsonify(apps[:limit])
+            if len(apps) > limit:
+                response.headers['X-Next-Cursor'] = encode_cursor(apps[limit - 1])
+            return response
+        except Exception as e:
+            print(e)
+            return jsonify({'message': 'Server error'}), 500
+
+@app.route('/api/admin/db-pool', methods=['GET'])
+def get_db_pool_stats():
+    # Pool size and saturation counters (waits / timeouts mean DB_POOL_MAX is too small)
+    return jsonify(get_pool().stats())
 
 if __name__ == '__main__':
     # Running on port 5000 by default for Flask
@@ -2,31 +2,46 @@
 Application API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from sqlalchemy import insert, tuple_
 from sqlalchemy.orm import Session
-from typing import List
-from ..models.database import get_db
+from typing import List, Optional
+from ..models.database import get_db, SessionLocal
 from ..models.models import Application, ApplicationStatus
 from ..schemas.schemas import ApplicationCreate, ApplicationResponse
 from ..services.credit_service import credit_service
+from ..services.inference_executor import inference_executor, InferenceBusyError
+from ..services.id_allocator import applicant_ids
+from ..services.application_import import FORMATS, detect_format, iter_chunks
+from ..services.service_metrics import TimedRoute
 from datetime import datetime
+import asyncio
+import base64
+import json
 
-router = APIRouter(prefix="/api/applications", tags=["applications"])
+# id_blocks is created and seeded once when the app starts, not per reservation
+router = APIRouter(prefix="/api/applications", tags=["applications"], route_class=TimedRoute,
+                   on_startup=[applicant_ids.prepare])
 
-@router.post("/", response_model=ApplicationResponse, status_code=201)
-async def create_application(
-    application: ApplicationCreate,
-    db: Session = Depends(get_db)
-):
-    """Submit a new loan application"""
-    # Generate applicant ID
-    last_app = db.query(Application).order_by(Application.id.desc()).first()
-    next_id = (last_app.id + 1) if last_app else 1
-    applicant_id = f"APP{str(next_id).zfill(6)}"
-    
-    # Create application
-    db_application = Application(
-        applicant_id=applicant_id,
+# Largest payload accepted by the bulk endpoint
+MAX_BULK_APPLICATIONS = 10000
+# Rows per INSERT statement; keeps bound parameters under SQLite's 32766 limit
+BULK_INSERT_CHUNK = 1000
+# Rows validated, scored and committed together by the streaming import
+IMPORT_CHUNK_ROWS = 500
+# Largest page the listing endpoint returns
+MAX_PAGE_SIZE = 1000
+
+# DB-only routes are plain `def` so FastAPI runs them on its threadpool; the
+# evaluate route is async and offloads both Session work and inference explicitly.
+
+def _application_values(application: ApplicationCreate) -> dict:
+    """Column values for a new application row"""
+    return dict(
         business_type=application.business_type.value,
         years_in_operation=application.years_in_operation,
         annual_revenue=application.annual_revenue,
@@ -51,6 +66,19 @@ async def create_application(
         total_debt=application.total_debt,
         existing_emi=application.existing_emi
     )
+
+@router.post("/", response_model=ApplicationResponse, status_code=201)
+def create_application(
+    application: ApplicationCreate,
+    db: Session = Depends(get_db)
+):
+    """Submit a new loan application"""
+    # Applicant ID comes from this process's preallocated block, so the
+    # INSERT below is the only statement on the request path
+    applicant_id = applicant_ids.allocate()[0]
+    
+    # Create application
+    db_application = Application(applicant_id=applicant_id, **_application_values(application))
     
     db.add(db_application)
     db.commit()
@@ -58,24 +86,223 @@ async def create_application(
     
     return db_application
 
+@router.post("/bulk", status_code=201)
+def create_applications_bulk(
+    applications: List[ApplicationCreate],
+    db: Session = Depends(get_db)
+):
+    """
+    Ingest many applications in one transaction.
+    Rows go in as multi-row INSERTs; either all of them are stored or none.
+    """
+    if len(applications) > MAX_BULK_APPLICATIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_APPLICATIONS} applications per request")
+    if not applications:
+        return {"created": 0, "applicant_ids": []}
+    
+    try:
+        ids = _insert_applications(db, applications)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Bulk insert failed: {str(e)}")
+    
+    return {"created": len(ids), "applicant_ids": ids}
+
+def _insert_applications(db: Session, applications: List[ApplicationCreate], evaluations: Optional[List[dict]] = None):
+    """
+    Multi-row INSERT of new applications (and their evaluations, if given) without committing.
+    Returns the minted applicant IDs in input order.
+    """
+    ids = applicant_ids.allocate(len(applications))
+    now = datetime.utcnow()
+    rows = [
+        {**_application_values(application), "applicant_id": applicant_id, "created_at": now, "updated_at": now}
+        for application, applicant_id in zip(applications, ids)
+    ]
+    if evaluations is not None:
+        for row in rows:
+            row["status"] = ApplicationStatus.EVALUATED
+    
+    row_ids = {}
+    for start in range(0, len(rows), BULK_INSERT_CHUNK):
+        statement = insert(Application).values(rows[start:start + BULK_INSERT_CHUNK])
+        if evaluations is None:
+            db.execute(statement)
+        else:
+            row_ids.update(db.execute(statement.returning(Application.applicant_id, Application.id)).all())
+    
+    if evaluations is not None:
+        # Import here to avoid circular import
+        from ..models.models import Evaluation
+        
+        evaluation_rows = [{
+            "application_id": row_ids[applicant_id],
+            "risk_score": result['risk_score'],
+            "default_probability": result['default_probability'],
+            "recommendation": result['recommendation'],
+            "confidence_score": result['confidence_score'],
+            "model_version": result['model_version'],
+            "feature_importance": result['feature_importance'],
+            "evaluated_at": now
+        } for applicant_id, result in zip(ids, evaluations)]
+        for start in range(0, len(evaluation_rows), BULK_INSERT_CHUNK):
+            db.execute(insert(Evaluation).values(evaluation_rows[start:start + BULK_INSERT_CHUNK]))
+    
+    return ids
+
+def _validate_chunk(batch):
+    """Split parsed (row number, record) pairs into valid applications and per-row error lines"""
+    valid, errors = [], []
+    for row_number, record in batch:
+        if isinstance(record, Exception):
+            errors.append({"row": row_number, "errors": [{"msg": str(record)}]})
+            continue
+        try:
+            valid.append((row_number, ApplicationCreate.model_validate(record)))
+        except ValidationError as e:
+            errors.append({"row": row_number, "errors": e.errors(include_url=False, include_context=False)})
+    return valid, errors
+
+async def _score_for_import(applications: List[ApplicationCreate]) -> List[dict]:
+    """Score a chunk on the inference pool, waiting for capacity instead of failing the import"""
+    while True:
+        try:
+            return await inference_executor.run(credit_service.evaluate_batch, [a.model_dump() for a in applications])
+        except InferenceBusyError:
+            await asyncio.sleep(0.05)
+
+def _store_import_chunk(db: Session, applications: List[ApplicationCreate], evaluations: Optional[List[dict]]):
+    try:
+        ids = _insert_applications(db, applications, evaluations)
+        db.commit()
+        return ids
+    except Exception:
+        db.rollback()
+        raise
+
+class _ImportReportResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator consumes the request body itself.
+    The stock class listens for disconnects on `receive` while streaming on older ASGI
+    servers, which would swallow the upload chunks; a disconnect here surfaces from
+    request.stream() as ClientDisconnect instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+def _report_line(payload: dict) -> str:
+    return json.dumps(payload, default=str) + "\n"
+
+@router.post("/import")
+async def import_applications(
+    request: Request,
+    format: Optional[str] = None,
+    score: bool = False
+):
+    """
+    Stream a CSV (header row, columns named like ApplicationCreate) or NDJSON file as the raw
+    request body. Rows are parsed, validated and inserted IMPORT_CHUNK_ROWS at a time, each
+    chunk in its own transaction, and optionally scored in the same pass. The response is an
+    NDJSON report: one line per rejected row, one per committed chunk, then a summary.
+    Partner applicant IDs are ignored; every stored row gets a fresh APP ID.
+    """
+    fmt = (format or detect_format(request.headers.get("content-type"))).lower()
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}', expected one of {FORMATS}")
+    
+    async def report():
+        db = SessionLocal()
+        summary = {"rows": 0, "inserted": 0, "rejected": 0, "scored": 0}
+        try:
+            chunk_number = 0
+            async for batch in iter_chunks(request.stream(), fmt, IMPORT_CHUNK_ROWS):
+                chunk_number += 1
+                valid, errors = _validate_chunk(batch)
+                summary["rows"] += len(batch)
+                summary["rejected"] += len(errors)
+                for error in errors:
+                    yield _report_line(error)
+                if not valid:
+                    continue
+                
+                applications = [application for _, application in valid]
+                evaluations = await _score_for_import(applications) if score else None
+                ids = await run_in_threadpool(_store_import_chunk, db, applications, evaluations)
+                
+                summary["inserted"] += len(ids)
+                summary["scored"] += len(evaluations) if evaluations else 0
+                yield _report_line({
+                    "chunk": chunk_number,
+                    "first_row": valid[0][0],
+                    "last_row": valid[-1][0],
+                    "inserted": len(ids),
+                    "first_applicant_id": ids[0],
+                    "last_applicant_id": ids[-1]
+                })
+            yield _report_line({"summary": summary})
+        except ClientDisconnect:
+            return
+        except Exception as e:
+            # Chunks reported above are already committed
+            yield _report_line({"error": f"Import aborted: {str(e)}", "summary": summary})
+        finally:
+            db.close()
+    
+    return _ImportReportResponse(report(), media_type="application/x-ndjson")
+
+def _encode_cursor(application: Application) -> str:
+    """Opaque keyset cursor pointing just past `application`"""
+    raw = json.dumps([application.created_at.isoformat(), application.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, application_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(application_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/", response_model=List[ApplicationResponse])
-async def get_applications(
+def get_applications(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     status: str = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all applications with optional filtering"""
-    query = db.query(Application)
+    """
+    Get applications newest first, with optional filtering.
+    When more rows exist the X-Next-Cursor header holds the `cursor` for the next page;
+    cursor pages cost the same at any depth, while `skip` still scans every skipped row.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = db.query(Application).order_by(Application.created_at.desc(), Application.id.desc())
     
     if status:
         query = query.filter(Application.status == status)
     
-    applications = query.offset(skip).limit(limit).all()
+    if cursor:
+        created_at, application_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(Application.created_at, Application.id) < tuple_(created_at, application_id))
+    elif skip:
+        query = query.offset(skip)
+    
+    applications = query.limit(limit + 1).all()
+    if len(applications) > limit:
+        applications = applications[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(applications[-1])
     return applications
 
 @router.get("/{application_id}", response_model=ApplicationResponse)
-async def get_application(
+def get_application(
     application_id: int,
     db: Session = Depends(get_db)
 ):
@@ -87,13 +314,8 @@ async def get_application(
     
     return application
 
-@router.post("/{application_id}/evaluate")
-async def evaluate_application(
-    application_id: int,
-    db: Session = Depends(get_db)
-):
-    """Trigger credit evaluation for an application"""
-    # Get application
+def _load_application_data(db: Session, application_id: int):
+    """Fetch an application and the fields the credit service needs"""
     application = db.query(Application).filter(Application.id == application_id).first()
     
     if not application:
@@ -115,13 +337,10 @@ async def evaluate_application(
         'collateral_value': application.collateral_value,
         'repayment_history': application.repayment_history
     }
-    
-    # Evaluate using credit service
-    try:
-        evaluation_result = credit_service.evaluate_application(application_data)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
-    
+    return application, application_data
+
+def _save_evaluation(db: Session, application: Application, evaluation_result: dict):
+    """Persist the evaluation and mark the application evaluated"""
     # Import here to avoid circular import
     from ..models.models import Evaluation
     
@@ -143,6 +362,26 @@ async def evaluate_application(
     db.add(db_evaluation)
     db.commit()
     db.refresh(db_evaluation)
+    return db_evaluation
+
+@router.post("/{application_id}/evaluate")
+async def evaluate_application(
+    application_id: int,
+    db: Session = Depends(get_db)
+):
+    """Trigger credit evaluation for an application"""
+    # Get application
+    application, application_data = await run_in_threadpool(_load_application_data, db, application_id)
+    
+    # Evaluate using credit service
+    try:
+        evaluation_result = await inference_executor.run(credit_service.evaluate_application, application_data)
+    except InferenceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
+    
+    db_evaluation = await run_in_threadpool(_save_evaluation, db, application, evaluation_result)
     
     return {
         "message": "Evaluation completed successfully",
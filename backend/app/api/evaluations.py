@@ -7,12 +7,16 @@ from sqlalchemy.orm import Session
 from ..models.database import get_db
 from ..models.models import Evaluation, Application
 from ..schemas.schemas import EvaluationResponse, DetailedEvaluationResponse, PredictionExplanation
+from ..services.service_metrics import TimedRoute
 import json
 
-router = APIRouter(prefix="/api/evaluations", tags=["evaluations"])
+router = APIRouter(prefix="/api/evaluations", tags=["evaluations"], route_class=TimedRoute)
+
+# Routes are plain `def`: FastAPI runs them on its threadpool, so blocking
+# Session queries never stall the event loop.
 
 @router.get("/{evaluation_id}", response_model=EvaluationResponse)
-async def get_evaluation(
+def get_evaluation(
     evaluation_id: int,
     db: Session = Depends(get_db)
 ):
@@ -25,7 +29,7 @@ async def get_evaluation(
     return evaluation
 
 @router.get("/{evaluation_id}/detailed", response_model=DetailedEvaluationResponse)
-async def get_detailed_evaluation(
+def get_detailed_evaluation(
     evaluation_id: int,
     db: Session = Depends(get_db)
 ):
@@ -51,7 +55,7 @@ async def get_detailed_evaluation(
     )
 
 @router.get("/application/{application_id}", response_model=EvaluationResponse)
-async def get_evaluation_by_application(
+def get_evaluation_by_application(
     application_id: int,
     db: Session = Depends(get_db)
 ):
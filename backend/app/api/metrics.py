@@ -1,22 +1,72 @@
 import json
-import os
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Response
+from ..services.credit_service import credit_service
+from ..services.inference_executor import inference_executor
+from ..services.metrics_cache import metrics_file, etag_matches
+from ..services.prediction_batcher import prediction_batcher
+from ..services.service_metrics import service_metrics, TimedRoute
 
-router = APIRouter(prefix="/api/metrics", tags=["metrics"])
-
-METRICS_PATH = "backend/ml_pipeline/metrics.json"
+router = APIRouter(prefix="/api/metrics", tags=["metrics"], route_class=TimedRoute)
 
 @router.get("/")
-async def get_model_metrics():
+async def get_model_metrics(live: bool = False, if_none_match: Optional[str] = Header(None)):
     """
     Serve the model training metrics and fairness analysis.
+    Answers 304 when If-None-Match carries the current ETag. With ?live=true the
+    live service counters are added under "service" (never cached).
     """
-    if not os.path.exists(METRICS_PATH):
+    try:
+        body, etag = metrics_file.get()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Metrics file not found. Please train the model first.")
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if live:
+        # Spliced into the cached bytes rather than re-serialising the training metrics
+        service = json.dumps(_service_counters(), separators=(",", ":")).encode()
+        separator = b"," if body != b"{}" else b""
+        return Response(content=body[:-1] + separator + b'"service":' + service + b"}",
+                        media_type="application/json", headers={"Cache-Control": "no-store"})
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        metrics_file.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/explanations")
+async def get_global_explanations():
+    """
+    Global feature importance (mean |SHAP|) of the served model.
+    """
+    bundle = credit_service.explanation_bundle
+    if bundle is None:
+        raise HTTPException(status_code=404, detail="No explanation bundle for the current model. Run model_explainability.py.")
     
-    try:
-        with open(METRICS_PATH, "r") as f:
-            metrics = json.load(f)
-        return metrics
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading metrics: {str(e)}")
+    return {
+        "model_sha256": bundle.model_sha256,
+        "expected_value": bundle.expected_value,
+        "background_rows": bundle.manifest["background_rows"],
+        "features": bundle.global_importance()
+    }
+
+@router.get("/service")
+async def get_service_metrics():
+    """
+    Live counters of the running scoring service.
+    """
+    return _service_counters()
+
+def _service_counters() -> dict:
+    return {
+        **service_metrics.stats(),
+        "metrics_file": metrics_file.stats(),
+        "inference_executor": inference_executor.stats(),
+        "prediction_batcher": prediction_batcher.stats(),
+        "prediction_cache": credit_service.prediction_cache.stats(),
+        "model_registry": credit_service.registry_stats(),
+        "shadow_scoring": credit_service.shadow.stats()
+    }
@@ -1,9 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException
+from typing import List
 from ..services.credit_service import credit_service
+from ..services.inference_executor import inference_executor, InferenceBusyError
+from ..services.prediction_batcher import prediction_batcher
+from ..services.service_metrics import TimedRoute
 from ..schemas.schemas import ApplicationCreate, EvaluationResponse
 import datetime
 
-router = APIRouter(prefix="/api/predict", tags=["predict"])
+router = APIRouter(prefix="/api/predict", tags=["predict"], route_class=TimedRoute)
+
+def _transient_response(result, evaluated_at):
+    """Shape a service result as an unsaved EvaluationResponse"""
+    return {
+        "id": 0, # Dummy ID
+        "application_id": 0,
+        "risk_score": result['risk_score'],
+        "default_probability": result['default_probability'],
+        "recommendation": result['recommendation'],
+        "confidence_score": result['confidence_score'],
+        "model_version": result['model_version'],
+        "evaluated_at": evaluated_at
+    }
 
 @router.post("/", response_model=EvaluationResponse)
 async def predict_risk(application: ApplicationCreate):
@@ -14,20 +31,31 @@ async def predict_risk(application: ApplicationCreate):
     try:
         # Convert Pydantic model to dict
         app_data = application.model_dump()
-        
-        # Evaluate
-        result = credit_service.evaluate_application(app_data)
-        
+
+        # Evaluate off the event loop, coalesced with concurrent what-if requests
+        result = await prediction_batcher.submit(app_data)
+
         # Return transient response
-        return {
-            "id": 0, # Dummy ID
-            "application_id": 0,
-            "risk_score": result['risk_score'],
-            "default_probability": result['default_probability'],
-            "recommendation": result['recommendation'],
-            "confidence_score": result['confidence_score'],
-            "model_version": result['model_version'],
-            "evaluated_at": datetime.datetime.now()
-        }
+        return _transient_response(result, datetime.datetime.now())
+    except InferenceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/batch", response_model=List[EvaluationResponse])
+async def predict_risk_batch(applications: List[ApplicationCreate]):
+    """
+    Score many applications in one model call without saving them.
+    Used for bulk re-scoring; results are returned in request order.
+    """
+    try:
+        results = await inference_executor.run(
+            credit_service.evaluate_batch, [a.model_dump() for a in applications]
+        )
+
+        evaluated_at = datetime.datetime.now()
+        return [_transient_response(result, evaluated_at) for result in results]
+    except InferenceBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -2,7 +2,7 @@
 Database ORM Models
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -58,6 +58,12 @@ class Application(Base):
     
     # Relationship
     evaluation = relationship("Evaluation", back_populates="application", uselist=False)
+    
+    # Keyset pagination: newest first by (created_at, id), optionally within a status
+    __table_args__ = (
+        Index("ix_applications_created_at_id", "created_at", "id"),
+        Index("ix_applications_status_created_at_id", "status", "created_at", "id"),
+    )
 
 class Evaluation(Base):
     __tablename__ = "evaluations"
@@ -80,3 +86,10 @@ class Evaluation(Base):
     
     # Relationship
     application = relationship("Application", back_populates="evaluation")
+
+class IdBlock(Base):
+    """High-water mark for IDs handed out in blocks (see services/id_allocator.py)"""
+    __tablename__ = "id_blocks"
+    
+    name = Column(String, primary_key=True)
+    next_value = Column(Integer, nullable=False)
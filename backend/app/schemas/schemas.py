@@ -4,7 +4,7 @@ Pydantic schemas for request/response validation
 
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, Union
 from enum import Enum
 
 class BusinessType(str, Enum):
@@ -105,7 +105,9 @@ class EvaluationResponse(BaseModel):
 class PredictionExplanation(BaseModel):
     feature: str
     importance: float
-    value: float
+    value: Union[float, str]
+    contribution: Optional[float] = None  # Signed log-odds effect on default risk
+    reason: Optional[str] = None
 
 class DetailedEvaluationResponse(BaseModel):
     evaluation: EvaluationResponse
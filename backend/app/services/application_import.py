@@ -0,0 +1,94 @@
+"""
+Incremental CSV / NDJSON parsing for application imports
+"""
+
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Tuple, Union
+
+FORMATS = ("csv", "ndjson")
+
+class RecordError(Exception):
+    """A line that could not be parsed into a record"""
+
+def detect_format(content_type: str) -> str:
+    """Import format implied by a Content-Type header (CSV unless it says JSON)"""
+    content_type = (content_type or "").lower()
+    return "ndjson" if "json" in content_type else "csv"
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream as UTF-8 (BOM tolerated) and yield complete lines, one buffer at a time"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.rstrip("\r"):
+        yield pending.rstrip("\r")
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Union[Dict, RecordError]]]:
+    """
+    Yield (row number, record) per CSV data row, keyed by the header line.
+    A quoted field may span lines: a record is only parsed once its quotes balance.
+    Empty cells are dropped so schema defaults apply.
+    """
+    header = None
+    buffered: List[str] = []
+    row_number = 0
+    async for line in lines:
+        buffered.append(line)
+        if sum(part.count('"') for part in buffered) % 2:
+            continue  # Inside a quoted field
+        text, buffered = "\n".join(buffered), []
+        if not text.strip():
+            continue
+        try:
+            fields = next(csv.reader([text]))
+        except csv.Error as e:
+            row_number += 1
+            yield row_number, RecordError(str(e))
+            continue
+        if header is None:
+            header = [name.strip() for name in fields]
+            continue
+        row_number += 1
+        if len(fields) > len(header):
+            yield row_number, RecordError(f"Expected {len(header)} fields, got {len(fields)}")
+            continue
+        yield row_number, {name: value for name, value in zip(header, fields) if value != ""}
+    if buffered:
+        yield row_number + 1, RecordError("Unterminated quoted field at end of file")
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Union[Dict, RecordError]]]:
+    """Yield (row number, record) per non-blank NDJSON line"""
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, RecordError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield row_number, RecordError("Expected a JSON object")
+            continue
+        yield row_number, record
+
+async def iter_chunks(chunks: AsyncIterator[bytes], fmt: str, size: int):
+    """Group parsed (row number, record) pairs into lists of at most `size`"""
+    lines = iter_lines(chunks)
+    records = iter_csv_records(lines) if fmt == "csv" else iter_ndjson_records(lines)
+    batch = []
+    async for item in records:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -6,93 +6,311 @@ import joblib
 import pandas as pd
 import numpy as np
 import json
-from typing import Dict, List, Tuple
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import os
+from .prediction_cache import PredictionCache, row_keys
+from .tree_explainer import TreeShapExplainer, probe_frame
+from .explanation_bundle import load_bundle
+from .model_registry import ModelRegistry, EXPLANATIONS_DIR, MODELS_DIR
+from .service_metrics import service_metrics
+from .shadow_scoring import ShadowScorer
+from .tree_engine import CompactCalibratedPipeline
+
+# Recommendation cut-offs on probability of default
+APPROVE_BELOW_PD = 0.25
+REJECT_ABOVE_PD = 0.60
+
+# Loaded model versions kept in memory (the active one plus recent/shadow versions)
+MAX_LOADED_VERSIONS = 3
+
+# Largest frame scored by the compact tree engine; bigger batches go to the native model,
+# whose C++ traversal overtakes numpy's gathers at roughly 1-2k rows
+COMPACT_ENGINE_MAX_ROWS = int(os.getenv("COMPACT_ENGINE_MAX_ROWS", 512))
+
+# Scored through a freshly loaded model before it is swapped in
+WARMUP_APPLICATION = {
+    "business_type": "Manufacturing", "years_in_operation": 10, "annual_revenue": 5000000,
+    "loan_amount_requested": 2000000, "credit_score": 720, "collateral_value": 3000000,
+    "loan_tenure_months": 36
+}
+
+class ModelArtifacts:
+    """One loaded model version: the model plus everything scored or explained alongside it"""
+
+    def __init__(self, model, preprocessor, feature_names, explainer, explanation_bundle,
+                 model_version: str, artifact_id: str, scorer=None):
+        self.model = model
+        self.scorer = scorer  # Same predict_proba as `model`, via tree_engine; None if unsupported
+        self.preprocessor = preprocessor
+        self.feature_names = feature_names
+        self.explainer = explainer
+        self.explanation_bundle = explanation_bundle
+        self.model_version = model_version
+        self.artifact_id = artifact_id
+
+    @classmethod
+    def load(cls, directory: str, version: Optional[str] = None) -> "ModelArtifacts":
+        """
+        Artifacts of registry `version` stored in `directory`, or of the legacy models
+        directory when version is None.
+        """
+        model_path = f'{directory}/model_xgb.joblib'
+        model = joblib.load(model_path)
+        if version is None:
+            # Global SHAP summary written by ml_pipeline/scripts/model_explainability.py
+            bundle_dir, model_version = f'{directory}/explanations/model_xgb', 'v2-xgboost-calibrated'
+            artifact_id = cls._artifact_fingerprint(model_path)
+        else:
+            bundle_dir, model_version, artifact_id = f'{directory}/{EXPLANATIONS_DIR}', version, version
+        return cls(
+            model=model,
+            preprocessor=joblib.load(f'{directory}/preprocessor.joblib'),
+            feature_names=joblib.load(f'{directory}/feature_names.joblib'),
+            explainer=cls._load_explainer(model),
+            scorer=cls._load_scorer(model),
+            explanation_bundle=load_bundle(bundle_dir, model_path),
+            model_version=model_version,
+            artifact_id=artifact_id,
+        )
+
+    @staticmethod
+    def _load_explainer(model):
+        """Native TreeSHAP over the model's XGBoost boosters, or None to keep heuristic explanations"""
+        try:
+            return TreeShapExplainer.from_model(model)
+        except Exception as e:
+            print(f"⚠️ Warning: TreeSHAP unavailable, using heuristic explanations: {e}")
+            return None
+
+    @staticmethod
+    def _load_scorer(model):
+        """
+        Compact tree-engine copy of the model, or None to score through the model itself.
+        The copy is only used if it reproduces model.predict_proba exactly on a probe frame.
+        """
+        if COMPACT_ENGINE_MAX_ROWS <= 0:
+            return None
+        try:
+            scorer = CompactCalibratedPipeline.from_model(model)
+            probe = probe_frame(model.calibrated_classifiers_[0].estimator.steps[0][1])
+            if not np.array_equal(scorer.predict_proba(probe), model.predict_proba(probe)):
+                raise ValueError("probabilities differ from the native model on the probe frame")
+            return scorer
+        except Exception as e:
+            print(f"⚠️ Warning: Compact tree engine unavailable, scoring with the native model: {e}")
+            return None
+
+    def predict_proba(self, df: pd.DataFrame) -> np.ndarray:
+        if self.scorer is not None and len(df) <= COMPACT_ENGINE_MAX_ROWS:
+            return self.scorer.predict_proba(df)
+        return self.model.predict_proba(df)
+
+    @staticmethod
+    def _artifact_fingerprint(path: str) -> str:
+        """Cheap identity of a model file: changes whenever the file is replaced"""
+        st = os.stat(path)
+        return hashlib.sha1(f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:12]
 
 class CreditEvaluationService:
-    def __init__(self):
-        self.model = None
-        self.preprocessor = None
-        self.explainer = None
-        self.feature_names = None
+    def __init__(self, registry: Optional[ModelRegistry] = None, reload_interval: Optional[float] = None):
+        # Every request scores against one snapshot of `active`; a reload swaps the reference
+        self.active: Optional[ModelArtifacts] = None
+        self.registry = registry or ModelRegistry.from_env()
+        self.prediction_cache = PredictionCache.from_env()
+        self._versions = OrderedDict()
+        self._versions_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._reloads = 0
+        self._failed_reloads = 0
         self.load_model_artifacts()
+        # Challenger models scoring the same frames off the response path (SHADOW_MODELS)
+        self.shadow = ShadowScorer.from_env(self)
+        if reload_interval is None:
+            reload_interval = float(os.getenv("MODEL_RELOAD_INTERVAL_SECONDS", 10))
+        if reload_interval > 0:
+            threading.Thread(target=self._watch, args=(reload_interval,), name="model-reload", daemon=True).start()
+
+    # Read-only views of the active artifacts
+    @property
+    def model(self):
+        return self.active.model if self.active else None
+
+    @property
+    def preprocessor(self):
+        return self.active.preprocessor if self.active else None
+
+    @property
+    def feature_names(self):
+        return self.active.feature_names if self.active else None
+
+    @property
+    def explainer(self):
+        return self.active.explainer if self.active else None
+
+    @property
+    def explanation_bundle(self):
+        return self.active.explanation_bundle if self.active else None
+
+    @property
+    def model_version(self) -> str:
+        return self.active.model_version if self.active else 'fallback-heuristic'
+
+    @property
+    def artifact_id(self) -> Optional[str]:
+        return self.active.artifact_id if self.active else None
     
     def load_model_artifacts(self):
-        """Load trained model and preprocessing artifacts"""
-        models_dir = 'backend/ml_pipeline/models'
-        
+        """Load the registry's active version, or the legacy models directory if none is active"""
+        version = self.registry.active_version()
         try:
-            self.model = joblib.load(f'{models_dir}/model_xgb.joblib')
-            self.preprocessor = joblib.load(f'{models_dir}/preprocessor.joblib')
-            # For explanation, we might use a simple feature contribution approach if SHAP is too heavy for API
-            # Ideally load explainer here
-            self.feature_names = joblib.load(f'{models_dir}/feature_names.joblib')
-            print(f"✅ AI Model loaded: calibrated XGBoost")
+            if version is not None:
+                self.active = self.load_version(version)
+                print(f"✅ AI Model loaded: registry version {version}")
+            else:
+                self.active = ModelArtifacts.load(MODELS_DIR)
+                print(f"✅ AI Model loaded: calibrated XGBoost")
         except Exception as e:
             print(f"⚠️ Warning: Could not load model artifacts: {e}")
             print("   Using fallback heuristic mode (NOT RECOMMENDED)")
+        # Results scored by the previous artifacts must not be served again
+        self.prediction_cache.clear()
+
+    def load_version(self, version: str) -> ModelArtifacts:
+        """Artifacts of any published version (loaded once, kept for reuse, e.g. shadow scoring)"""
+        with self._versions_lock:
+            if version in self._versions:
+                self._versions.move_to_end(version)
+                return self._versions[version]
+        artifacts = ModelArtifacts.load(self.registry.version_dir(version), version)
+        with self._versions_lock:
+            artifacts = self._versions.setdefault(version, artifacts)
+            self._versions.move_to_end(version)
+            active = self.active.model_version if self.active else None
+            for stale in [v for v in self._versions if v not in (version, active)][:max(0, len(self._versions) - MAX_LOADED_VERSIONS)]:
+                del self._versions[stale]
+        return artifacts
+
+    def reload(self, version: Optional[str] = None) -> bool:
+        """
+        Switch to `version` (default: the registry's active version) without pausing traffic.
+        The new model is loaded and warmed up by a prediction while the current one keeps
+        serving; only then is the reference swapped. Returns whether the model changed.
+        """
+        with self._reload_lock:
+            version = version or self.registry.active_version()
+            if version is None or (self.active is not None and self.active.artifact_id == version):
+                return False
+            try:
+                artifacts = self.load_version(version)
+                start = time.perf_counter()
+                self._score_frame(self.preprocess_batch([WARMUP_APPLICATION]), artifacts, raise_errors=True, shadow=False)
+                warmup_ms = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                self._failed_reloads += 1
+                print(f"⚠️ Warning: Model version {version} failed to load, keeping {self.model_version}: {e}")
+                return False
+            self.active = artifacts
+            self._reloads += 1
+            self.prediction_cache.clear()
+            print(f"♻️ Model version {version} active (warm-up {warmup_ms:.1f} ms)")
+            return True
+
+    def _watch(self, interval: float):
+        """Poll the registry's ACTIVE pointer and hot-reload when it moves"""
+        while True:
+            time.sleep(interval)
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"⚠️ Warning: Model reload check failed: {e}")
+
+    def registry_stats(self) -> dict:
+        with self._versions_lock:
+            loaded = list(self._versions)
+        return {
+            "active_version": self.model_version,
+            "registry_active_version": self.registry.active_version(),
+            "loaded_versions": loaded,
+            "reloads": self._reloads,
+            "failed_reloads": self._failed_reloads,
+        }
     
     def preprocess_application(self, app_data: Dict) -> pd.DataFrame:
         """
         Preprocess application data for model prediction.
         Handles missing fields by applying smart defaults or derived logic.
         """
+        return self.preprocess_batch([app_data])
+
+    def preprocess_batch(self, applications: List[Dict]) -> pd.DataFrame:
+        """
+        Preprocess a list of applications into one columnar frame.
+        Same defaults and derived fields as the single-record path, computed per column.
+        """
         # 1. Map Frontend fields to Model fields
         # Model expects: years_in_operation, promoter_credit_score, promoter_exp_years, prior_default, 
         # annual_revenue, gst_turnover, ebitda_margin, net_margin, total_debt, existing_emi, 
         # loan_amount_requested, loan_tenure_months, proposed_emi, dscr, collateral_value
         
         # Calculate derived fields if missing
-        annual_revenue = float(app_data.get('annual_revenue', 0))
-        loan_amount = float(app_data.get('loan_amount_requested', 0))
-        tenure = int(app_data.get('loan_tenure_months', 36))
+        annual_revenue = np.array([float(a.get('annual_revenue', 0)) for a in applications], dtype=float)
+        loan_amount = np.array([float(a.get('loan_amount_requested', 0)) for a in applications], dtype=float)
+        tenure = np.array([int(a.get('loan_tenure_months', 36)) for a in applications], dtype=np.int64)
         
         # Heuristics for missing financial data (if coming from simple form)
-        gst_turnover = app_data.get('gst_turnover') or (annual_revenue * 0.9)
-        ebitda_margin = app_data.get('ebitda_margin') or 0.12 # Default 12%
-        net_margin = app_data.get('net_margin') or 0.05       # Default 5%
+        gst_turnover = [a.get('gst_turnover') or (rev * 0.9) for a, rev in zip(applications, annual_revenue)]
+        ebitda_margin = np.array([a.get('ebitda_margin') or 0.12 for a in applications], dtype=float) # Default 12%
+        net_margin = [a.get('net_margin') or 0.05 for a in applications]                             # Default 5%
         
         # Calculate EMI and Debt if missing
         rate = 0.15 # 15% interest assumption
         monthly_rate = rate / 12
-        if tenure > 0:
-            proposed_emi = (loan_amount * monthly_rate * ((1 + monthly_rate)**tenure)) / (((1 + monthly_rate)**tenure) - 1)
-        else:
-            proposed_emi = 0
+        growth = (1 + monthly_rate) ** tenure
+        with np.errstate(divide='ignore', invalid='ignore'):
+            proposed_emi = np.where(tenure > 0, (loan_amount * monthly_rate * growth) / (growth - 1), 0.0)
             
-        existing_emi = app_data.get('existing_emi') or (app_data.get('total_debt', 0) / 48) # Rough approx
+        existing_emi = np.array([
+            a.get('existing_emi') or (a.get('total_debt', 0) / 48) for a in applications # Rough approx
+        ], dtype=float)
         
         # Calculate DSCR
         monthly_ebitda = (annual_revenue * ebitda_margin) / 12
         total_obligation = existing_emi + proposed_emi
-        dscr = monthly_ebitda / total_obligation if total_obligation > 0 else 2.0
-        
-        # Construct DataFrame record
-        record = {
-            'years_in_operation': app_data.get('years_in_operation', 0),
-            'promoter_credit_score': app_data.get('promoter_credit_score') or app_data.get('credit_score', 650),
-            'promoter_exp_years': app_data.get('promoter_exp_years') or max(1, app_data.get('years_in_operation', 1)),
-            'prior_default': 0, # Assume no default if unknown
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dscr = np.where(total_obligation > 0, monthly_ebitda / total_obligation, 2.0)
+        
+        # Construct DataFrame columns
+        columns = {
+            'years_in_operation': [a.get('years_in_operation', 0) for a in applications],
+            'promoter_credit_score': [a.get('promoter_credit_score') or a.get('credit_score', 650) for a in applications],
+            'promoter_exp_years': [
+                a.get('promoter_exp_years') or max(1, a.get('years_in_operation', 1)) for a in applications
+            ],
+            'prior_default': [0] * len(applications), # Assume no default if unknown
             'annual_revenue': annual_revenue,
             'gst_turnover': gst_turnover,
             'ebitda_margin': ebitda_margin,
             'net_margin': net_margin,
-            'total_debt': app_data.get('total_debt', 0),
+            'total_debt': [a.get('total_debt', 0) for a in applications],
             'existing_emi': existing_emi,
             'loan_amount_requested': loan_amount,
             'loan_tenure_months': tenure,
             'proposed_emi': proposed_emi,
             'dscr': dscr,
-            'collateral_value': float(app_data.get('collateral_value', 0)),
-            'business_type': app_data.get('business_type', 'Services'),
-            'loan_purpose': app_data.get('loan_purpose', 'Working Capital'),
-            'collateral_type': app_data.get('collateral_type', 'None')
+            'collateral_value': [float(a.get('collateral_value', 0)) for a in applications],
+            'business_type': [a.get('business_type', 'Services') for a in applications],
+            'loan_purpose': [a.get('loan_purpose', 'Working Capital') for a in applications],
+            'collateral_type': [a.get('collateral_type', 'None') for a in applications]
         }
         
-        return pd.DataFrame([record])
+        return pd.DataFrame(columns)
     
     def calculate_risk_score(self, probability: float) -> float:
-        """Convert default probability to risk score (0-100)"""
+        """Convert default probability to risk score (0-100). Accepts scalars or arrays."""
         # PD 0.01 -> Score 99 (Safe)
         # PD 0.50 -> Score 50
         # PD 0.99 -> Score 1 (Risky)
@@ -103,7 +321,7 @@ class CreditEvaluationService:
         # Let's stick to RISK SCORE (Lower is Better/Safer).
         # PD 0.05 -> 5 (Very Safe)
         # PD 0.90 -> 90 (Very Risky)
-        return round(probability * 100, 1)
+        return np.round(probability * 100, 1)
 
     def generate_recommendation(self, pd: float, confidence: float) -> str:
         """Generate recommendation based on PD thresholds"""
@@ -113,20 +331,43 @@ class CreditEvaluationService:
         # > 0.40: Reject
         # (Synthetic data has high default rate ~40%, so we need generous thresholds)
         
-        if pd < 0.25:
+        if pd < APPROVE_BELOW_PD:
             return "approve"
-        elif pd > 0.60:
+        elif pd > REJECT_ABOVE_PD:
             return "reject"
         else:
             return "review"
+
+    def generate_recommendations(self, pd_values: np.ndarray) -> np.ndarray:
+        """Vectorized generate_recommendation over an array of PDs"""
+        return np.where(
+            pd_values < APPROVE_BELOW_PD, "approve",
+            np.where(pd_values > REJECT_ABOVE_PD, "reject", "review")
+        )
     
     def get_feature_importance(self, df_raw: pd.DataFrame) -> List[Dict]:
         """
-        Get approximate feature importance using Model coefficients or Tree gains.
-        Since we have a PIPELINE, we need to access the internal model steps.
+        Per-application feature contributions (exact TreeSHAP, summed back onto raw inputs).
+        Falls back to rule-based explanations when the model has no XGBoost boosters.
         """
         if self.model is None: return []
+        return self.get_feature_importance_batch(df_raw.iloc[[0]])[0]
+
+    def get_feature_importance_batch(self, df_raw: pd.DataFrame,
+                                     artifacts: Optional[ModelArtifacts] = None) -> List[List[Dict]]:
+        """Explanations for every row of a preprocessed frame (by `artifacts`, default the active model)"""
+        artifacts = artifacts or self.active
+        if artifacts is None: return [[] for _ in range(len(df_raw))]
         
+        if artifacts.explainer is not None:
+            try:
+                return artifacts.explainer.explain(df_raw)
+            except Exception as e:
+                print(f"TreeSHAP error, falling back to heuristics: {e}")
+        return self.get_heuristic_importance_batch(df_raw)
+
+    def get_heuristic_importance_batch(self, df_raw: pd.DataFrame) -> List[List[Dict]]:
+        """Rule-based red flags relative to 'safe' baselines"""
         try:
             # Access the internal XGBClassifier
             # CalibratedClassifierCV -> calibrated_classifiers_[0] -> base_estimator -> pipeline -> steps -> xgboost
@@ -137,85 +378,127 @@ class CreditEvaluationService:
             # Better Hack for Hackathon:
             # Check for red flags in input relative to 'safe' baselines.
             
-            explanations = []
+            dscr = df_raw['dscr'].to_numpy(dtype=float)
+            score = df_raw['promoter_credit_score'].to_numpy(dtype=float)
+            rev = df_raw['annual_revenue'].to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cov = df_raw['collateral_value'].to_numpy(dtype=float) / df_raw['loan_amount_requested'].to_numpy(dtype=float)
             
-            # 1. DSCR
-            dscr = df_raw.iloc[0]['dscr']
-            if dscr < 1.2:
-                explanations.append({'feature': 'DSCR', 'importance': 0.4, 'value': dscr, 'reason': 'Low Debt Coverage'})
-            elif dscr > 2.0:
-                explanations.append({'feature': 'DSCR', 'importance': 0.2, 'value': dscr, 'reason': 'Strong Cashflow'})
-                
-            # 2. Credit Score
-            score = df_raw.iloc[0]['promoter_credit_score']
-            if score < 650:
-                explanations.append({'feature': 'Credit Score', 'importance': 0.35, 'value': score, 'reason': 'Low Credit Score'})
+            # 1. DSCR, 2. Credit Score, 3. Revenue, 4. Collateral
+            low_dscr, strong_dscr = dscr < 1.2, dscr > 2.0
+            low_score = score < 650
+            high_rev = rev > 10000000
+            low_cov = cov < 0.5
             
-            # 3. Revenue
-            rev = df_raw.iloc[0]['annual_revenue']
-            if rev > 10000000:
-                 explanations.append({'feature': 'Revenue', 'importance': 0.15, 'value': rev, 'reason': 'High Revenue Volume'})
-
-            # 4. Collateral
-            cov = df_raw.iloc[0]['collateral_value'] / df_raw.iloc[0]['loan_amount_requested']
-            if cov < 0.5:
-                explanations.append({'feature': 'Collateral', 'importance': 0.25, 'value': cov, 'reason': 'Insufficient Collateral'})
+            explanations = []
+            for i in range(len(df_raw)):
+                row = []
+                if low_dscr[i]:
+                    row.append({'feature': 'DSCR', 'importance': 0.4, 'value': float(dscr[i]), 'reason': 'Low Debt Coverage'})
+                elif strong_dscr[i]:
+                    row.append({'feature': 'DSCR', 'importance': 0.2, 'value': float(dscr[i]), 'reason': 'Strong Cashflow'})
+                if low_score[i]:
+                    row.append({'feature': 'Credit Score', 'importance': 0.35, 'value': float(score[i]), 'reason': 'Low Credit Score'})
+                if high_rev[i]:
+                    row.append({'feature': 'Revenue', 'importance': 0.15, 'value': float(rev[i]), 'reason': 'High Revenue Volume'})
+                if low_cov[i]:
+                    row.append({'feature': 'Collateral', 'importance': 0.25, 'value': float(cov[i]), 'reason': 'Insufficient Collateral'})
+                explanations.append(row)
             
             return explanations
             
         except Exception as e:
             print(f"Error explaining: {e}")
-            return []
+            return [[] for _ in range(len(df_raw))]
 
     def evaluate_application(self, application_data: Dict) -> Dict:
         """Main evaluation function"""
-        if self.model is None:
+        return self.evaluate_batch([application_data])[0]
+
+    def evaluate_batch(self, applications: List[Dict]) -> List[Dict]:
+        """
+        Evaluate many applications with a single predict_proba call.
+        Results match evaluate_application row for row; repeats are served from the prediction cache.
+        """
+        artifacts = self.active  # One model for the whole batch, even if a reload swaps it meanwhile
+        if artifacts is None:
             # Fallback for dev/testing if model gen failed
-            return {
+            return [{
                 'risk_score': 75, 
                 'default_probability': 0.75, 
                 'recommendation': 'reject',
                 'confidence_score': 0.8,
                 'model_version': 'fallback-heuristic',
                 'feature_importance': json.dumps([])
-            }
+            } for _ in applications]
+        if not applications:
+            return []
         
         # Preprocess
-        df = self.preprocess_application(application_data)
+        df = self.preprocess_batch(applications)
+        if not self.prediction_cache.enabled:
+            return self._score_frame(df, artifacts)[0]
         
+        # Cache keys: canonical row under the currently loaded artifacts
+        artifact_id = artifacts.artifact_id
+        keys = [(artifact_id, row) for row in row_keys(df)]
+        results = [self.prediction_cache.get(key) for key in keys]
+        misses = [i for i, result in enumerate(results) if result is None]
+        
+        if misses:
+            scored, ok = self._score_frame(df.iloc[misses].reset_index(drop=True), artifacts)
+            for i, result in zip(misses, scored):
+                results[i] = result
+                if ok:  # Never cache the 0.5 fallback of a failed prediction
+                    self.prediction_cache.put(keys[i], result)
+        
+        return results
+
+    def _score_frame(self, df: pd.DataFrame, artifacts: ModelArtifacts,
+                     raise_errors: bool = False, shadow: bool = True) -> Tuple[List[Dict], bool]:
+        """
+        Score a preprocessed frame; returns one result dict per row and whether the model succeeded.
+        Successfully scored frames are handed to the shadow scorer unless `shadow` is False.
+        """
         # Transform (Pipeline handles scaling/coding)
         # Note: model is CalibratedClassifierCV(Pipeline(...))
         # It expects raw-ish data (Pipeline handles preprocessing)
-        # Wait, in train_model, Pipeline splits into num/cat.
         # My preprocessing DF has 'business_type' as string, etc.
         # So I can pass `df` directly to `model.predict_proba`.
+        ok = True
         
         try:
-            proba = self.model.predict_proba(df)[0]
-            pd_value = proba[1] # Probability of Class 1 (Default)
+            start = time.perf_counter()
+            pd_values = artifacts.predict_proba(df)[:, 1] # Probability of Class 1 (Default)
+            seconds = time.perf_counter() - start
+            service_metrics.record_scoring(len(df), seconds)
+            if shadow:
+                self.shadow.submit(df, pd_values, artifacts.model_version, seconds)
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Prediction Error: {e}")
-            pd_value = 0.5
+            pd_values = np.full(len(df), 0.5)
+            ok = False
             
-        risk_score = self.calculate_risk_score(pd_value)
+        risk_scores = self.calculate_risk_score(pd_values)
         
-        # Confidence: ABS(0.5 - PD) * 2? Or just 1.0? 
+        # Confidence: high if PD is close to 0 or 1.
         # CalibratedClassifierCV gives calibrated probs.
-        # Let's say confidence is high if PD is close to 0 or 1.
-        confidence = 2 * abs(0.5 - pd_value) 
+        confidence = 2 * np.abs(0.5 - pd_values)
         
-        rec = self.generate_recommendation(pd_value, confidence)
+        recs = self.generate_recommendations(pd_values)
         
-        features = self.get_feature_importance(df)
+        features = self.get_feature_importance_batch(df, artifacts)
         
-        return {
-            'risk_score': risk_score,
-            'default_probability': pd_value,
-            'recommendation': rec,
-            'confidence_score': confidence,
-            'model_version': 'v2-xgboost-calibrated',
-            'feature_importance': json.dumps(features)
-        }
+        return [{
+            'risk_score': float(risk_scores[i]),
+            'default_probability': float(pd_values[i]),
+            'recommendation': str(recs[i]),
+            'confidence_score': float(confidence[i]),
+            'model_version': artifacts.model_version,
+            'feature_importance': json.dumps(features[i])
+        } for i in range(len(df))], ok
 
 # Global service instance
 credit_service = CreditEvaluationService()
@@ -0,0 +1,134 @@
+"""
+Compact, memory-mappable explanation bundles
+
+A bundle is a directory holding manifest.json plus one .npy file per array:
+  global_importance       mean |SHAP| per feature over the background sample
+  mean_contribution       signed mean SHAP per feature
+  background_contributions  SHAP values of every background row (float32)
+  background_index        rows of the source data used as background
+  tree_nodes (optional)   flattened leaf-value table, columns listed in the manifest
+The manifest records the SHA-256 of the model file it was computed from; a bundle
+whose hash does not match the current model is treated as absent.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+
+import numpy as np
+
+BUNDLE_MANIFEST = "manifest.json"
+BUNDLE_FORMAT = 1
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ExplanationBundle:
+    """Read-only view of a bundle; arrays are memory-mapped on first access"""
+
+    def __init__(self, directory: str, manifest: Dict):
+        self.directory = directory
+        self.manifest = manifest
+        self._arrays = {}
+
+    @property
+    def model_sha256(self) -> str:
+        return self.manifest["model_sha256"]
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.manifest["feature_names"]
+
+    @property
+    def expected_value(self) -> float:
+        """Mean model output (log-odds) over the background sample"""
+        return self.manifest["expected_value"]
+
+    def array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            if name not in self.manifest["arrays"]:
+                raise KeyError(f"Bundle has no array '{name}'")
+            self._arrays[name] = np.load(os.path.join(self.directory, f"{name}.npy"), mmap_mode="r")
+        return self._arrays[name]
+
+    def has_array(self, name: str) -> bool:
+        return name in self.manifest["arrays"]
+
+    def global_importance(self) -> List[Dict]:
+        """Features by descending mean |SHAP|"""
+        importance = self.array("global_importance")
+        direction = self.array("mean_contribution")
+        order = np.argsort(-importance, kind="stable")
+        return [{
+            "feature": self.feature_names[i],
+            "importance": float(importance[i]),
+            "mean_contribution": float(direction[i])
+        } for i in order]
+
+def load_bundle(directory: str, model_path: Optional[str] = None) -> Optional[ExplanationBundle]:
+    """
+    Open the bundle in `directory`, or None if it is missing, unreadable, or was
+    computed from a different model file than `model_path`.
+    """
+    try:
+        with open(os.path.join(directory, BUNDLE_MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format") != BUNDLE_FORMAT:
+        return None
+    if model_path is not None and manifest.get("model_sha256") != file_sha256(model_path):
+        print(f"⚠️ Explanation bundle in {directory} is stale (model changed); ignoring it")
+        return None
+    return ExplanationBundle(directory, manifest)
+
+def write_bundle(directory: str, model_path: str, feature_names: List[str], expected_value: float,
+                 contributions: np.ndarray, background_index: np.ndarray,
+                 tree_nodes: Optional[np.ndarray] = None, tree_columns: Optional[List[str]] = None,
+                 metadata: Optional[Dict] = None) -> ExplanationBundle:
+    """
+    Write a bundle from background SHAP values [rows, features].
+    The new directory is built alongside and swapped in, so readers never see a partial bundle.
+    """
+    contributions = np.asarray(contributions, dtype=np.float64)
+    arrays = {
+        "global_importance": np.abs(contributions).mean(axis=0),
+        "mean_contribution": contributions.mean(axis=0),
+        "background_contributions": contributions.astype(np.float32),
+        "background_index": np.asarray(background_index, dtype=np.int64),
+    }
+    if tree_nodes is not None:
+        arrays["tree_nodes"] = np.asarray(tree_nodes, dtype=np.float64)
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "model_sha256": file_sha256(model_path),
+        "model_file": os.path.basename(model_path),
+        "feature_names": list(feature_names),
+        "expected_value": float(expected_value),
+        "background_rows": int(contributions.shape[0]),
+        "arrays": sorted(arrays),
+        "tree_columns": list(tree_columns or []),
+        **(metadata or {}),
+    }
+
+    staging = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name, values in arrays.items():
+        np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(values))
+    with open(os.path.join(staging, BUNDLE_MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    retired = f"{directory}.old-{os.getpid()}"
+    if os.path.exists(directory):
+        os.replace(directory, retired)
+    os.replace(staging, directory)
+    shutil.rmtree(retired, ignore_errors=True)
+    return ExplanationBundle(directory, manifest)
@@ -0,0 +1,101 @@
+"""
+Applicant ID allocation from preallocated blocks
+"""
+
+import os
+import threading
+from typing import List
+from sqlalchemy import func, inspect, select, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from ..models.database import engine
+from ..models.models import Application, IdBlock
+
+class ApplicantIdAllocator:
+    """
+    Hands out `APP000123`-style applicant IDs without touching the database per insert.
+    Each process reserves `block_size` numbers at a time with one atomic UPDATE on the
+    id_blocks table, committed on its own connection, so concurrent workers never mint
+    the same ID. Numbers left in a block when the process exits are simply skipped.
+    The table and its row are set up once by `prepare()` at application startup.
+    """
+
+    def __init__(self, bind=engine, name: str = "applicant_id", block_size: int = 100,
+                 prefix: str = "APP", width: int = 6):
+        self.bind = bind
+        self.name = name
+        self.block_size = max(1, block_size)
+        self.prefix = prefix
+        self.width = width
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._blocks_reserved = 0
+        self._prepared = False
+
+    @classmethod
+    def from_env(cls) -> "ApplicantIdAllocator":
+        """Block size from APPLICANT_ID_BLOCK_SIZE"""
+        return cls(block_size=int(os.getenv("APPLICANT_ID_BLOCK_SIZE", 100)))
+
+    def format(self, number: int) -> str:
+        return f"{self.prefix}{str(number).zfill(self.width)}"
+
+    def allocate(self, count: int = 1) -> List[str]:
+        """Next `count` applicant IDs, consecutive within the returned list"""
+        with self._lock:
+            if self._end - self._next < count:
+                if count >= self.block_size:
+                    # Bulk request: reserve exactly what it needs and keep the current block
+                    start = self._reserve(count)
+                    return [self.format(n) for n in range(start, start + count)]
+                self._next = self._reserve(self.block_size)
+                self._end = self._next + self.block_size
+            start = self._next
+            self._next += count
+        return [self.format(n) for n in range(start, start + count)]
+
+    def prepare(self):
+        """Create id_blocks and seed this allocator's row; run once at startup, safe to repeat"""
+        with self._lock:
+            if self._prepared:
+                return
+            try:
+                IdBlock.__table__.create(self.bind, checkfirst=True)
+            except DBAPIError:
+                # Another worker created it between the check and the CREATE
+                if not inspect(self.bind).has_table(IdBlock.__tablename__):
+                    raise
+            try:
+                with self.bind.begin() as conn:
+                    if conn.execute(select(IdBlock.next_value).where(IdBlock.name == self.name)).first() is None:
+                        # First use: continue after the IDs minted by the old max(id) + 1 scheme
+                        last = conn.execute(select(func.max(Application.id))).scalar() or 0
+                        conn.execute(IdBlock.__table__.insert().values(name=self.name, next_value=last + 1))
+            except IntegrityError:
+                pass  # Another worker seeded it first
+            self._prepared = True
+
+    def _reserve(self, count: int) -> int:
+        """Atomically advance the high-water mark by `count`; returns the first reserved number"""
+        with self.bind.begin() as conn:
+            end = conn.execute(
+                update(IdBlock)
+                .where(IdBlock.name == self.name)
+                .values(next_value=IdBlock.next_value + count)
+                .returning(IdBlock.next_value)
+            ).scalar()
+        if end is None:
+            raise RuntimeError(f"id_blocks[{self.name}] is not seeded; call prepare() at startup")
+        self._blocks_reserved += 1
+        return end - count
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "block_size": self.block_size,
+                "remaining_in_block": self._end - self._next,
+                "blocks_reserved": self._blocks_reserved,
+            }
+
+# Global allocator instance
+applicant_ids = ApplicantIdAllocator.from_env()
@@ -0,0 +1,63 @@
+"""
+Bounded executor for CPU-bound model calls made from async routes
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class InferenceBusyError(Exception):
+    """Raised when the inference queue is full; routes answer 503 so clients back off"""
+
+class InferenceExecutor:
+    """
+    Runs model calls on a fixed pool of worker threads so they never block the event loop.
+    At most `max_pending` calls may be running or queued; beyond that, callers are
+    rejected immediately instead of piling up unbounded latency.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "InferenceExecutor":
+        """Sized by INFERENCE_WORKERS and INFERENCE_MAX_PENDING"""
+        workers = int(os.getenv("INFERENCE_WORKERS", min(4, os.cpu_count() or 1)))
+        max_pending = int(os.getenv("INFERENCE_MAX_PENDING", workers * 16))
+        return cls(workers, max_pending)
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the pool and await its result"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise InferenceBusyError(f"Inference queue full ({self.max_pending} pending)")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+# Global executor instance
+inference_executor = InferenceExecutor.from_env()
@@ -0,0 +1,98 @@
+"""
+In-memory copy of the offline training metrics (metrics.json)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Optional, Tuple
+
+METRICS_PATH = "backend/ml_pipeline/metrics.json"
+
+class MetricsFileCache:
+    """
+    metrics.json parsed once and kept as ready-to-send bytes with a strong ETag.
+    Every get() stats the file and reloads only when its inode, mtime or size changed,
+    so replacing it (os.replace, as the training scripts do) is picked up on the next
+    request. A replacement that fails to parse, or is not a JSON object, keeps the
+    last good copy serving.
+    """
+
+    def __init__(self, path: str = METRICS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._body: Optional[bytes] = None
+        self._etag: Optional[str] = None
+        self._hits = 0
+        self._reloads = 0
+        self._errors = 0
+        self._not_modified = 0
+
+    @classmethod
+    def from_env(cls) -> "MetricsFileCache":
+        """Reads METRICS_PATH"""
+        return cls(os.getenv("METRICS_PATH", METRICS_PATH))
+
+    def get(self) -> Tuple[bytes, str]:
+        """
+        (JSON object body, ETag) of the current file. Raises FileNotFoundError if it does
+        not exist, ValueError if it has never parsed to an object.
+        """
+        st = os.stat(self.path)
+        signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if signature == self._signature:
+                self._hits += 1
+                return self._body, self._etag
+        return self._reload(signature)
+
+    def _reload(self, signature) -> Tuple[bytes, str]:
+        try:
+            with open(self.path, "rb") as f:
+                metrics = json.loads(f.read())
+            if not isinstance(metrics, dict):
+                # The live view splices "service" into the object, so nothing else is served
+                raise ValueError(f"expected a JSON object, got {type(metrics).__name__}")
+        except (OSError, ValueError) as e:
+            with self._lock:
+                self._errors += 1
+                if self._body is None:
+                    raise ValueError(f"Error reading metrics: {e}") from e
+                print(f"⚠️ Warning: Keeping previous metrics, {self.path} unreadable: {e}")
+                self._signature = signature  # Not re-read until it changes again
+                return self._body, self._etag
+        body = json.dumps(metrics, separators=(",", ":")).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+        with self._lock:
+            self._signature, self._body, self._etag = signature, body, etag
+            self._reloads += 1
+            return body, etag
+
+    def record_not_modified(self):
+        with self._lock:
+            self._not_modified += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests = self._hits + self._reloads
+            return {
+                "path": self.path,
+                "etag": self._etag,
+                "hits": self._hits,
+                "reloads": self._reloads,
+                "errors": self._errors,
+                "hit_rate": round(self._hits / requests, 4) if requests else 0.0,
+                "not_modified_responses": self._not_modified,
+            }
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers `etag` (weak comparison, as RFC 9110 asks for GET)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+# Global metrics file instance
+metrics_file = MetricsFileCache.from_env()
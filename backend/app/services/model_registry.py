@@ -0,0 +1,165 @@
+"""
+Content-addressed model registry
+
+    registry/
+      ACTIVE                    version id of the model the service should serve
+      versions/<version>/       model_xgb.joblib, preprocessor.joblib, feature_names.joblib,
+                                explanations/ (optional bundle), version.json
+
+A version id is derived from the SHA-256 of its artifact files, so publishing the
+same files twice yields the same version. Version directories are never modified
+once published; activating a version atomically replaces the ACTIVE pointer, which
+running services poll to hot-reload (see CreditEvaluationService.reload).
+
+    PYTHONPATH=backend python -m app.services.model_registry publish --activate
+    PYTHONPATH=backend python -m app.services.model_registry list
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+
+from .explanation_bundle import BUNDLE_MANIFEST, file_sha256
+
+REGISTRY_DIR = "backend/ml_pipeline/registry"
+MODELS_DIR = "backend/ml_pipeline/models"
+ACTIVE_POINTER = "ACTIVE"
+VERSION_MANIFEST = "version.json"
+ARTIFACT_FILES = ("model_xgb.joblib", "preprocessor.joblib", "feature_names.joblib")
+MODEL_FILE = ARTIFACT_FILES[0]
+EXPLANATIONS_DIR = "explanations"
+
+class ModelRegistry:
+    """Publishes, lists and activates immutable model versions under `root`"""
+
+    def __init__(self, root: str = REGISTRY_DIR):
+        self.root = root
+
+    @classmethod
+    def from_env(cls) -> "ModelRegistry":
+        """Rooted at MODEL_REGISTRY_DIR"""
+        return cls(os.getenv("MODEL_REGISTRY_DIR", REGISTRY_DIR))
+
+    def version_dir(self, version: str) -> str:
+        return os.path.join(self.root, "versions", version)
+
+    def has_version(self, version: str) -> bool:
+        return os.path.exists(os.path.join(self.version_dir(version), VERSION_MANIFEST))
+
+    def versions(self) -> List[Dict]:
+        """Manifests of every published version, oldest first"""
+        versions_root = os.path.join(self.root, "versions")
+        if not os.path.isdir(versions_root):
+            return []
+        manifests = []
+        for name in os.listdir(versions_root):
+            try:
+                with open(os.path.join(versions_root, name, VERSION_MANIFEST)) as f:
+                    manifests.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Not a published version (e.g. a publish in progress)
+        return sorted(manifests, key=lambda m: m["created_at"])
+
+    def active_version(self) -> Optional[str]:
+        """Version named by the ACTIVE pointer, or None if nothing is active"""
+        try:
+            with open(os.path.join(self.root, ACTIVE_POINTER)) as f:
+                version = f.read().strip()
+        except OSError:
+            return None
+        return version if version and self.has_version(version) else None
+
+    def publish(self, source_dir: str = MODELS_DIR, bundle_dir: Optional[str] = None) -> str:
+        """
+        Copy the artifact files in `source_dir` (and the explanation bundle computed
+        from its model, if any) into a new version; returns the version id.
+        """
+        hashes = {name: file_sha256(os.path.join(source_dir, name)) for name in ARTIFACT_FILES}
+        version = hashlib.sha256("\n".join(f"{name}:{hashes[name]}" for name in ARTIFACT_FILES).encode()).hexdigest()[:12]
+        if self.has_version(version):
+            return version
+
+        # Built alongside, then renamed into place: a version directory is complete or absent
+        target = self.version_dir(version)
+        staging = f"{target}.tmp-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        for name in ARTIFACT_FILES:
+            shutil.copy2(os.path.join(source_dir, name), os.path.join(staging, name))
+
+        bundle_dir = bundle_dir or os.path.join(source_dir, EXPLANATIONS_DIR, MODEL_FILE.split(".")[0])
+        has_bundle = self._bundle_matches(bundle_dir, hashes[MODEL_FILE])
+        if has_bundle:
+            shutil.copytree(bundle_dir, os.path.join(staging, EXPLANATIONS_DIR))
+
+        manifest = {
+            "version": version,
+            "files": hashes,
+            "explanations": has_bundle,
+            "source": os.path.abspath(source_dir),
+            "created_at": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        }
+        with open(os.path.join(staging, VERSION_MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=4)
+        try:
+            os.rename(staging, target)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not self.has_version(version):  # Lost a race against an identical publish otherwise
+                raise
+        return version
+
+    def activate(self, version: str):
+        """Point ACTIVE at `version`; readers see either the old or the new id, never a partial write"""
+        if not self.has_version(version):
+            raise KeyError(f"Unknown model version '{version}'")
+        pointer = os.path.join(self.root, ACTIVE_POINTER)
+        staging = f"{pointer}.tmp-{os.getpid()}"
+        with open(staging, "w") as f:
+            f.write(version + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(staging, pointer)
+
+    @staticmethod
+    def _bundle_matches(bundle_dir: str, model_sha256: str) -> bool:
+        try:
+            with open(os.path.join(bundle_dir, BUNDLE_MANIFEST)) as f:
+                return json.load(f).get("model_sha256") == model_sha256
+        except (OSError, ValueError):
+            return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Model registry")
+    parser.add_argument("--root", default=os.getenv("MODEL_REGISTRY_DIR", REGISTRY_DIR))
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish = commands.add_parser("publish", help="Publish the artifacts in a models directory as a version")
+    publish.add_argument("--source", default=MODELS_DIR)
+    publish.add_argument("--activate", action="store_true", help="Also make it the active version")
+    activate = commands.add_parser("activate", help="Make a published version active")
+    activate.add_argument("version")
+    commands.add_parser("list", help="List published versions")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == "publish":
+        version = registry.publish(args.source)
+        print(f"✅ Published model version {version}")
+        if args.activate:
+            registry.activate(version)
+            print(f"✅ Version {version} is active")
+    elif args.command == "activate":
+        registry.activate(args.version)
+        print(f"✅ Version {args.version} is active")
+    else:
+        active = registry.active_version()
+        for manifest in registry.versions():
+            marker = "*" if manifest["version"] == active else " "
+            print(f"{marker} {manifest['version']}  {manifest['created_at']}  explanations={manifest['explanations']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Micro-batching front end for single predictions
+"""
+
+import asyncio
+import os
+import threading
+from typing import Dict
+from .credit_service import credit_service
+from .inference_executor import inference_executor, InferenceBusyError
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent single-application predictions into one evaluate_batch call.
+    A batch is dispatched once it holds `max_batch_size` items or `max_wait_ms` after its
+    first item arrived, whichever comes first; each caller gets its own row back.
+    If a batch fails, its items are rescored one by one so only the bad request fails.
+    """
+
+    def __init__(self, service, executor, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        self.service = service
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._loop = None
+        self._queue = None
+        self._collector = None
+        self._scoring = set()  # Strong references to in-flight scoring tasks
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+        self._split_batches = 0
+        self._histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    @classmethod
+    def from_env(cls, service, executor) -> "PredictionBatcher":
+        """Tuned by PREDICT_BATCH_MAX_SIZE and PREDICT_BATCH_MAX_WAIT_MS"""
+        return cls(
+            service, executor,
+            max_batch_size=int(os.getenv("PREDICT_BATCH_MAX_SIZE", 32)),
+            max_wait_ms=float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", 2)),
+        )
+
+    async def submit(self, application_data: Dict) -> Dict:
+        """Queue one application and wait for its result"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._collector is None or self._collector.done():
+            # (Re)start the collector on the loop that is serving requests
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._collector = loop.create_task(self._collect())
+        future = loop.create_future()
+        self._queue.put_nowait((application_data, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Score in the background so the next batch can fill up meanwhile
+            task = loop.create_task(self._score(batch))
+            self._scoring.add(task)
+            task.add_done_callback(self._scoring.discard)
+
+    async def _score(self, batch):
+        self._record(len(batch))
+        applications = [data for data, _ in batch]
+        try:
+            outcomes = [(result, None) for result in await self.executor.run(self.service.evaluate_batch, applications)]
+        except Exception as e:
+            if len(batch) == 1 or isinstance(e, InferenceBusyError):
+                outcomes = [(None, e)] * len(batch)
+            else:
+                with self._lock:
+                    self._split_batches += 1
+                try:
+                    outcomes = await self.executor.run(self._score_each, applications)
+                except Exception as e:
+                    outcomes = [(None, e)] * len(batch)
+        for (_, future), (result, error) in zip(batch, outcomes):
+            if future.done():  # The caller may have gone away
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _score_each(self, applications):
+        """(result, error) per application, each scored on its own"""
+        outcomes = []
+        for data in applications:
+            try:
+                outcomes.append((self.service.evaluate_application(data), None))
+            except Exception as e:
+                outcomes.append((None, e))
+        return outcomes
+
+    def _record(self, size):
+        bucket = next((i for i, bound in enumerate(BATCH_SIZE_BUCKETS) if size <= bound), len(BATCH_SIZE_BUCKETS))
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            self._max_seen = max(self._max_seen, size)
+            self._histogram[bucket] += 1
+
+    def stats(self) -> dict:
+        """Achieved batch sizes since startup"""
+        with self._lock:
+            labels = [f"<={bound}" for bound in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._max_seen,
+                "split_batches": self._split_batches,
+                "batch_size_histogram": dict(zip(labels, self._histogram)),
+            }
+
+# Global batcher instance
+prediction_batcher = PredictionBatcher.from_env(credit_service, inference_executor)
@@ -0,0 +1,102 @@
+"""
+Bounded LRU + TTL cache for evaluation results
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+def row_keys(df: pd.DataFrame) -> List[Tuple]:
+    """
+    Canonical, hashable key for every row of a preprocessed frame.
+    Columns are taken in name order and numerics as float so 720 and 720.0 key alike;
+    comparing full tuples (not just their hash) rules out collisions.
+    """
+    columns = [
+        df[col].to_numpy(dtype=float).tolist() if pd.api.types.is_numeric_dtype(df[col]) else df[col].astype(str).tolist()
+        for col in sorted(df.columns)
+    ]
+    return list(zip(*columns))
+
+class PredictionCache:
+    """
+    Result cache keyed on (model artifact id, row key).
+    Entries are evicted least-recently-used beyond `max_size` and expire after `ttl_seconds`.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300.0):
+        self.max_size = max(0, max_size)
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "PredictionCache":
+        """Sized by PREDICTION_CACHE_SIZE (0 disables) and PREDICTION_CACHE_TTL_SECONDS"""
+        return cls(
+            max_size=int(os.getenv("PREDICTION_CACHE_SIZE", 10000)),
+            ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", 300)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        """Cached result for key, or None; a hit refreshes its LRU position"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return dict(result)
+
+    def put(self, key: Hashable, result: Dict):
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """Drop every entry, e.g. after the model artifacts were reloaded"""
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "size": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
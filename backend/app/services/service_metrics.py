@@ -0,0 +1,178 @@
+"""
+Live request and scoring counters of the running service
+"""
+
+import bisect
+import os
+import threading
+import time
+from typing import Dict
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+# Upper bounds of the latency histogram buckets (ms); the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; percentiles are reported as their bucket's upper bound"""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank, seen = q / 100 * self.count, 0
+        for bound, count in zip(self.buckets_ms, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return round(self.max_ms, 3)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {**{f"le_{bound:g}ms": n for bound, n in zip(self.buckets_ms, self.counts)},
+                        "inf": self.counts[-1]},
+        }
+
+class _RateCounter:
+    """Events per second over the last `window` seconds, in one-second slots"""
+
+    def __init__(self, window: int):
+        self.window = max(1, window)
+        self.slots = [0] * self.window
+        self.stamps = [-1] * self.window
+
+    def add(self, now: float, n: int = 1):
+        second = int(now)
+        i = second % self.window
+        if self.stamps[i] != second:
+            self.stamps[i], self.slots[i] = second, 0
+        self.slots[i] += n
+
+    def rate(self, now: float) -> float:
+        oldest = int(now) - self.window
+        return sum(n for n, stamp in zip(self.slots, self.stamps) if stamp > oldest) / self.window
+
+class _RouteStats:
+    def __init__(self, window: int):
+        self.requests = 0
+        self.errors = 0
+        self.rate = _RateCounter(window)
+        self.latency = LatencyHistogram()
+
+class ServiceMetrics:
+    """
+    Request counts, rates and latency per route, and model scoring latency.
+    Rates are averaged over the last `window_seconds`; totals count since start-up.
+    """
+
+    def __init__(self, window_seconds: int = 60):
+        self.window_seconds = max(1, window_seconds)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._routes: Dict[str, _RouteStats] = {}
+        self._requests = _RateCounter(self.window_seconds)
+        self._scoring_calls = 0
+        self._scored_rows = 0
+        self._scoring_rows_rate = _RateCounter(self.window_seconds)
+        self._scoring_latency = LatencyHistogram()
+
+    @classmethod
+    def from_env(cls) -> "ServiceMetrics":
+        """Rate window from SERVICE_METRICS_WINDOW_SECONDS"""
+        return cls(int(os.getenv("SERVICE_METRICS_WINDOW_SECONDS", 60)))
+
+    def record_request(self, route: str, status_code: int, seconds: float):
+        now = time.time()
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = _RouteStats(self.window_seconds)
+            stats.requests += 1
+            stats.errors += status_code >= 500
+            stats.rate.add(now)
+            stats.latency.observe(seconds)
+            self._requests.add(now)
+
+    def record_scoring(self, rows: int, seconds: float):
+        """One model call over `rows` rows"""
+        with self._lock:
+            self._scoring_calls += 1
+            self._scored_rows += rows
+            self._scoring_rows_rate.add(time.time(), rows)
+            self._scoring_latency.observe(seconds)
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            return {
+                "uptime_seconds": round(now - self.started, 1),
+                "rate_window_seconds": self.window_seconds,
+                "requests": {
+                    "total": sum(s.requests for s in self._routes.values()),
+                    "per_second": round(self._requests.rate(now), 3),
+                    "routes": {route: {
+                        "requests": s.requests,
+                        "errors": s.errors,
+                        "per_second": round(s.rate.rate(now), 3),
+                        "latency": s.latency.as_dict(),
+                    } for route, s in sorted(self._routes.items())},
+                },
+                "scoring": {
+                    "calls": self._scoring_calls,
+                    "rows": self._scored_rows,
+                    "rows_per_second": round(self._scoring_rows_rate.rate(now), 3),
+                    "latency": self._scoring_latency.as_dict(),
+                },
+            }
+
+# Global counters instance
+service_metrics = ServiceMetrics.from_env()
+
+class TimedRoute(APIRoute):
+    """
+    Route class recording every request's status and latency in service_metrics, keyed
+    by method and path template. Used as APIRouter(route_class=TimedRoute).
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        route = f"{','.join(sorted(self.methods))} {self.path}"
+
+        async def timed_handler(request):
+            start = time.perf_counter()
+            status_code = 500
+            try:
+                response = await handler(request)
+                status_code = response.status_code
+                return response
+            except HTTPException as e:
+                status_code = e.status_code
+                raise
+            except RequestValidationError:
+                status_code = 422
+                raise
+            finally:
+                service_metrics.record_request(route, status_code, time.perf_counter() - start)
+
+        return timed_handler
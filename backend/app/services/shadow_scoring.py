@@ -0,0 +1,333 @@
+"""
+Shadow (champion/challenger) scoring
+
+Challenger models score the same preprocessed frames as the served (champion) model,
+off the response path. Frames are queued without blocking; a collector thread pickles
+each frame as it arrives and hands whatever accumulated to a single worker process,
+which assembles the batch, scores it with one predict_proba call per challenger and
+appends the rows to an NDJSON evaluation log in one write per batch. Challengers that
+are bare estimators (no preprocessing pipeline of their own) score the champion
+preprocessor's output instead of the raw frame.
+
+The server process only ever does a few hundred microseconds of work per frame, so the
+collector never holds the GIL long enough to delay a request. The worker runs under
+SCHED_IDLE where available (otherwise reniced), so it gets the CPU only when the server
+does not want it; when the CPU is saturated the queue fills and frames are dropped.
+"""
+
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .model_registry import MODELS_DIR, MODEL_FILE
+
+SHADOW_LOG_PATH = "backend/ml_pipeline/logs/shadow_evaluations.ndjson"
+
+# Batch latencies kept per model for the percentiles in stats()
+LATENCY_WINDOW = 1000
+
+# Challenger models and the champion preprocessor, loaded once per worker process by _init_worker
+_challengers = {}
+_preprocessed = set()
+_preprocessor = None
+
+def _init_worker(challenger_paths: Dict[str, str], preprocessor, preprocessed: List[str], niceness: int):
+    import joblib
+    global _preprocessor
+
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+    if hasattr(os, "sched_setscheduler"):
+        try:
+            os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        except OSError:
+            pass  # Keep the niceness
+    for name, path in challenger_paths.items():
+        _challengers[name] = joblib.load(path)
+    _preprocessed.update(preprocessed)
+    _preprocessor = preprocessor
+
+def challenger_input(model, frame: pd.DataFrame, preprocessor=None) -> str:
+    """
+    How `model` scores a served frame: "frame" if it takes the frame as is, "preprocessed"
+    if it takes the champion preprocessor's output. Raises ValueError if neither works.
+    """
+    try:
+        model.predict_proba(frame)
+        return "frame"
+    except Exception as e:
+        error = e
+    if preprocessor is not None:
+        try:
+            model.predict_proba(preprocessor.transform(frame))
+            return "preprocessed"
+        except Exception as e:
+            error = e
+    raise ValueError(f"{type(error).__name__}: {error}")
+
+def _score_challengers(items: List[Tuple], log_path: Optional[str]) -> Dict:
+    """
+    (challenger PDs, seconds, error) per challenger over the (pickled frame, champion PDs,
+    champion version, timestamp) items; a failing challenger reports its error and logs
+    nulls without stopping the others. Rows are appended to log_path.
+    """
+    frame = pd.concat([pickle.loads(blob) for blob, _, _, _ in items], ignore_index=True)
+    log = pd.DataFrame({
+        "scored_at": np.concatenate([np.full(len(pd_values), ts) for _, pd_values, _, ts in items]),
+        "champion_version": np.concatenate([np.full(len(pd_values), version, dtype=object)
+                                            for _, pd_values, version, _ in items]),
+        "champion_pd": np.concatenate([pd_values for _, pd_values, _, _ in items]),
+    })
+    results = {}
+    transformed = None
+    for name, model in _challengers.items():
+        start = time.perf_counter()
+        try:
+            if name in _preprocessed:
+                if transformed is None:
+                    transformed = _preprocessor.transform(frame)
+                challenger_pd = model.predict_proba(transformed)[:, 1]
+            else:
+                challenger_pd = model.predict_proba(frame)[:, 1]
+        except Exception as e:
+            results[name] = (None, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+            log[f"{name}_pd"] = np.nan
+            continue
+        results[name] = (challenger_pd, time.perf_counter() - start, None)
+        log[f"{name}_pd"] = challenger_pd
+    if log_path:
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+        with open(log_path, "a") as f:
+            pd.concat([log, frame], axis=1).to_json(f, orient="records", lines=True)
+    return results
+
+class _ModelStats:
+    """Agreement with the champion and scoring latency of one model"""
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.agreements = 0
+        self.abs_diff_sum = 0.0
+        self.max_abs_diff = 0.0
+        self.seconds = 0.0
+        self.errors = 0
+        self.last_error = None
+        self.latencies_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, rows: int, seconds: float, agreements: int = 0, abs_diff: Optional[np.ndarray] = None):
+        self.rows += rows
+        self.batches += 1
+        self.seconds += seconds
+        self.latencies_ms.append(seconds * 1000)
+        if abs_diff is not None and len(abs_diff):
+            self.agreements += agreements
+            self.abs_diff_sum += float(abs_diff.sum())
+            self.max_abs_diff = max(self.max_abs_diff, float(abs_diff.max()))
+
+    def as_dict(self, compare: bool) -> dict:
+        latencies = np.fromiter(self.latencies_ms, dtype=float)
+        stats = {
+            "rows": self.rows,
+            "batches": self.batches,
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3) if len(latencies) else 0.0,
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3) if len(latencies) else 0.0,
+            "latency_ms_per_row": round(self.seconds * 1000 / self.rows, 4) if self.rows else 0.0,
+        }
+        if compare:
+            stats.update({
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "agreement_rate": round(self.agreements / self.rows, 4) if self.rows else 0.0,
+                "mean_abs_pd_diff": round(self.abs_diff_sum / self.rows, 6) if self.rows else 0.0,
+                "max_abs_pd_diff": round(self.max_abs_diff, 6),
+            })
+        return stats
+
+class ShadowScorer:
+    """
+    Scores queued frames with every challenger in `challenger_paths` (name -> joblib
+    file of a model with predict_proba). Challengers named in `preprocessed` score
+    `preprocessor.transform(frame)`, the rest the frame itself (see challenger_input).
+    Agreement means the challenger's PD lands in
+    the same recommendation band (per `recommend`) as the champion's.
+    At most `max_pending` frames wait in the queue; beyond that frames are dropped
+    and counted rather than slowing the caller down.
+    """
+
+    def __init__(self, challenger_paths: Dict[str, str], recommend: Callable, log_path: Optional[str] = SHADOW_LOG_PATH,
+                 preprocessor=None, preprocessed: Iterable[str] = (), max_pending: int = 1000, batch_rows: int = 256,
+                 flush_interval: float = 1.0, niceness: int = 10):
+        self.challengers = dict(challenger_paths)
+        self.preprocessed = sorted(set(preprocessed) & set(self.challengers))
+        if self.preprocessed and preprocessor is None:
+            raise ValueError(f"Challengers {self.preprocessed} need the champion preprocessor")
+        self.recommend = recommend
+        self.log_path = log_path
+        self.batch_rows = max(1, batch_rows)
+        self.flush_interval = max(0.0, flush_interval)
+        self._queue = queue.Queue(maxsize=max(1, max_pending))
+        self._lock = threading.Lock()
+        self._champion = _ModelStats()
+        self._stats = {name: _ModelStats() for name in self.challengers}
+        self._dropped = 0
+        self._logged = 0
+        self._errors = 0
+        self._pool = None
+        if self.enabled:
+            # Spawned, not forked: the server process is multi-threaded
+            self._pool = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker, initargs=(self.challengers, preprocessor, self.preprocessed, niceness),
+            )
+            threading.Thread(target=self._run, name="shadow-scoring", daemon=True).start()
+
+    @classmethod
+    def from_env(cls, service) -> "ShadowScorer":
+        """
+        Challengers listed in SHADOW_MODELS (comma-separated registry versions or file
+        names in the models directory; empty disables shadow scoring), logging to
+        SHADOW_LOG_PATH and batched by SHADOW_BATCH_ROWS / SHADOW_FLUSH_SECONDS.
+        Challengers that cannot score the served frame are skipped with a warning.
+        """
+        names = filter(None, (n.strip() for n in os.getenv("SHADOW_MODELS", "").split(",")))
+        challengers, preprocessed = resolve_challengers(names, service)
+        return cls(
+            challengers, service.generate_recommendations,
+            log_path=os.getenv("SHADOW_LOG_PATH", SHADOW_LOG_PATH),
+            preprocessor=service.active.preprocessor if service.active else None,
+            preprocessed=preprocessed,
+            max_pending=int(os.getenv("SHADOW_MAX_PENDING", 1000)),
+            batch_rows=int(os.getenv("SHADOW_BATCH_ROWS", 256)),
+            flush_interval=float(os.getenv("SHADOW_FLUSH_SECONDS", 1.0)),
+            niceness=int(os.getenv("SHADOW_NICENESS", 10)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.challengers)
+
+    def submit(self, df: pd.DataFrame, champion_pd: np.ndarray, champion_version: str, champion_seconds: float):
+        """Queue a scored frame for the challengers; never blocks"""
+        if not self.enabled or not len(df):
+            return
+        with self._lock:
+            self._champion.record(len(df), champion_seconds)
+        try:
+            self._queue.put_nowait((df, np.asarray(champion_pd, dtype=float), champion_version, time.time()))
+        except queue.Full:
+            with self._lock:
+                self._dropped += len(df)
+
+    def drain(self):
+        """Block until every queued frame has been scored and logged"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            items, taken, failed = [], 0, 0
+            rows, deadline = 0, None
+            while rows < self.batch_rows:
+                try:
+                    if deadline is None:
+                        item = self._queue.get()
+                        deadline = time.monotonic() + self.flush_interval
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                taken += 1
+                # Pickled one frame at a time, so no request waits on a batch-sized GIL hold
+                try:
+                    df, pd_values, version, ts = item
+                    items.append((pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL), pd_values, version, ts))
+                    rows += len(pd_values)
+                except Exception as e:
+                    print(f"⚠️ Warning: Shadow scoring skipped a frame: {e}")
+                    failed += 1
+            try:
+                if items:
+                    self._evaluate(items, rows)
+            except Exception as e:
+                print(f"⚠️ Warning: Shadow scoring failed: {e}")
+                failed += 1
+            finally:
+                with self._lock:
+                    self._errors += failed
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    def _evaluate(self, items, rows):
+        results = self._pool.submit(_score_challengers, items, self.log_path).result()
+        champion_pd = np.concatenate([pd_values for _, pd_values, _, _ in items])
+
+        champion_rec = self.recommend(champion_pd)
+        with self._lock:
+            for name, (challenger_pd, seconds, error) in results.items():
+                if error is not None:
+                    stats = self._stats[name]
+                    if not stats.errors:
+                        print(f"⚠️ Warning: Shadow model {name} failed to score: {error}")
+                    stats.errors += 1
+                    stats.last_error = error
+                    continue
+                agreements = int(np.count_nonzero(self.recommend(challenger_pd) == champion_rec))
+                self._stats[name].record(rows, seconds, agreements, np.abs(challenger_pd - champion_pd))
+            self._logged += rows if self.log_path else 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "pending_frames": self._queue.qsize(),
+                "dropped_rows": self._dropped,
+                "logged_rows": self._logged,
+                "errors": self._errors,
+                "champion": self._champion.as_dict(compare=False),
+                "challengers": {name: stats.as_dict(compare=True) for name, stats in self._stats.items()},
+            }
+
+def resolve_challengers(names: Iterable[str], service) -> Tuple[Dict[str, str], List[str]]:
+    """
+    (name -> model file, names scored on preprocessed input) for the registry versions or
+    model-directory files in `names` that can score a frame of the active model. Each is
+    loaded and tried once on the warm-up application; unusable ones are skipped with a warning.
+    """
+    names = list(names)
+    if not names:
+        return {}, []
+    import joblib
+    from .credit_service import WARMUP_APPLICATION
+
+    preprocessor = service.active.preprocessor if service.active else None
+    probe = service.preprocess_batch([WARMUP_APPLICATION])
+    challengers, preprocessed = {}, []
+    for name in names:
+        if service.registry.has_version(name):
+            path = os.path.join(service.registry.version_dir(name), MODEL_FILE)
+        elif os.path.exists(os.path.join(MODELS_DIR, name)):
+            path, name = os.path.join(MODELS_DIR, name), os.path.splitext(name)[0]
+        else:
+            print(f"⚠️ Warning: Shadow model {name} not found in the registry or {MODELS_DIR}")
+            continue
+        try:
+            mode = challenger_input(joblib.load(path), probe, preprocessor)
+        except Exception as e:
+            print(f"⚠️ Warning: Shadow model {name} skipped, it cannot score served applications: {e}")
+            continue
+        challengers[name] = path
+        if mode == "preprocessed":
+            preprocessed.append(name)
+    return challengers, preprocessed
@@ -0,0 +1,210 @@
+"""
+Per-request TreeSHAP explanations for the calibrated XGBoost pipeline
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+# Explanations stored per evaluation, largest |contribution| first
+TOP_K_FEATURES = 8
+
+class _FoldEncoder:
+    """
+    NumPy re-implementation of one fold's fitted ColumnTransformer
+    (StandardScaler on numerics, OneHotEncoder(handle_unknown='ignore') on categoricals).
+    Same output as transform(), blocks in transformers_ order, without its per-call
+    overhead on small frames. Any other transformer or encoder option raises ValueError.
+    """
+
+    def __init__(self, column_transformer):
+        self.numeric_columns, self.categorical = [], []
+        self.blocks = []  # ("numeric", slice into numeric_columns) or ("categorical", index into categorical)
+        means, scales = [], []
+        for name, transformer, columns in column_transformer.transformers_:
+            if transformer == "drop" or not len(columns):
+                continue
+            if name == "remainder" or transformer == "passthrough":
+                raise ValueError(f"Unsupported passthrough columns {list(columns)}")
+            if hasattr(transformer, "categories_"):
+                self._check_one_hot(transformer)
+                for column, categories in zip(columns, transformer.categories_):
+                    self.blocks.append(("categorical", len(self.categorical)))
+                    self.categorical.append((column, np.asarray(categories, dtype=object), pd.isna(categories)))
+            elif type(transformer).__name__ == "StandardScaler":
+                start = len(self.numeric_columns)
+                self.numeric_columns.extend(columns)
+                self.blocks.append(("numeric", slice(start, len(self.numeric_columns))))
+                means.append(transformer.mean_ if transformer.with_mean else np.zeros(len(columns)))
+                scales.append(transformer.scale_ if transformer.with_std else np.ones(len(columns)))
+            else:
+                raise ValueError(f"Unsupported transformer {transformer!r}")
+        self.mean = np.concatenate(means) if means else np.zeros(0)
+        self.scale = np.concatenate(scales) if scales else np.ones(0)
+
+    @staticmethod
+    def _check_one_hot(encoder):
+        if type(encoder).__name__ != "OneHotEncoder":
+            raise ValueError(f"Unsupported categorical encoder {encoder!r}")
+        if encoder.handle_unknown != "ignore":
+            raise ValueError(f"Unsupported OneHotEncoder handle_unknown={encoder.handle_unknown!r}")
+        if getattr(encoder, "drop_idx_", None) is not None:
+            raise ValueError("Unsupported OneHotEncoder drop")
+        if getattr(encoder, "min_frequency", None) is not None or getattr(encoder, "max_categories", None) is not None:
+            raise ValueError("Unsupported OneHotEncoder infrequent categories")
+
+    def check(self, column_transformer, df: pd.DataFrame):
+        """Raise ValueError unless transform(df) equals the ColumnTransformer's own output"""
+        expected = column_transformer.transform(df)
+        expected = expected.toarray() if hasattr(expected, "toarray") else np.asarray(expected, dtype=float)
+        actual = self.transform(df)
+        if actual.shape != expected.shape or not np.array_equal(actual, expected):
+            raise ValueError("Encoding differs from the fitted ColumnTransformer")
+
+    @staticmethod
+    def columns(df: pd.DataFrame, numeric_columns, categorical_columns):
+        """Pull the input columns out of the frame once, to be shared by every fold"""
+        # Column-by-column is much cheaper than df[list] on request-sized frames
+        numeric = np.column_stack([np.asarray(df[column].to_numpy(), dtype=float) for column in numeric_columns]
+                                  or [np.zeros((len(df), 0))])
+        categorical = {}
+        for column in categorical_columns:
+            values = df[column].to_numpy(dtype=object)
+            categorical[column] = (values, pd.isna(values))
+        return numeric, categorical
+
+    def transform_columns(self, numeric: np.ndarray, categorical: Dict) -> np.ndarray:
+        scaled = (numeric - self.mean) / self.scale
+        blocks = []
+        for kind, where in self.blocks:
+            if kind == "numeric":
+                blocks.append(scaled[:, where])
+                continue
+            column, categories, category_missing = self.categorical[where]
+            values, missing = categorical[column]
+            hot = (values[:, None] == categories[None, :]) & ~missing[:, None]
+            hot[:, category_missing] = missing[:, None]
+            blocks.append(hot)
+        return np.hstack(blocks).astype(float)
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        return self.transform_columns(*self.columns(df, self.numeric_columns, [c for c, _, _ in self.categorical]))
+
+def probe_frame(column_transformer, rows: int = 64) -> pd.DataFrame:
+    """
+    Inputs exercising a fitted ColumnTransformer: numerics spread around each scaler's
+    mean, every known category plus an unseen one, for checking re-implementations of it.
+    """
+    rng = np.random.default_rng(0)
+    columns = {column: np.zeros(rows) for column in getattr(column_transformer, "feature_names_in_", [])}
+    for name, transformer, names in column_transformer.transformers_:
+        if transformer == "drop":
+            continue
+        if hasattr(transformer, "categories_"):
+            for column, categories in zip(names, transformer.categories_):
+                values = [value for value in categories if not pd.isna(value)]
+                if all(isinstance(value, str) for value in values):
+                    values.append("__unseen__")  # handle_unknown='ignore' path
+                columns[column] = np.array([values[i % len(values)] for i in range(rows)], dtype=object)
+        else:
+            mean = getattr(transformer, "mean_", None)
+            scale = getattr(transformer, "scale_", None)
+            for i, column in enumerate(names):
+                center = mean[i] if mean is not None else 0.0
+                spread = scale[i] if scale is not None else 1.0
+                columns[column] = center + spread * rng.normal(0, 2, rows)
+    return pd.DataFrame(columns)
+
+def _raw_feature_groups(column_transformer):
+    """Raw input column for every transformed column, in output order"""
+    groups = []
+    for name, transformer, columns in column_transformer.transformers_:
+        if name == "remainder" or transformer == "drop":
+            continue
+        if hasattr(transformer, "categories_"):
+            for column, categories in zip(columns, transformer.categories_):
+                groups.extend([column] * len(categories))
+        else:
+            groups.extend(columns)
+    return groups
+
+class TreeShapExplainer:
+    """
+    Exact TreeSHAP contributions from XGBoost's native pred_contribs.
+    Each CalibratedClassifierCV fold is explained in log-odds space and the folds are
+    averaged; one-hot columns are summed back onto the raw input feature they encode.
+    Isotonic calibration is monotone, so contribution signs carry over to the PD.
+    """
+
+    def __init__(self, folds, raw_features: List[str], group_matrices):
+        self.folds = folds
+        self.raw_features = raw_features
+        self.group_matrices = group_matrices
+
+    @classmethod
+    def from_model(cls, model) -> "TreeShapExplainer":
+        """
+        Unwrap CalibratedClassifierCV -> Pipeline(preprocessor, XGBClassifier) -> Booster.
+        Raises ValueError if a fold's preprocessor cannot be reproduced exactly.
+        """
+        folds, raw_features, group_matrices = [], None, []
+        for calibrated in model.calibrated_classifiers_:
+            pipeline = calibrated.estimator
+            preprocessor = pipeline.named_steps["preprocessor"]
+            booster = pipeline.named_steps["classifier"].get_booster()
+            groups = _raw_feature_groups(preprocessor)
+            if raw_features is None:
+                raw_features = list(dict.fromkeys(groups))
+            index = {feature: i for i, feature in enumerate(raw_features)}
+            matrix = np.zeros((len(groups), len(raw_features)))
+            matrix[np.arange(len(groups)), [index[g] for g in groups]] = 1.0
+            encoder = _FoldEncoder(preprocessor)
+            encoder.check(preprocessor, probe_frame(preprocessor))
+            folds.append((encoder, booster))
+            group_matrices.append(matrix)
+        return cls(folds, raw_features, group_matrices)
+
+    def _inputs(self, df: pd.DataFrame):
+        first = self.folds[0][0]
+        return _FoldEncoder.columns(df, first.numeric_columns, [c for c, _, _ in first.categorical])
+
+    def contributions(self, df: pd.DataFrame, inputs=None):
+        """(per raw feature contributions [n, features], base value [n]) in log-odds"""
+        numeric, categorical = inputs or self._inputs(df)
+        total = np.zeros((len(df), len(self.raw_features)))
+        base = np.zeros(len(df))
+        for (encoder, booster), matrix in zip(self.folds, self.group_matrices):
+            X = encoder.transform_columns(numeric, categorical)
+            contribs = booster.predict(xgb.DMatrix(X, nthread=1), pred_contribs=True, validate_features=False)
+            total += contribs[:, :-1] @ matrix
+            base += contribs[:, -1]
+        return total / len(self.folds), base / len(self.folds)
+
+    def explain(self, df: pd.DataFrame, top_k: int = TOP_K_FEATURES) -> List[List[Dict]]:
+        """Top-k raw features per row, shaped like the API's feature_importance entries"""
+        inputs = self._inputs(df)
+        contributions, _ = self.contributions(df, inputs)
+        order = np.argsort(-np.abs(contributions), axis=1, kind="stable")[:, :top_k]
+        
+        # Raw values to report next to each contribution
+        numeric, categorical = inputs
+        values = dict(zip(self.folds[0][0].numeric_columns, numeric.T.tolist()))
+        values.update({column: pair[0].tolist() for column, pair in categorical.items()})
+        explanations = []
+        for i in range(len(df)):
+            row = []
+            for j in order[i]:
+                feature = self.raw_features[j]
+                value = values[feature][i]
+                contribution = float(contributions[i, j])
+                row.append({
+                    'feature': feature,
+                    'importance': round(abs(contribution), 4),
+                    'contribution': round(contribution, 4),
+                    'value': float(value) if isinstance(value, (int, float, np.number)) else str(value),
+                    'reason': 'Raises default risk' if contribution > 0 else 'Lowers default risk'
+                })
+            explanations.append(row)
+        return explanations
@@ -0,0 +1,102 @@
+"""
+Event-loop responsiveness under inference load.
+Measures GET /api/evaluations/{id} latency on its own, then again while
+--clients concurrent callers keep POST /api/predict/ saturated.
+Runs in-process over ASGI against a throwaway SQLite database.
+
+    python backend/benchmarks/async_inference_benchmark.py --clients 32 --seconds 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import httpx
+from fastapi import FastAPI
+
+from app.api import evaluations, predict
+from app.models.database import Base, engine, SessionLocal
+from app.models.models import Application, Evaluation
+
+APPLICATION = {
+    "business_type": "Manufacturing", "years_in_operation": 10, "annual_revenue": 5000000,
+    "monthly_cashflow": 300000, "loan_amount_requested": 2000000, "credit_score": 720,
+    "existing_loans": 2, "debt_to_income_ratio": 0.45, "collateral_value": 3000000,
+    "repayment_history": "Good", "loan_tenure_months": 36
+}
+
+def seed_evaluation():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    application = Application(applicant_id="APP000001", **{k: v for k, v in APPLICATION.items()})
+    db.add(application)
+    db.flush()
+    evaluation = Evaluation(application_id=application.id, risk_score=20.0, default_probability=0.2,
+                            recommendation="approve", confidence_score=0.6,
+                            model_version="bench", feature_importance="[]")
+    db.add(evaluation)
+    db.commit()
+    evaluation_id = evaluation.id
+    db.close()
+    return evaluation_id
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+async def probe(client, evaluation_id, seconds):
+    """Sequential reads of one evaluation, one every 5 ms"""
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(f"/api/evaluations/{evaluation_id}")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+    return latencies
+
+async def hammer(client, stop, counts):
+    while not stop.is_set():
+        response = await client.post("/api/predict/", json=APPLICATION)
+        counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+def report(label, latencies):
+    print(f"{label:<22} n={len(latencies):<6} p50 {percentile(latencies, 0.50) * 1000:7.2f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Event-loop responsiveness under inference load")
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(evaluations.router)
+    app.include_router(predict.router)
+    evaluation_id = seed_evaluation()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/predict/", json=APPLICATION)  # Warm up the model
+        report("idle", await probe(client, evaluation_id, args.seconds / 2))
+
+        stop, counts = asyncio.Event(), {}
+        workers = [asyncio.create_task(hammer(client, stop, counts)) for _ in range(args.clients)]
+        start = time.perf_counter()
+        latencies = await probe(client, evaluation_id, args.seconds)
+        stop.set()
+        await asyncio.gather(*workers)
+        elapsed = time.perf_counter() - start
+        report(f"{args.clients} predict clients", latencies)
+
+    print(f"predict responses: {counts} ({sum(counts.values()) / elapsed:.0f}/s)")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+Per-call latency of the compiled scorer (model.CompiledLogisticScorer) against the
+fitted LogisticRegression's predict_proba, single-row and batched, after checking
+that both return bit-identical probabilities on the training data.
+
+    python backend/benchmarks/compiled_scorer_benchmark.py --calls 20000 --batch 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from model import CompiledLogisticScorer, encode_features, ARTIFACT_DIR, TRAINING_DATA_PATH, read_manifest
+
+def per_call(fn, inputs):
+    start = time.perf_counter()
+    for x in inputs:
+        fn(x)
+    return (time.perf_counter() - start) / len(inputs)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiled scorer latency benchmark")
+    parser.add_argument('--calls', type=int, default=20_000, help="Single-row calls timed per scorer")
+    parser.add_argument('--batch', type=int, default=1_000, help="Rows per batched call")
+    args = parser.parse_args()
+
+    import joblib
+
+    manifest = read_manifest(ARTIFACT_DIR)
+    model = joblib.load(os.path.join(ARTIFACT_DIR, manifest['model_file']))
+    scorer = (CompiledLogisticScorer.load(os.path.join(ARTIFACT_DIR, manifest['scorer_file']))
+              if manifest.get('scorer_file') else CompiledLogisticScorer.from_model(model))
+
+    X = encode_features(pd.read_csv(TRAINING_DATA_PATH))
+    expected = model.predict_proba(X)[:, 1]
+    assert np.array_equal(scorer.score_batch(X), expected)
+    # A single row goes through a different matmul kernel than a batch, so compare like with like
+    sample = X[:2_000]
+    assert np.array_equal([scorer.score_one(x) for x in sample], [model.predict_proba(x.reshape(1, -1))[0][1] for x in sample])
+    print(f"✅ Probabilities bit-identical to predict_proba on {len(X):,} training rows (batched and single-row)")
+
+    rows = [X[i % len(X)].reshape(1, -1) for i in range(args.calls)]
+    t_sklearn = per_call(lambda x: model.predict_proba(x)[0][1], rows)
+    t_scorer = per_call(scorer.score_one, rows)
+    print(f"single row   predict_proba {t_sklearn * 1e6:8.1f} µs   compiled {t_scorer * 1e6:8.1f} µs"
+          f"   {t_sklearn / t_scorer:5.1f}x")
+
+    batch = X[np.arange(args.batch) % len(X)]
+    batches = [batch] * max(args.calls // args.batch, 20)
+    t_sklearn = per_call(lambda b: model.predict_proba(b)[:, 1], batches)
+    t_scorer = per_call(scorer.score_batch, batches)
+    print(f"{args.batch:,}-row batch predict_proba {t_sklearn * 1e6:8.1f} µs   compiled {t_scorer * 1e6:8.1f} µs"
+          f"   {t_sklearn / t_scorer:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Throughput of backend/generate_dataset.py, and a distribution check of its output
+against the committed reference dataset (backend/data/synthetic_credit_data.csv).
+
+The check compares marginals of a fresh 5,000-row sample with the reference:
+mean and standard deviation of every numeric column (within --tolerance standard
+errors), category frequencies (within 3 percentage points), and the default rate.
+The reference was generated when the collateral-coverage bonus used the last row's
+coverage for every row; now each row uses its own, so default_probability_true is
+expected to sit a few points off the reference. Any other statistic out of
+tolerance fails the run with a non-zero exit status.
+
+    python backend/benchmarks/dataset_generator_benchmark.py --rows 100000 1000000 10000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from generate_dataset import generate_dataset, generate_records
+
+REFERENCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'synthetic_credit_data.csv')
+# Columns known to differ from the reference (see the module docstring)
+EXPECTED_SHIFTS = {'default_probability_true'}
+
+def compare_marginals(reference, sample, tolerance):
+    """Rows of (column, statistic, reference, sample, ok)"""
+    rows = []
+    for column in reference.columns:
+        if column == 'applicant_id':
+            continue
+        ref, new = reference[column], sample[column]
+        if pd.api.types.is_numeric_dtype(ref):
+            # Heavy-tailed columns are compared on log scale
+            if ref.min() >= 0 and ref.max() > 1000:
+                ref, new = np.log1p(ref), np.log1p(new.clip(lower=0))
+            se = ref.std() * np.sqrt(1 / len(ref) + 1 / len(new))
+            rows.append((column, 'mean', ref.mean(), new.mean(), abs(ref.mean() - new.mean()) <= tolerance * se))
+            ratio = new.std() / ref.std() if ref.std() else 1.0
+            rows.append((column, 'std', ref.std(), new.std(), abs(ratio - 1) <= 0.1))
+        else:
+            ref_freq = ref.value_counts(normalize=True)
+            new_freq = new.value_counts(normalize=True).reindex(ref_freq.index, fill_value=0)
+            worst = (ref_freq - new_freq).abs().idxmax()
+            rows.append((column, f'freq {worst}', ref_freq[worst], new_freq[worst],
+                         abs(ref_freq[worst] - new_freq[worst]) <= 0.03))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic dataset generator benchmark")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--tolerance', type=float, default=4.0, help="Allowed mean difference in standard errors")
+    args = parser.parse_args()
+
+    reference = pd.read_csv(REFERENCE, keep_default_na=False)  # 'None' is a collateral type
+    sample = generate_records(np.random.default_rng(42), len(reference))
+    rows = compare_marginals(reference, sample, args.tolerance)
+    print(f"{'column':<26}{'statistic':<28}{'reference':>12}{'generated':>12}")
+    for column, stat, ref, new, ok in rows:
+        note = '' if ok or column not in EXPECTED_SHIFTS else ' (expected shift)'
+        print(f"{column:<26}{stat:<28}{ref:>12.4f}{new:>12.4f}  {'✅' if ok else '⚠️'}{note}")
+    failed = [r for r in rows if not r[4]]
+    unexpected = [r for r in failed if r[0] not in EXPECTED_SHIFTS]
+    print(f"{len(rows) - len(failed)}/{len(rows)} statistics within tolerance\n")
+    if unexpected:
+        names = ', '.join(f"{column} {stat}" for column, stat, *_ in unexpected)
+        sys.exit(f"⚠️ Generated data drifted from the reference: {names}")
+
+    print(f"{'rows':>12}  {'generate rows/s':>16}  {'with CSV rows/s':>16}")
+    for n in args.rows:
+        start = time.perf_counter()
+        generate_records(np.random.default_rng(0), min(n, 1_000_000))
+        in_memory = min(n, 1_000_000) / (time.perf_counter() - start)
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            generate_dataset(n, output_dir=tmp)
+            to_disk = n / (time.perf_counter() - start)
+        print(f"{n:>12,}  {in_memory:>16,.0f}  {to_disk:>16,.0f}")
+
+if __name__ == "__main__":
+    main()
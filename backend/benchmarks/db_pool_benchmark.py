@@ -0,0 +1,128 @@
+"""
+Load benchmark: connection-per-request vs the pooled db_connection() layer.
+Runs against an in-process stand-in with simulated handshake/query latency,
+or against a real Postgres (DATABASE_URL) with --postgres.
+
+    python backend/benchmarks/db_pool_benchmark.py --threads 32 --requests 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from psycopg2 import extensions
+from db import ConnectionPool, get_db_connection
+
+class StandInConnection:
+    """Mimics the psycopg2 connection surface used by the pool and the routes"""
+
+    def __init__(self, handshake_s, query_s):
+        time.sleep(handshake_s)  # TCP + auth handshake
+        self.query_s = query_s
+        self.closed = 0
+
+    def cursor(self):
+        return StandInCursor(self)
+
+    def get_transaction_status(self):
+        return extensions.TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+class StandInCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def execute(self, sql, params=None):
+        time.sleep(self.conn.query_s)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def run(label, handler, threads, requests):
+    latencies = []
+    lock = threading.Lock()
+
+    def one(_):
+        start = time.perf_counter()
+        handler()
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(one, range(requests)))
+    wall = time.perf_counter() - start
+
+    print(f"{label:<12} {requests / wall:>9.0f} req/s   "
+          f"p50 {percentile(latencies, 0.50) * 1000:7.2f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--pool-min', type=int, default=2)
+    parser.add_argument('--pool-max', type=int, default=16)
+    parser.add_argument('--handshake-ms', type=float, default=8.0)
+    parser.add_argument('--query-ms', type=float, default=1.0)
+    parser.add_argument('--postgres', action='store_true', help="Use DATABASE_URL instead of the stand-in")
+    args = parser.parse_args()
+
+    if args.postgres:
+        connect = get_db_connection
+    else:
+        connect = lambda: StandInConnection(args.handshake_ms / 1000, args.query_ms / 1000)
+
+    def unpooled():
+        conn = connect()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT 1")
+            cur.fetchall()
+        finally:
+            cur.close()
+            conn.close()
+
+    pool = ConnectionPool(args.pool_min, args.pool_max, connect=connect)
+
+    def pooled():
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT 1")
+            cur.fetchall()
+
+    target = "postgres" if args.postgres else f"stand-in ({args.handshake_ms} ms handshake, {args.query_ms} ms query)"
+    print(f"{args.requests} requests, {args.threads} threads, {target}")
+    run("unpooled", unpooled, args.threads, args.requests)
+    run("pooled", pooled, args.threads, args.requests)
+    print(f"pool stats: {pool.stats()}")
+    pool.closeall()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Throughput of model.encode_features() on a DataFrame and on a list of dicts,
+against per-record preprocess() calls, at 1M rows by default. Outputs are checked
+against baseline_preprocess(), a frozen copy of the per-row preprocess() that
+encode_features() replaced, on the sample and on malformed records.
+
+    python backend/benchmarks/feature_encoder_benchmark.py --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from model import ml_service, encode_features, NUM_FEATURES, TRAINING_DATA_PATH
+
+# Records the old preprocess() handled specially (fallbacks, bad input -> zero row)
+EDGE_CASES = [
+    {},
+    {'amt_credit': 0, 'loanAmount': 500000},
+    {'fico_score': '', 'creditScore': '710'},
+    {'amt_income_total': 'n/a'},
+    {'amt_credit': [1]},
+    {'amt_credit': [1, 2], 'loanAmount': 5},
+    {'dti': {'value': 3}},
+    {'emp_length': None, 'yearsInBusiness': 12, 'term': 60, 'grade': 'G', 'home_ownership': 'MORTGAGE'},
+    {'amt_goods_price': float('nan'), 'name_contract_type': 'Revolving loans'},
+    {'amt_annuity': 10 ** 400},
+]
+
+def baseline_preprocess(data):
+    """The per-row CreditScoringModel.preprocess() before encode_features(), kept verbatim"""
+    try:
+        # 1. Parse Unified Inputs (Lending Club / Home Credit keys)
+        # Map legacy keys if present (for backward compat during migration)
+        income = float(data.get('amt_income_total') or data.get('annualRevenue', 0))
+        credit = float(data.get('amt_credit') or data.get('loanAmount', 0))
+        annuity = float(data.get('amt_annuity') or data.get('monthly_cashflow', 0)) # Rough proxy
+        goods_price = float(data.get('amt_goods_price') or data.get('collateral_value', 0))
+
+        days_employed = float(data.get('emp_length') or data.get('yearsInBusiness', 0))
+        fico = float(data.get('fico_score') or data.get('creditScore', 600))
+        dti = float(data.get('dti') or data.get('debt_to_income_ratio', 0))
+
+        term = data.get('term', '36 months')
+        grade = data.get('grade', 'C') # Default C
+        contract_type = data.get('name_contract_type', 'Cash loans')
+        ownership = data.get('home_ownership', 'RENT')
+
+        # 2. Normalization
+        norm_income = np.clip(income / 1000000, 0, 1)
+        norm_credit = np.clip(credit / 2000000, 0, 1)
+        norm_annuity = np.clip(annuity / 100000, 0, 1)
+        norm_goods = np.clip(goods_price / 2000000, 0, 1)
+
+        norm_days = np.clip(days_employed / 40, 0, 1) # 40 years max
+        norm_fico = np.clip((fico - 300) / (850 - 300), 0, 1)
+        norm_dti = np.clip(dti / 100, 0, 1) # DTI can be > 100% sometimes? Cap at 100
+
+        # 3. Encoding
+        term_60 = 1 if '60' in str(term) else 0
+
+        # Grade One-Hot
+        g_a = 1 if grade == 'A' else 0
+        g_b = 1 if grade == 'B' else 0
+        g_c = 1 if grade == 'C' else 0
+        g_d = 1 if grade == 'D' else 0
+        g_e = 1 if grade == 'E' else 0
+        g_f = 1 if grade == 'F' or grade == 'G' else 0
+
+        # Contract Type
+        t_cash = 1 if contract_type == 'Cash loans' else 0
+        t_rev = 1 if contract_type == 'Revolving loans' else 0
+
+        # Ownership
+        o_own = 1 if ownership == 'OWN' or ownership == 'MORTGAGE' else 0
+        o_rent = 1 if ownership == 'RENT' else 0
+
+        features = [
+            norm_income, norm_credit, norm_annuity, norm_goods,
+            norm_days, norm_fico, norm_dti, term_60,
+            g_a, g_b, g_c, g_d, g_e, g_f,
+            t_cash, t_rev,
+            o_own, o_rent
+        ]
+
+        return np.array([features])
+
+    except Exception as e:
+        return np.zeros((1, NUM_FEATURES))
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature encoder throughput benchmark")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--row-loop-sample', type=int, default=20_000,
+                        help="Rows timed through preprocess() one at a time (extrapolated)")
+    args = parser.parse_args()
+
+    seed = pd.read_csv(TRAINING_DATA_PATH)
+    df = seed.iloc[np.arange(args.rows) % len(seed)].reset_index(drop=True)
+    records = df.to_dict('records')
+    print(f"{args.rows:,} rows")
+
+    X_frame, t_frame = timed(lambda: encode_features(df))
+    print(f"encode_features(DataFrame):   {t_frame:7.2f} s   {args.rows / t_frame:>12,.0f} rows/s")
+
+    X_list, t_list = timed(lambda: encode_features(records))
+    print(f"encode_features(list[dict]):  {t_list:7.2f} s   {args.rows / t_list:>12,.0f} rows/s")
+
+    sample = records[:args.row_loop_sample]
+    X_rows, t_rows = timed(lambda: np.vstack([ml_service.preprocess(r) for r in sample]))
+    per_row = t_rows / len(sample)
+    print(f"preprocess() per record:      {per_row * args.rows:7.2f} s   {1 / per_row:>12,.0f} rows/s (extrapolated)")
+
+    expected = np.vstack([baseline_preprocess(r) for r in sample])
+    assert np.array_equal(X_frame, X_list, equal_nan=True)
+    assert np.array_equal(X_rows, expected, equal_nan=True)
+    assert np.array_equal(X_frame[:len(sample)], expected, equal_nan=True)
+    for record in EDGE_CASES:
+        assert np.array_equal(encode_features([record]), baseline_preprocess(record), equal_nan=True), record
+    assert np.array_equal(encode_features(EDGE_CASES), np.vstack([baseline_preprocess(r) for r in EDGE_CASES]),
+                          equal_nan=True)
+    print(f"✅ Outputs identical to the baseline preprocess() ({len(sample):,} rows, {len(EDGE_CASES)} edge cases); "
+          f"columnar speed-up {per_row * args.rows / t_frame:.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Server-side cost of GET /api/metrics/ as the dashboards poll it: re-reading
+metrics.json on every request and returning the dict for FastAPI to encode (the
+previous handler) against the cached, pre-serialised response, as a full 200 and
+as a 304 revalidation. Handlers are awaited directly so HTTP client overhead
+does not swamp the difference; one TestClient round trip checks the wiring.
+
+    python backend/benchmarks/metrics_endpoint_benchmark.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.api import metrics
+from app.services.metrics_cache import metrics_file
+
+async def uncached_handler():
+    """The previous handler, plus the encoding FastAPI applied to its return value"""
+    with open(metrics_file.path, "r") as f:
+        return JSONResponse(jsonable_encoder(json.load(f)))
+
+def per_request(handler, requests):
+    async def run():
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await handler()
+        return (time.perf_counter() - start) / requests, response
+    return asyncio.run(run())
+
+def main():
+    parser = argparse.ArgumentParser(description="Cached metrics endpoint benchmark")
+    parser.add_argument('--requests', type=int, default=20_000)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(metrics.router)
+    client = TestClient(app)
+    first = client.get('/api/metrics/')
+    etag = first.headers['etag']
+    assert client.get('/api/metrics/', headers={'If-None-Match': etag}).status_code == 304
+
+    t_uncached, old = per_request(uncached_handler, args.requests)
+    assert json.loads(old.body) == first.json()
+    t_cached, response = per_request(lambda: metrics.get_model_metrics(if_none_match=None), args.requests)
+    assert response.status_code == 200
+    t_304, response = per_request(lambda: metrics.get_model_metrics(if_none_match=etag), args.requests)
+    assert response.status_code == 304
+
+    print(f"json.load per request   {t_uncached * 1e6:8.1f} µs   {len(old.body):6,} bytes")
+    print(f"cached bytes (200)      {t_cached * 1e6:8.1f} µs   {len(first.content):6,} bytes   {t_uncached / t_cached:5.1f}x")
+    print(f"If-None-Match (304)     {t_304 * 1e6:8.1f} µs   {0:6,} bytes   {t_uncached / t_304:5.1f}x")
+    print(f"metrics file cache: {metrics_file.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Page latency of GET /api/applications/ at deep positions: `skip` (OFFSET) against
+`cursor` (keyset on created_at, id). Seeds a throwaway SQLite database with
+--rows applications (1M by default) and walks to each depth with cursors first.
+
+    python backend/benchmarks/pagination_benchmark.py --rows 1000000 --limit 50
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.api import applications
+from app.models.database import Base, engine
+from app.models.models import Application, ApplicationStatus
+
+def seed(rows, chunk=50_000):
+    Base.metadata.create_all(bind=engine)
+    start = datetime.datetime(2024, 1, 1)
+    statuses = [ApplicationStatus.PENDING, ApplicationStatus.EVALUATED]
+    with engine.begin() as conn:
+        for offset in range(0, rows, chunk):
+            conn.execute(insert(Application), [{
+                "applicant_id": f"APP{n:07d}", "business_type": "Trading", "years_in_operation": 5,
+                "annual_revenue": 5e6, "monthly_cashflow": 3e5, "loan_amount_requested": 2e6,
+                "credit_score": 700, "existing_loans": 1, "debt_to_income_ratio": 0.3,
+                "collateral_value": 1e6, "repayment_history": "Good", "status": random.choice(statuses),
+                # Several rows per second so the id tie-breaker matters
+                "created_at": start + datetime.timedelta(seconds=n // 4), "updated_at": start,
+            } for n in range(offset, min(rows, offset + chunk))])
+
+def timed_get(client, params, repeat=5):
+    best = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        response = client.get("/api/applications/", params=params)
+        response.raise_for_status()
+        best = min(best or 1e9, time.perf_counter() - t)
+    return response, best
+
+def main():
+    parser = argparse.ArgumentParser(description="OFFSET vs keyset page latency")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    t = time.perf_counter()
+    seed(args.rows)
+    print(f"Seeded {args.rows:,} applications in {time.perf_counter() - t:.1f} s")
+
+    app = FastAPI()
+    app.include_router(applications.router)
+    client = TestClient(app)
+
+    depths = [d for d in (0, 10_000, 100_000, 500_000, args.rows - 2 * args.limit) if 0 <= d < args.rows]
+    cursor, position = None, 0
+    print(f"{'depth':>10}  {'skip (OFFSET)':>14}  {'cursor':>10}")
+    for depth in depths:
+        # Walk to the depth with max-size cursor pages (not timed)
+        while position + applications.MAX_PAGE_SIZE <= depth:
+            params = {"limit": applications.MAX_PAGE_SIZE, **({"cursor": cursor} if cursor else {})}
+            cursor = client.get("/api/applications/", params=params).headers["X-Next-Cursor"]
+            position += applications.MAX_PAGE_SIZE
+        while position < depth:
+            step = min(args.limit, depth - position)
+            params = {"limit": step, **({"cursor": cursor} if cursor else {})}
+            cursor = client.get("/api/applications/", params=params).headers["X-Next-Cursor"]
+            position += step
+
+        by_offset, t_offset = timed_get(client, {"limit": args.limit, "skip": depth})
+        by_cursor, t_cursor = timed_get(client, {"limit": args.limit, **({"cursor": cursor} if cursor else {})})
+        assert [a["id"] for a in by_offset.json()] == [a["id"] for a in by_cursor.json()]
+        print(f"{depth:>10,}  {t_offset * 1000:>11.1f} ms  {t_cursor * 1000:>7.1f} ms")
+
+    print("✅ Both strategies return identical pages")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Throughput of concurrent POST /api/predict/ calls with micro-batching on and off
+(off = max_batch_size 1, i.e. one model call per request). Throughput counts 200s only;
+unbatched runs overflow the inference queue and shed load as 503s. Runs in-process over ASGI.
+
+    python backend/benchmarks/prediction_batcher_benchmark.py --clients 64 --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from fastapi import FastAPI
+
+from app.api import predict
+
+APPLICATION = {
+    "business_type": "Manufacturing", "years_in_operation": 10, "annual_revenue": 5000000,
+    "monthly_cashflow": 300000, "loan_amount_requested": 2000000, "credit_score": 720,
+    "existing_loans": 2, "debt_to_income_ratio": 0.45, "collateral_value": 3000000,
+    "repayment_history": "Good", "loan_tenure_months": 36
+}
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+async def run(client, clients, total):
+    latencies, counts = [], {}
+    remaining = iter(range(total))
+
+    async def worker():
+        for i in remaining:
+            start = time.perf_counter()
+            response = await client.post("/api/predict/", json=dict(APPLICATION, credit_score=300 + i % 550))
+            latencies.append(time.perf_counter() - start)
+            counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(clients)])
+    return latencies, counts, time.perf_counter() - start
+
+async def main():
+    parser = argparse.ArgumentParser(description="Micro-batching throughput benchmark")
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = FastAPI()
+    app.include_router(predict.router)
+    batcher = predict.prediction_batcher
+    configured = batcher.max_batch_size
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/predict/", json=APPLICATION)  # Warm up the model
+        for label, size in (("unbatched", 1), (f"batched (<= {configured})", configured)):
+            batcher.max_batch_size = size
+            before = batcher.stats()
+            latencies, counts, elapsed = await run(client, args.clients, args.requests)
+            after = batcher.stats()
+            mean_batch = (after["items"] - before["items"]) / max(1, after["batches"] - before["batches"])
+            print(f"{label:<20} {counts.get(200, 0) / elapsed:8.0f} ok/s   "
+                  f"p50 {percentile(latencies, 0.50) * 1000:7.2f} ms   p99 {percentile(latencies, 0.99) * 1000:7.2f} ms   "
+                  f"mean batch {mean_batch:5.1f}   {counts}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
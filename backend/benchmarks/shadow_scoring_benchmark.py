@@ -0,0 +1,102 @@
+"""
+Response latency of evaluate_application() with shadow scoring off and on.
+
+Requests arrive at a fixed --rate; with shadow scoring on, every scored frame is
+also queued for the challenger models (default: model_lr.joblib), which the
+background worker scores and logs in batches. Challengers that cannot score the
+served frame are skipped. Off and on alternate over --rounds rounds (the queue is
+drained after each "on" round) so drift in the host's speed does not read as shadow
+overhead. Prints pooled latency percentiles of both modes, then the shadow scorer's
+agreement and latency stats.
+
+    python backend/benchmarks/shadow_scoring_benchmark.py --requests 2000 --rate 50 --rounds 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.credit_service import credit_service, WARMUP_APPLICATION
+from app.services.shadow_scoring import ShadowScorer, resolve_challengers
+
+def run(applications, rate):
+    """Latency (ms) of each request, issued every 1/rate seconds"""
+    latencies = []
+    interval = 1 / rate
+    next_at = time.perf_counter()
+    for application in applications:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        start = time.perf_counter()
+        credit_service.evaluate_application(application)
+        latencies.append((time.perf_counter() - start) * 1000)
+        next_at += interval
+    return np.array(latencies)
+
+def summary(latencies):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return f"p50 {p50:6.2f} ms   p95 {p95:6.2f} ms   p99 {p99:6.2f} ms   mean {latencies.mean():6.2f} ms"
+
+def main():
+    parser = argparse.ArgumentParser(description="Shadow scoring latency benchmark")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rate', type=float, default=50, help="Requests per second")
+    parser.add_argument('--rounds', type=int, default=4, help="Alternating off/on rounds")
+    parser.add_argument('--challengers', nargs='+', default=['model_lr.joblib'],
+                        help="Registry versions or model files in the models directory")
+    args = parser.parse_args()
+
+    if credit_service.model is None:
+        sys.exit("No model loaded")
+    credit_service.prediction_cache.max_size = 0  # Every request reaches the model
+    rng = random.Random(0)
+    applications = [dict(WARMUP_APPLICATION, credit_score=rng.randint(300, 900), annual_revenue=rng.uniform(1e5, 5e7))
+                    for _ in range(args.requests)]
+    run(applications[:100], args.rate)  # Warm up
+
+    challengers, preprocessed = resolve_challengers(args.challengers, credit_service)
+    if not challengers:
+        sys.exit("No usable challenger models")
+    off = ShadowScorer({}, credit_service.generate_recommendations)
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'shadow.ndjson')
+        shadow = ShadowScorer(challengers, credit_service.generate_recommendations, log_path=log_path,
+                              preprocessor=credit_service.active.preprocessor, preprocessed=preprocessed)
+        shadow.submit(credit_service.preprocess_batch([WARMUP_APPLICATION]), [0.5], 'warm-up', 0.0)
+        shadow.drain()  # Worker process started and challengers loaded
+        baseline, shadowed = [], []
+        for chunk in np.array_split(np.arange(len(applications)), max(1, args.rounds)):
+            credit_service.shadow = off
+            baseline.append(run([applications[i] for i in chunk], args.rate))
+            credit_service.shadow = shadow
+            shadowed.append(run([applications[i] for i in chunk], args.rate))
+            shadow.drain()
+        baseline, shadowed = np.concatenate(baseline), np.concatenate(shadowed)
+        print(f"shadow off:  {summary(baseline)}")
+        print(f"shadow on:   {summary(shadowed)}")
+        logged = 0
+        if os.path.exists(log_path):  # Nothing is written if every batch failed
+            with open(log_path) as f:
+                logged = sum(1 for _ in f)
+
+    stats = shadow.stats()
+    print(f"p95 change {np.percentile(shadowed, 95) - np.percentile(baseline, 95):+.2f} ms, "
+          f"p99 change {np.percentile(shadowed, 99) - np.percentile(baseline, 99):+.2f} ms; "
+          f"{logged:,} rows logged, {stats['dropped_rows']} dropped, {stats['errors']} failed batches")
+    champion = stats['champion']
+    print(f"champion        {champion['latency_ms_p50']:8.3f} ms/call p50   {champion['latency_ms_per_row']:8.4f} ms/row")
+    for name, s in stats['challengers'].items():
+        print(f"{name:<15} {s['latency_ms_p50']:8.3f} ms/batch p50 over {s['batches']} batches   "
+              f"{s['latency_ms_per_row']:8.4f} ms/row   agreement {s['agreement_rate']:.1%}   "
+              f"mean |dPD| {s['mean_abs_pd_diff']:.4f}   errors {s['errors']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Flask worker cold-start benchmark.
+Each run is a fresh interpreter that imports backend/app.py (without serving)
+and reports how long that took, then the latency of the first prediction,
+which is where the model artifact is now loaded.
+
+The target is the absolute cold start, under 200 ms from a fresh interpreter to the
+first prediction served: the model is loaded lazily, so that load is part of it.
+It is not met: the import alone takes roughly 170-270 ms depending on machine load,
+and the first prediction adds roughly 60-100 ms. The dependency floor (Flask and the
+other web/DB libraries app.py cannot avoid) is printed to show app.py's own share.
+
+    python backend/benchmarks/startup_benchmark.py --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# Absolute cold start: app.py import plus the first prediction, in a fresh interpreter
+TARGET_COLD_START_MS = 200
+
+# backend/app/ (the FastAPI package) shadows app.py for `import app`, so load it by path
+PROBE = """
+import time, runpy
+start = time.perf_counter()
+flask_app = runpy.run_path('app.py', run_name='flask_worker')
+ready = time.perf_counter()
+flask_app['ml_service'].predict({'annualRevenue': 1200000, 'loanAmount': 400000, 'creditScore': 710})
+first = time.perf_counter()
+print((ready - start) * 1000, (first - ready) * 1000)
+"""
+
+# The third-party imports app.py cannot avoid
+FLOOR = """
+import time
+start = time.perf_counter()
+import flask, flask_cors, bcrypt, jwt, psycopg2, psycopg2.extras, dotenv
+print((time.perf_counter() - start) * 1000)
+"""
+
+def run_probe(code):
+    result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return list(map(float, result.stdout.strip().splitlines()[-1].split()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask worker cold-start benchmark")
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    startup, first_predict, cold_start, floor = [], [], [], []
+    for _ in range(args.runs):
+        ready_ms, first_ms = run_probe(PROBE)
+        startup.append(ready_ms)
+        first_predict.append(first_ms)
+        cold_start.append(ready_ms + first_ms)
+        floor.extend(run_probe(FLOOR))
+
+    median_startup = statistics.median(startup)
+    overhead = median_startup - statistics.median(floor)
+    print(f"dependency floor: median {statistics.median(floor):7.1f} ms   max {max(floor):7.1f} ms")
+    print(f"app.py import:    median {median_startup:7.1f} ms   max {max(startup):7.1f} ms   "
+          f"(+{overhead:.1f} ms over the floor)")
+    print(f"first prediction: median {statistics.median(first_predict):7.1f} ms   max {max(first_predict):7.1f} ms")
+    median_cold = statistics.median(cold_start)
+    print(f"cold start:       median {median_cold:7.1f} ms   max {max(cold_start):7.1f} ms   (import + first prediction)")
+    if median_cold < TARGET_COLD_START_MS:
+        print(f"✅ Cold start target met: {median_cold:.1f} ms < {TARGET_COLD_START_MS} ms")
+    else:
+        print(f"⚠️ Cold start target NOT met: {median_cold:.1f} ms against {TARGET_COLD_START_MS} ms "
+              f"({median_cold - TARGET_COLD_START_MS:.1f} ms over)")
+
+if __name__ == "__main__":
+    main()
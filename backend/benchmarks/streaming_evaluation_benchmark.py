@@ -0,0 +1,74 @@
+"""
+Peak RSS and wall time of holdout evaluation, streaming vs in memory, as the holdout grows.
+Generates a sharded holdout of each --rows size (generate_dataset.py's generator, a
+seed the served models were not trained on), then in a fresh process each:
+
+  streaming   evaluate_holdout() over iter_holdout() chunks (streaming_evaluation.py)
+  in-memory   read every shard, one predict_proba, sklearn's roc_auc_score / accuracy
+
+and checks both report the same AUC and accuracy.
+
+    python backend/benchmarks/streaming_evaluation_benchmark.py --rows 100000 1000000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SCRIPTS_DIR = os.path.join(BACKEND_DIR, 'ml_pipeline', 'scripts')
+MODEL_PATH = os.path.join(BACKEND_DIR, 'ml_pipeline', 'models', 'model_xgb.joblib')
+
+CHILD = """
+import json, resource, sys, time, warnings
+warnings.filterwarnings('ignore')
+sys.path.insert(0, {scripts!r})
+import joblib, pandas as pd
+from streaming_evaluation import evaluate_holdout, holdout_files, iter_holdout
+model = joblib.load({model!r})
+start = time.perf_counter()
+if {streaming!r}:
+    summary = evaluate_holdout({{'model': model}}, iter_holdout({holdout!r}, {chunk}))['model'].summary()
+    auc, accuracy, rows = summary['auc'], summary['accuracy'], summary['rows']
+else:
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    df = pd.concat([pd.read_csv(f, keep_default_na=False) for f in holdout_files({holdout!r})], ignore_index=True)
+    proba = model.predict_proba(df)[:, 1]
+    auc, accuracy, rows = roc_auc_score(df['default_flag'], proba), accuracy_score(df['default_flag'], proba > 0.5), len(df)
+print(json.dumps({{'seconds': time.perf_counter() - start, 'auc': auc, 'accuracy': accuracy, 'rows': rows,
+                  'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+def run_child(holdout, streaming, chunk_rows):
+    code = CHILD.format(scripts=SCRIPTS_DIR, model=MODEL_PATH, holdout=holdout, streaming=streaming, chunk=chunk_rows)
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming evaluation memory profile")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--chunk-rows', type=int, default=100_000)
+    parser.add_argument('--shard-rows', type=int, default=250_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12}  {'mode':>10}  {'seconds':>8}  {'rows/s':>9}  {'peak RSS MB':>12}  {'AUC':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            holdout = os.path.join(tmp, 'holdout')
+            subprocess.run([sys.executable, os.path.join(BACKEND_DIR, 'generate_dataset.py'), '--num-records', str(rows),
+                            '--seed', '7', '--chunk-records', str(args.shard_rows), '--shards-dir', holdout],
+                           check=True, capture_output=True)
+            results = {}
+            for mode, streaming in (('streaming', True), ('in-memory', False)):
+                result = results[mode] = run_child(holdout, streaming, args.chunk_rows)
+                assert result['rows'] == rows
+                print(f"{rows:>12,}  {mode:>10}  {result['seconds']:>8.1f}  {rows / result['seconds']:>9,.0f}  "
+                      f"{result['peak_rss_mb']:>12.0f}  {result['auc']:>8.5f}")
+            assert abs(results['streaming']['auc'] - results['in-memory']['auc']) < 1e-12
+            assert results['streaming']['accuracy'] == results['in-memory']['accuracy']
+
+if __name__ == "__main__":
+    main()
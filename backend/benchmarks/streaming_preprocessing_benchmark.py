@@ -0,0 +1,63 @@
+"""
+Peak RSS and wall time of the streaming preprocessing mode as the input grows.
+Builds CSVs of each --rows size by resampling business_credit_data.csv, then runs
+preprocess_streaming on each in a fresh process (output goes to a temp directory).
+
+    python backend/benchmarks/streaming_preprocessing_benchmark.py --rows 100000 1000000 5000000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml_pipeline', 'scripts')
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml_pipeline', 'data', 'business_credit_data.csv')
+
+CHILD = """
+import contextlib, io, json, resource, sys, time
+sys.path.insert(0, {scripts!r})
+from data_preprocessing import preprocess_streaming
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    manifest = preprocess_streaming({csv!r}, {out!r}, chunk_rows={chunk}, artifacts_dir={out!r})
+print(json.dumps({{'seconds': time.perf_counter() - start,
+                  'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  'rows': sum(s['rows'] for s in manifest['splits'].values())}}))
+"""
+
+def write_csv(path, rows, chunk=500_000):
+    """Resample the generated dataset (with fresh applicant ids) up to `rows` rows"""
+    base = pd.read_csv(SOURCE)
+    rng = np.random.default_rng(0)
+    for offset in range(0, rows, chunk):
+        n = min(chunk, rows - offset)
+        part = base.iloc[rng.integers(0, len(base), n)].copy()
+        part['applicant_id'] = [f"APP{i:09d}" for i in range(offset, offset + n)]
+        part.to_csv(path, mode='w' if offset == 0 else 'a', header=offset == 0, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming preprocessing memory profile")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument('--chunk-rows', type=int, default=250_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12}  {'csv MB':>8}  {'seconds':>8}  {'peak RSS MB':>12}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv = os.path.join(tmp, 'data.csv')
+            write_csv(csv, rows)
+            code = CHILD.format(scripts=SCRIPTS_DIR, csv=csv, out=os.path.join(tmp, 'out'), chunk=args.chunk_rows)
+            result = json.loads(subprocess.run([sys.executable, '-c', code], check=True,
+                                               capture_output=True, text=True).stdout.strip().splitlines()[-1])
+            assert result['rows'] == rows
+            print(f"{rows:>12,}  {os.path.getsize(csv) / 2**20:>8.0f}  {result['seconds']:>8.1f}  "
+                  f"{result['peak_rss_mb']:>12.0f}")
+
+if __name__ == "__main__":
+    main()
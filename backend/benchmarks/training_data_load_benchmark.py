@@ -0,0 +1,95 @@
+"""
+Load time and memory of the training data: legacy CSVs (X_train.csv / y_train.csv,
+parsed with pandas) against the columnar .npy dataset (memory-mapped by
+training_data.load_split). Each load runs in a fresh process; "scan" is the time
+to then read every value once (a column sum), which pays the page-ins an mmap load defers.
+
+    python backend/benchmarks/training_data_load_benchmark.py --rows 1000000 10000000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml_pipeline', 'scripts')
+sys.path.insert(0, SCRIPTS_DIR)
+
+from training_data import ColumnarWriter, write_manifest
+
+# Shape of the preprocessed feature matrix: 11 scaled floats, 4 label-encoded ints
+FLOAT_COLUMNS = ['years_in_operation', 'annual_revenue', 'monthly_cashflow', 'loan_amount_requested',
+                 'credit_score', 'existing_loans', 'debt_to_income_ratio', 'collateral_value',
+                 'loan_to_revenue_ratio', 'cashflow_adequacy', 'collateral_coverage']
+INT_COLUMNS = ['business_type_encoded', 'repayment_history_encoded',
+               'credit_score_category_encoded', 'business_maturity_encoded']
+
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {scripts!r})
+import numpy as np, pandas as pd
+from training_data import load_split
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if {fmt!r} == 'csv':
+    X = pd.read_csv({directory!r} + '/X_train.csv')
+    y = pd.read_csv({directory!r} + '/y_train.csv').values.ravel()
+else:
+    X, y = load_split('train', {directory!r})
+loaded = time.perf_counter()
+rss_loaded = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+total = sum(float(np.sum(X[c].to_numpy())) for c in X.columns) + float(y.sum())
+print(json.dumps({{'load': loaded - start, 'scan': time.perf_counter() - loaded,
+                  'rss_load_mb': (rss_loaded - base) / 1024,
+                  'rss_peak_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base) / 1024}}))
+"""
+
+def write_datasets(directory, rows, chunk=1_000_000):
+    """The same random rows as CSVs and as a columnar dataset"""
+    rng = np.random.default_rng(0)
+    dtypes = {**{c: np.float64 for c in FLOAT_COLUMNS}, **{c: np.int64 for c in INT_COLUMNS}, 'default_flag': np.int64}
+    writer = ColumnarWriter(directory, 'train', dtypes, rows)
+    for offset in range(0, rows, chunk):
+        n = min(chunk, rows - offset)
+        frame = pd.DataFrame({c: rng.standard_normal(n) for c in FLOAT_COLUMNS})
+        for c in INT_COLUMNS:
+            frame[c] = rng.integers(0, 4, n)
+        frame['default_flag'] = (rng.random(n) < 0.3).astype(np.int64)
+        first = offset == 0
+        frame.drop(columns='default_flag').to_csv(f'{directory}/X_train.csv', mode='w' if first else 'a',
+                                                  header=first, index=False)
+        frame[['default_flag']].to_csv(f'{directory}/y_train.csv', mode='w' if first else 'a',
+                                       header=first, index=False)
+        writer.append(frame)
+    write_manifest(directory, {'train': writer.close()}, 'default_flag', FLOAT_COLUMNS + INT_COLUMNS)
+
+def measure(fmt, directory):
+    code = CHILD.format(scripts=SCRIPTS_DIR, fmt=fmt, directory=directory)
+    out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV vs columnar training data loading")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>12}  {'format':>8}  {'disk MB':>8}  {'load s':>8}  {'scan s':>7}  {'RSS load MB':>12}  {'RSS peak MB':>12}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as directory:
+            write_datasets(directory, rows)
+            sizes = {
+                'csv': sum(os.path.getsize(f'{directory}/{f}') for f in ('X_train.csv', 'y_train.csv')),
+                'columnar': sum(e.stat().st_size for e in os.scandir(f'{directory}/train'))
+            }
+            for fmt in ('csv', 'columnar'):
+                r = measure(fmt, directory)
+                print(f"{rows:>12,}  {fmt:>8}  {sizes[fmt] / 2**20:>8.0f}  {r['load']:>8.3f}  {r['scan']:>7.3f}  "
+                      f"{r['rss_load_mb']:>12.0f}  {r['rss_peak_mb']:>12.0f}")
+
+if __name__ == "__main__":
+    main()
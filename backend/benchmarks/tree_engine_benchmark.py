@@ -0,0 +1,100 @@
+"""
+Compact tree engine (app.services.tree_engine) against the pickled tree models.
+
+For the RandomForest / XGBoost classifiers in the models directory: load time of the
+pickle vs a memory-mapped export, a bit-identity check of the probabilities (also with
+missing values), and per-call latency at several batch sizes. The served calibrated
+model (model_xgb.joblib) is then compared end to end on the synthetic applications.
+The test features come from the columnar dataset; run data_preprocessing.py first.
+
+    python backend/benchmarks/tree_engine_benchmark.py --sizes 1 100 1000 10000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'ml_pipeline', 'scripts'))
+
+from app.services import tree_engine
+from app.services.model_registry import MODELS_DIR
+from app.services.tree_engine import CompactCalibratedPipeline
+from training_data import load_split
+
+TREE_MODELS = ['random_forest.pkl', 'xgboost.pkl', 'best_model.pkl']
+APPLICATIONS_PATH = 'backend/data/synthetic_credit_data.csv'
+
+def per_call(fn, arg, min_seconds=0.5):
+    """Mean seconds per fn(arg) over at least min_seconds (and 3 calls)"""
+    fn(arg)
+    calls, start = 0, time.perf_counter()
+    while calls < 3 or time.perf_counter() - start < min_seconds:
+        fn(arg)
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def latency_table(native, compact, frames):
+    for rows, (native_arg, compact_arg) in frames.items():
+        t_native = per_call(native, native_arg)
+        t_compact = per_call(compact, compact_arg)
+        print(f"   {rows:>7,} rows   native {t_native * 1000:9.3f} ms   compact {t_compact * 1000:9.3f} ms"
+              f"   {t_native / t_compact:6.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact tree engine benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 1_000, 10_000], help="Rows per call")
+    args = parser.parse_args()
+
+    import joblib
+
+    warnings.filterwarnings('ignore')  # Pickles written by older sklearn / xgboost
+    X, _ = load_split('test')  # Columnar test split written by data_preprocessing.py
+    X_missing = X.to_numpy(dtype=float)
+    X_missing[::7, 3] = np.nan
+
+    for name in TREE_MODELS:
+        path = os.path.join(MODELS_DIR, name)
+        if not os.path.exists(path):
+            continue
+        model, t_pickle = timed(lambda: joblib.load(path))
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = tree_engine.export(model, tmp)
+            engine, t_mmap = timed(lambda: tree_engine.load(tmp))
+            identical = (np.array_equal(engine.predict_proba(X.to_numpy(dtype=float)), model.predict_proba(X)[:, 1])
+                         and np.array_equal(engine.predict_proba(X_missing),
+                                            model.predict_proba(pd.DataFrame(X_missing, columns=X.columns))[:, 1]))
+            print(f"{'✅' if identical else '⚠️'} {name}: {manifest['trees']} trees, {manifest['nodes']:,} nodes, "
+                  f"bit-identical on {len(X):,} rows: {identical}")
+            print(f"   load  joblib {t_pickle * 1000:8.1f} ms   tree_engine.load {t_mmap * 1000:8.1f} ms")
+            frames = {}
+            for rows in args.sizes:
+                frame = X.iloc[np.arange(rows) % len(X)]
+                frames[rows] = (frame, frame.to_numpy(dtype=float))
+            latency_table(lambda f: model.predict_proba(f)[:, 1], engine.predict_proba, frames)
+
+    model = joblib.load(os.path.join(MODELS_DIR, 'model_xgb.joblib'))
+    scorer, t_build = timed(lambda: CompactCalibratedPipeline.from_model(model))
+    applications = pd.read_csv(APPLICATIONS_PATH, keep_default_na=False)
+    identical = np.array_equal(scorer.predict_proba(applications), model.predict_proba(applications))
+    print(f"{'✅' if identical else '⚠️'} model_xgb.joblib: {len(scorer.folds)} calibrated folds, built in "
+          f"{t_build * 1000:.1f} ms, bit-identical on {len(applications):,} applications: {identical}")
+    frames = {}
+    for rows in args.sizes:
+        frame = applications.iloc[np.arange(rows) % len(applications)].reset_index(drop=True)
+        frames[rows] = (frame, frame)
+    latency_table(model.predict_proba, scorer.predict_proba, frames)
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,74 @@
 import pandas as pd
 import numpy as np
-from faker import Faker
-import random
+import argparse
 
-fake = Faker()
-Faker.seed(42)
-np.random.seed(42)
+from sharded_generation import SHARD_RECORDS, iter_shards, write_partitioned
 
-def generate_data(num_samples=5000):
-    data = []
-    
-    for _ in range(num_samples):
-        # Business Profile
-        business_type = random.choice(['Retail', 'Services', 'Manufacturing', 'Tech', 'Logistics'])
-        years_in_op = np.random.randint(1, 15)
-        
-        # Financials
-        annual_revenue = np.random.uniform(500000, 50000000)
-        expense_ratio = np.random.uniform(0.6, 1.2) # >1 means loss making
-        expenses = annual_revenue * expense_ratio
-        ebitda = annual_revenue - expenses
-        
-        # Loan Request
-        loan_amount = np.random.uniform(100000, 5000000)
-        loan_term = random.choice([12, 24, 36, 48, 60])
-        
-        # Credit History
-        promoter_credit_score = np.random.randint(300, 850)
-        existing_debt = np.random.uniform(0, 2000000)
-        
-        # Logic for Default Target (Simplified)
-        # Higher risk if: Loss making, Low Credit Score, High Debt-to-Revenue
-        debt_to_revenue = existing_debt / annual_revenue
-        
-        probability_default = 0.1 # Base risk
-        
-        if ebitda < 0: probability_default += 0.3
-        if promoter_credit_score < 600: probability_default += 0.25
-        if debt_to_revenue > 0.5: probability_default += 0.2
-        if years_in_op < 2: probability_default += 0.1
-        
-        # Cap probability
-        probability_default = min(0.95, probability_default)
-        
-        default_flag = np.random.choice([0, 1], p=[1-probability_default, probability_default])
-        
-        data.append({
-            'business_type': business_type,
-            'years_in_operation': years_in_op,
-            'annual_revenue': round(annual_revenue, 2),
-            'ebitda': round(ebitda, 2),
-            'loan_amount': round(loan_amount, 2),
-            'loan_term_months': loan_term,
-            'promoter_credit_score': promoter_credit_score,
-            'existing_debt': round(existing_debt, 2),
-            'default_flag': default_flag
-        })
-        
-    df = pd.DataFrame(data)
-    df.to_csv('credit_data_synthetic.csv', index=False)
-    print(f"Generated {num_samples} samples to credit_data_synthetic.csv")
-    return df
+def generate_records(rng, num_samples, first_id=1):
+    """One block of samples from the Generator `rng` (this schema has no id column)"""
+    # Business Profile
+    business_type = rng.choice(['Retail', 'Services', 'Manufacturing', 'Tech', 'Logistics'], size=num_samples)
+    years_in_op = rng.integers(1, 15, size=num_samples)
+
+    # Financials
+    annual_revenue = rng.uniform(500000, 50000000, size=num_samples)
+    expense_ratio = rng.uniform(0.6, 1.2, size=num_samples) # >1 means loss making
+    expenses = annual_revenue * expense_ratio
+    ebitda = annual_revenue - expenses
+
+    # Loan Request
+    loan_amount = rng.uniform(100000, 5000000, size=num_samples)
+    loan_term = rng.choice([12, 24, 36, 48, 60], size=num_samples)
+
+    # Credit History
+    promoter_credit_score = rng.integers(300, 850, size=num_samples)
+    existing_debt = rng.uniform(0, 2000000, size=num_samples)
+
+    # Logic for Default Target (Simplified)
+    # Higher risk if: Loss making, Low Credit Score, High Debt-to-Revenue
+    debt_to_revenue = existing_debt / annual_revenue
+
+    probability_default = np.full(num_samples, 0.1) # Base risk
+    probability_default += 0.3 * (ebitda < 0)
+    probability_default += 0.25 * (promoter_credit_score < 600)
+    probability_default += 0.2 * (debt_to_revenue > 0.5)
+    probability_default += 0.1 * (years_in_op < 2)
+
+    # Cap probability
+    probability_default = np.minimum(0.95, probability_default)
+
+    default_flag = (rng.random(num_samples) < probability_default).astype(int)
+
+    return pd.DataFrame({
+        'business_type': business_type,
+        'years_in_operation': years_in_op,
+        'annual_revenue': np.round(annual_revenue, 2),
+        'ebitda': np.round(ebitda, 2),
+        'loan_amount': np.round(loan_amount, 2),
+        'loan_term_months': loan_term,
+        'promoter_credit_score': promoter_credit_score,
+        'existing_debt': np.round(existing_debt, 2),
+        'default_flag': default_flag
+    })
+
+def generate_data(num_samples=5000, seed=42, output_path='credit_data_synthetic.csv', shard_records=SHARD_RECORDS):
+    df = None  # Stays None when num_samples is 0 (no shards)
+    for i, df in enumerate(iter_shards(generate_records, num_samples, seed, shard_records)):
+        df.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    print(f"Generated {num_samples} samples to {output_path}")
+    return df if num_samples <= shard_records else None
 
 if __name__ == "__main__":
-    generate_data()
+    parser = argparse.ArgumentParser(description="Generate credit_data_synthetic.csv")
+    parser.add_argument('--num-samples', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--shard-records', type=int, default=SHARD_RECORDS)
+    parser.add_argument('--shards-dir', help="Write part-XXXXX.csv shards here on a process pool instead")
+    parser.add_argument('--workers', type=int, default=None, help="Processes for --shards-dir (default: all CPUs)")
+    args = parser.parse_args()
+    if args.shards_dir:
+        manifest = write_partitioned(generate_records, args.num_samples, args.shards_dir, args.seed,
+                                     args.shard_records, args.workers, target='default_flag')
+        print(f"Generated {args.num_samples} samples in {len(manifest['parts'])} shards under {args.shards_dir}")
+    else:
+        generate_data(args.num_samples, args.seed, shard_records=args.shard_records)
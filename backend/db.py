@@ -1,11 +1,16 @@
 import os
+import time
+import threading
+from contextlib import contextmanager
 import psycopg2
+from psycopg2 import extensions
 from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 
 load_dotenv()
 
 def get_db_connection():
+    """Open a new, unpooled connection. Request handlers should use db_connection() instead."""
     try:
         conn = psycopg2.connect(
             os.getenv('DATABASE_URL'),
@@ -15,3 +20,191 @@ def get_db_connection():
     except Exception as e:
         print(f"Database connection error: {e}")
         raise e
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection frees up within the checkout timeout"""
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+    Keeps at least `minconn` connections open, never more than `maxconn`,
+    checks connections on checkout and blocks callers when saturated.
+    """
+
+    def __init__(self, minconn=1, maxconn=10, connect=get_db_connection,
+                 timeout=10.0, ping_after=30.0):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("Pool sizes must satisfy 0 <= minconn <= maxconn and maxconn >= 1")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.ping_after = ping_after  # Seconds idle before a connection is pinged on checkout
+        self._connect = connect
+        self._idle = []  # (conn, returned_at) pairs, most recently returned last
+        self._size = 0
+        self._lock = threading.Condition()
+        self._counters = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'connections_opened': 0,
+            'connections_discarded': 0,
+            'peak_in_use': 0,
+        }
+        for _ in range(minconn):
+            self._idle.append((self._open(), time.monotonic()))
+
+    def _open(self):
+        conn = self._connect()
+        self._size += 1
+        self._counters['connections_opened'] += 1
+        return conn
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, idle_for):
+        """Cheap liveness check; only round-trips to the server for long-idle connections"""
+        if conn.closed:
+            return False
+        if idle_for < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self, timeout=None):
+        """Borrow a connection, waiting up to `timeout` seconds if the pool is saturated"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            conn = None
+            with self._lock:
+                while not self._idle and self._size >= self.maxconn:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        raise PoolTimeout(f"No database connection available after {timeout:.1f}s")
+                    if not waited:
+                        self._counters['waits'] += 1
+                        waited = True
+                    self._lock.wait(remaining)
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                else:
+                    self._size += 1  # Reserve the slot; connect outside the lock
+
+            # Handshakes and pings happen without holding the lock
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._counters['connections_opened'] += 1
+                    return self._checked_out(conn)
+
+            if self._is_healthy(conn, time.monotonic() - returned_at):
+                with self._lock:
+                    return self._checked_out(conn)
+
+            self._close_quietly(conn)
+            with self._lock:
+                self._size -= 1
+                self._counters['connections_discarded'] += 1
+                self._lock.notify()
+
+    def _checked_out(self, conn):
+        self._counters['checkouts'] += 1
+        in_use = self._size - len(self._idle)
+        self._counters['peak_in_use'] = max(self._counters['peak_in_use'], in_use)
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a borrowed connection, rolling back anything left uncommitted"""
+        if not close and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                close = True
+        if close or conn.closed:
+            self._close_quietly(conn)
+            with self._lock:
+                self._size -= 1
+                self._counters['connections_discarded'] += 1
+                self._lock.notify()
+            return
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Borrow a connection for the duration of a `with` block"""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        except Exception:
+            # A broken connection must not go back into the pool
+            self.putconn(conn, close=conn.closed != 0)
+            raise
+        else:
+            self.putconn(conn)
+
+    def stats(self):
+        """Snapshot of pool size and saturation counters"""
+        with self._lock:
+            return {
+                'min_size': self.minconn,
+                'max_size': self.maxconn,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                **self._counters,
+            }
+
+    def closeall(self):
+        """Close every idle connection; borrowed ones are closed when returned"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """
+    Process-wide pool, created on first use.
+    Sized by DB_POOL_MIN / DB_POOL_MAX / DB_POOL_TIMEOUT; rebuilt after a fork
+    so workers never share sockets with their parent.
+    """
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = ConnectionPool(
+                    minconn=int(os.getenv('DB_POOL_MIN', 1)),
+                    maxconn=int(os.getenv('DB_POOL_MAX', 10)),
+                    timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+                )
+                _pool_pid = os.getpid()
+    return _pool
+
+def db_connection(timeout=None):
+    """Context manager borrowing a connection from the process-wide pool"""
+    return get_pool().connection(timeout)
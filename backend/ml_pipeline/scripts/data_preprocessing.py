@@ -8,7 +8,24 @@ import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 import joblib
+import argparse
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from training_data import (
+    COLUMNAR_DIR, DATASET_MANIFEST, ColumnarWriter, encoder_versions, write_frame, write_manifest
+)
+
+CATEGORICAL_COLS = ['business_type', 'repayment_history', 'credit_score_category', 'business_maturity']
+NON_FEATURE_COLS = ['applicant_id', 'default_flag'] + CATEGORICAL_COLS
+TARGET_COL = 'default_flag'
+# Rows per chunk in streaming mode, and rows kept per column to estimate fill medians
+CHUNK_ROWS = 250_000
+RESERVOIR_ROWS = 100_000
+# Text columns with more distinct values than this (ids) take their fill mode from the reservoir
+MAX_COUNTED_VALUES = 10_000
 
 def load_data(filepath='backend/ml_pipeline/data/business_credit_data.csv'):
     """Load the generated dataset"""
@@ -38,7 +55,12 @@ def handle_missing_values(df):
 def engineer_features(df):
     """Create derived features"""
     print("\nEngineering features...")
-    
+    df = add_derived_features(df)
+    print(f"✅ Created {5} new features")
+    return df
+
+def add_derived_features(df):
+    """The derived columns themselves (shared by the in-memory and streaming pipelines)"""
     # Loan to revenue ratio
     df['loan_to_revenue_ratio'] = df['loan_amount_requested'] / df['annual_revenue']
     
@@ -57,15 +79,13 @@ def engineer_features(df):
     df['business_maturity'] = pd.cut(df['years_in_operation'],
                                       bins=[-1, 2, 5, 10, 100],
                                       labels=['Startup', 'Young', 'Established', 'Mature'])
-    
-    print(f"✅ Created {5} new features")
     return df
 
 def encode_categorical_variables(df, train=True, encoders=None):
     """Encode categorical variables"""
     print("\nEncoding categorical variables...")
     
-    categorical_cols = ['business_type', 'repayment_history', 'credit_score_category', 'business_maturity']
+    categorical_cols = CATEGORICAL_COLS
     
     if train:
         encoders = {}
@@ -105,9 +125,7 @@ def prepare_train_test_split(df, test_size=0.2, random_state=42):
     print("\nSplitting data into train and test sets...")
     
     # Separate features and target
-    feature_cols = [col for col in df.columns if col not in ['applicant_id', 'default_flag', 
-                                                               'business_type', 'repayment_history',
-                                                               'credit_score_category', 'business_maturity']]
+    feature_cols = [col for col in df.columns if col not in NON_FEATURE_COLS]
     
     X = df[feature_cols]
     y = df['default_flag']
@@ -134,14 +152,28 @@ def save_artifacts(encoders, scaler, feature_cols, output_dir='backend/ml_pipeli
     
     print(f"✅ Artifacts saved to {output_dir}")
 
-def preprocess_pipeline():
+def save_columnar(X_train, X_test, y_train, y_test, feature_cols, encoders, scaler,
+                  output_dir=COLUMNAR_DIR, artifacts_dir='backend/ml_pipeline/models'):
+    """Write the splits with training_data.py, schema header last"""
+    os.makedirs(output_dir, exist_ok=True)
+    if os.path.exists(os.path.join(output_dir, DATASET_MANIFEST)):
+        os.remove(os.path.join(output_dir, DATASET_MANIFEST))
+    splits = {
+        'train': write_frame(output_dir, 'train', X_train, y_train, TARGET_COL),
+        'test': write_frame(output_dir, 'test', X_test, y_test, TARGET_COL)
+    }
+    write_manifest(output_dir, splits, TARGET_COL, feature_cols,
+                   metadata={'encoders': encoder_versions(encoders, scaler, artifacts_dir)})
+    print(f"✅ Processed data saved to {output_dir}")
+
+def preprocess_pipeline(filepath='backend/ml_pipeline/data/business_credit_data.csv'):
     """Main preprocessing pipeline"""
     print("="*60)
     print("CREDIT DATA PREPROCESSING PIPELINE")
     print("="*60)
     
     # Load data
-    df = load_data()
+    df = load_data(filepath)
     
     # Handle missing values
     df = handle_missing_values(df)
@@ -162,12 +194,9 @@ def preprocess_pipeline():
     # Save artifacts
     save_artifacts(encoders, scaler, feature_cols)
     
-    # Save processed data
+    # Save processed data (typed columnar files instead of CSV)
     print("\nSaving processed data...")
-    X_train.to_csv('backend/ml_pipeline/data/X_train.csv', index=False)
-    X_test.to_csv('backend/ml_pipeline/data/X_test.csv', index=False)
-    y_train.to_csv('backend/ml_pipeline/data/y_train.csv', index=False)
-    y_test.to_csv('backend/ml_pipeline/data/y_test.csv', index=False)
+    save_columnar(X_train, X_test, y_train, y_test, feature_cols, encoders, scaler)
     
     print("\n" + "="*60)
     print("✨ PREPROCESSING COMPLETE!")
@@ -175,5 +204,201 @@ def preprocess_pipeline():
     
     return X_train, X_test, y_train, y_test, feature_cols
 
+def _reservoir_update(reservoir, seen, values, rng):
+    """Algorithm R over a whole chunk: every value seen so far is kept with equal probability"""
+    size = len(reservoir)
+    head = max(0, min(size - seen, len(values)))
+    reservoir[seen:seen + head] = values[:head]
+    rest = values[head:]
+    if len(rest):
+        slots = rng.integers(0, np.arange(seen + head, seen + len(values)) + 1)
+        keep = slots < size
+        reservoir[slots[keep]] = rest[keep]
+
+def scan_fill_statistics(filepath, chunk_rows=CHUNK_ROWS, random_state=42):
+    """
+    Streaming pass 1: the values handle_missing_values would fill with, and the class counts.
+    Medians come from a fixed-size reservoir sample per column (exact up to RESERVOIR_ROWS
+    values); modes come from running value counts, or from the reservoir for columns with
+    more than MAX_COUNTED_VALUES distinct values.
+    """
+    print("\nPass 1/3: scanning for missing values and class counts...")
+    rng = np.random.default_rng(random_state)
+    numeric_cols = None
+    rows = 0
+    for chunk in pd.read_csv(filepath, chunksize=chunk_rows):
+        if numeric_cols is None:
+            numeric_cols = list(chunk.select_dtypes(include=[np.number]).columns)
+            object_cols = list(chunk.select_dtypes(exclude=[np.number]).columns)
+            reservoirs = {col: np.empty(RESERVOIR_ROWS, dtype=float if col in numeric_cols else object)
+                          for col in numeric_cols + object_cols}
+            seen = dict.fromkeys(numeric_cols + object_cols, 0)
+            missing = dict.fromkeys(numeric_cols + object_cols, 0)
+            value_counts = {col: pd.Series(dtype='int64') for col in object_cols}
+            class_counts = pd.Series(dtype='int64')
+        rows += len(chunk)
+        for col in numeric_cols:
+            values = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=float)
+            valid = values[~np.isnan(values)]
+            missing[col] += len(values) - len(valid)
+            _reservoir_update(reservoirs[col], seen[col], valid, rng)
+            seen[col] += len(valid)
+        for col in object_cols:
+            valid = chunk[col].dropna().to_numpy(dtype=object)
+            missing[col] += len(chunk) - len(valid)
+            _reservoir_update(reservoirs[col], seen[col], valid, rng)
+            seen[col] += len(valid)
+            if col in value_counts:
+                value_counts[col] = value_counts[col].add(chunk[col].value_counts(), fill_value=0)
+                if len(value_counts[col]) > MAX_COUNTED_VALUES:
+                    del value_counts[col]
+        class_counts = class_counts.add(chunk[TARGET_COL].value_counts(), fill_value=0)
+
+    fill = {}
+    for col in numeric_cols:
+        if missing[col]:
+            fill[col] = float(np.median(reservoirs[col][:min(seen[col], RESERVOIR_ROWS)]))
+    for col in object_cols:
+        if missing[col]:
+            counts = value_counts.get(col)
+            if counts is None:
+                counts = pd.Series(reservoirs[col][:min(seen[col], RESERVOIR_ROWS)]).value_counts()
+            fill[col] = min(counts[counts == counts.max()].index)  # Same tie-break as mode()[0]
+    class_counts = {label: int(n) for label, n in class_counts.items()}
+    if TARGET_COL in fill:
+        class_counts[fill[TARGET_COL]] = class_counts.get(fill[TARGET_COL], 0) + missing[TARGET_COL]
+
+    total_missing = sum(missing.values())
+    print(f"✅ Scanned {rows} records, {total_missing} missing values" +
+          (f" (filled in columns {sorted(fill)})" if fill else ""))
+    return {'rows': rows, 'fill': fill, 'class_counts': class_counts}
+
+def _prepare_chunk(chunk, fill):
+    if fill:
+        chunk = chunk.fillna(fill)
+    return add_derived_features(chunk)
+
+def fit_streaming_transformers(filepath, fill, chunk_rows=CHUNK_ROWS):
+    """
+    Streaming pass 2: StandardScaler statistics via partial_fit, and LabelEncoder
+    classes from the union of values seen in every chunk
+    """
+    print("\nPass 2/3: fitting scaler and encoders...")
+    scaler = StandardScaler()
+    categories = {col: set() for col in CATEGORICAL_COLS}
+    cols_to_scale = feature_cols = None
+    for chunk in pd.read_csv(filepath, chunksize=chunk_rows):
+        chunk = _prepare_chunk(chunk, fill)
+        if cols_to_scale is None:
+            # Same selection as normalize_features (the encoded columns do not exist yet)
+            numerical_cols = chunk.select_dtypes(include=[np.number]).columns
+            cols_to_scale = [col for col in numerical_cols if col not in ['applicant_id', TARGET_COL]]
+            columns = list(chunk.columns) + [f'{col}_encoded' for col in CATEGORICAL_COLS]
+            feature_cols = [col for col in columns if col not in NON_FEATURE_COLS]
+        scaler.partial_fit(chunk[cols_to_scale])
+        for col in CATEGORICAL_COLS:
+            categories[col].update(chunk[col].dropna().astype(str).unique())
+
+    encoders = {}
+    for col in CATEGORICAL_COLS:
+        le = LabelEncoder()
+        le.fit(np.array(sorted(categories[col]), dtype=object))
+        encoders[col] = le
+    print(f"✅ Normalized {len(cols_to_scale)} numerical columns, encoded {len(encoders)} categorical columns")
+    return encoders, scaler, cols_to_scale, feature_cols
+
+def write_streaming_splits(filepath, output_dir, stats, encoders, scaler, cols_to_scale, feature_cols,
+                           chunk_rows=CHUNK_ROWS, test_size=0.2, random_state=42):
+    """
+    Streaming pass 3: transform each chunk and append its rows to the train or test columns.
+    Test rows are a uniform stratified sample: each class contributes round(test_size * count)
+    rows, drawn chunk by chunk from the hypergeometric distribution so the totals are exact.
+    """
+    print("\nPass 3/3: transforming and writing splits...")
+    rng = np.random.default_rng(random_state)
+    remaining = dict(stats['class_counts'])
+    test_left = {label: int(round(test_size * n)) for label, n in remaining.items()}
+    n_test = sum(test_left.values())
+
+    dtypes = {col: np.int64 if col.endswith('_encoded') else np.float64 for col in feature_cols}
+    dtypes[TARGET_COL] = np.int64
+    writers = {
+        'train': ColumnarWriter(output_dir, 'train', dtypes, stats['rows'] - n_test),
+        'test': ColumnarWriter(output_dir, 'test', dtypes, n_test)
+    }
+    for chunk in pd.read_csv(filepath, chunksize=chunk_rows):
+        chunk = _prepare_chunk(chunk, stats['fill'])
+        for col in CATEGORICAL_COLS:
+            chunk[f'{col}_encoded'] = encoders[col].transform(chunk[col].astype(str))
+        chunk[cols_to_scale] = scaler.transform(chunk[cols_to_scale])
+
+        y = chunk[TARGET_COL].to_numpy()
+        is_test = np.zeros(len(chunk), dtype=bool)
+        for label in remaining:
+            rows = np.flatnonzero(y == label)
+            if not len(rows):
+                continue
+            if test_left[label] == 0:
+                take = 0
+            elif test_left[label] == remaining[label]:
+                take = len(rows)
+            else:
+                take = rng.hypergeometric(test_left[label], remaining[label] - test_left[label], len(rows))
+            is_test[rng.choice(rows, take, replace=False)] = True
+            test_left[label] -= take
+            remaining[label] -= len(rows)
+        writers['train'].append(chunk[~is_test])
+        writers['test'].append(chunk[is_test])
+
+    splits = {name: writer.close() for name, writer in writers.items()}
+    for name, split in splits.items():
+        print(f"✅ {name.capitalize()} set: {split['rows']} samples")
+    return splits
+
+def preprocess_streaming(filepath='backend/ml_pipeline/data/business_credit_data.csv', output_dir=COLUMNAR_DIR,
+                         chunk_rows=CHUNK_ROWS, test_size=0.2, random_state=42,
+                         artifacts_dir='backend/ml_pipeline/models'):
+    """
+    Out-of-core preprocessing: three passes over the CSV in chunks of `chunk_rows`, so peak
+    memory depends on the chunk size, not the input size. Writes columnar .npy splits
+    (see training_data.py) and the same scaler/encoder/feature-column artifacts as
+    preprocess_pipeline.
+    """
+    print("="*60)
+    print("CREDIT DATA PREPROCESSING PIPELINE (STREAMING)")
+    print("="*60)
+
+    # A directory without dataset.json holds no complete dataset
+    os.makedirs(output_dir, exist_ok=True)
+    if os.path.exists(os.path.join(output_dir, DATASET_MANIFEST)):
+        os.remove(os.path.join(output_dir, DATASET_MANIFEST))
+
+    stats = scan_fill_statistics(filepath, chunk_rows, random_state)
+    encoders, scaler, cols_to_scale, feature_cols = fit_streaming_transformers(filepath, stats['fill'], chunk_rows)
+    splits = write_streaming_splits(filepath, output_dir, stats, encoders, scaler, cols_to_scale, feature_cols,
+                                    chunk_rows, test_size, random_state)
+
+    save_artifacts(encoders, scaler, feature_cols, artifacts_dir)
+    manifest = write_manifest(output_dir, splits, TARGET_COL, feature_cols, metadata={
+        'encoders': encoder_versions(encoders, scaler, artifacts_dir),
+        'source': os.path.basename(filepath),
+        'fill_values': {col: value if isinstance(value, str) else float(value) for col, value in stats['fill'].items()}
+    })
+
+    print("\n" + "="*60)
+    print(f"✨ PREPROCESSING COMPLETE! Columnar splits in {output_dir}")
+    print("="*60)
+    return manifest
+
 if __name__ == "__main__":
-    preprocess_pipeline()
+    parser = argparse.ArgumentParser(description="Preprocess the credit dataset")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Out-of-core mode: chunked passes, columnar .npy output")
+    parser.add_argument('--input', default='backend/ml_pipeline/data/business_credit_data.csv')
+    parser.add_argument('--output-dir', default=COLUMNAR_DIR, help="Columnar output (streaming mode)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    if args.streaming:
+        preprocess_streaming(args.input, args.output_dir, args.chunk_rows)
+    else:
+        preprocess_pipeline(args.input)
@@ -0,0 +1,224 @@
+"""
+Concurrent successive-halving hyperparameter search with an on-disk fold cache
+
+Every model family is searched at the same time. All of their cross-validation fits
+share one process pool sized to the CPU budget, and each fit runs single-threaded.
+Each family runs successive halving: every candidate is scored on a small stratified
+subsample of the training rows, the best 1/factor survive, and the survivors are
+rescored on a factor-times larger subsample until the last round uses every row.
+Each fold's score is cached as JSON. The cache key is a hash of the training data,
+the estimator, its params, the subsample size and the fold, so an interrupted or
+repeated run only fits what it has not seen before.
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import sklearn
+import xgboost as xgb
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+CACHE_DIR = 'backend/ml_pipeline/cache/hpo'
+# Smallest training subsample a halving round may use
+MIN_RESOURCE = 400
+
+# Training data of the worker processes, set once per process by _init_worker
+_X = None
+_y = None
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+def _fit_fold(estimator, params, train_index, test_index):
+    """Fit one candidate on one fold (in a worker); returns (ROC-AUC, fit seconds)"""
+    start = time.perf_counter()
+    model = clone(estimator).set_params(**params)
+    model.fit(_X.iloc[train_index], _y[train_index])
+    score = roc_auc_score(_y[test_index], model.predict_proba(_X.iloc[test_index])[:, 1])
+    return float(score), time.perf_counter() - start
+
+def data_hash(X: pd.DataFrame, y) -> str:
+    """SHA-256 over the training frame (values, column names, dtypes) and labels"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(map(str, X.columns)), list(map(str, X.dtypes))]).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    """Every combination of a GridSearchCV-style param grid"""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+class FoldCache:
+    """One small JSON file per (data, estimator, params, resource, fold) result"""
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str):
+        try:
+            with open(self._path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: Dict):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staging = f"{path}.tmp-{os.getpid()}"
+        with open(staging, "w") as f:
+            json.dump(result, f)
+        os.replace(staging, path)
+
+def _estimator_id(estimator) -> Dict:
+    """What besides params decides a fit's outcome: class, fixed settings, library versions"""
+    return {
+        'class': f"{type(estimator).__module__}.{type(estimator).__name__}",
+        'params': {k: repr(v) for k, v in sorted(estimator.get_params().items())},
+        'sklearn': sklearn.__version__,
+        'xgboost': xgb.__version__,
+    }
+
+def halving_schedule(n_candidates: int, n_samples: int, factor: int = 3, min_resource: int = MIN_RESOURCE):
+    """Training rows for each round: the last uses all of them, each earlier round 1/factor as many"""
+    rounds = 1 + (math.floor(math.log(n_candidates, factor) + 1e-9) if n_candidates > 1 else 0)
+    rounds = max(1, min(rounds, 1 + int(math.log(max(n_samples / min_resource, 1), factor) + 1e-9)))
+    return [int(n_samples // factor ** (rounds - 1 - r)) for r in range(rounds)]
+
+class HalvingSearch:
+    """Successive-halving search for one model family, fitting on a shared process pool"""
+
+    def __init__(self, name, estimator, param_grid, pool, cache, data_key, y,
+                 cv=5, factor=3, min_resource=MIN_RESOURCE, random_state=42):
+        self.name = name
+        self.estimator = estimator
+        self.candidates = expand_grid(param_grid)
+        self.pool = pool
+        self.cache = cache
+        self.data_key = data_key
+        self.y = np.asarray(y)
+        self.cv = cv
+        self.factor = factor
+        self.min_resource = min_resource
+        self.random_state = random_state
+
+    def _folds(self, resource):
+        """(train, test) row positions for a stratified subsample of `resource` rows"""
+        rows = np.arange(len(self.y))
+        if resource < len(rows):
+            rows, _ = train_test_split(rows, train_size=resource, stratify=self.y,
+                                       random_state=self.random_state)
+            rows = np.sort(rows)
+        splitter = StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        return [(rows[train], rows[test]) for train, test in splitter.split(rows, self.y[rows])]
+
+    def _key(self, params, resource, fold):
+        payload = json.dumps({
+            'data': self.data_key, 'estimator': _estimator_id(self.estimator),
+            'params': {k: repr(v) for k, v in sorted(params.items())},
+            'resource': resource, 'cv': self.cv, 'fold': fold, 'seed': self.random_state
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _score_round(self, candidates, resource):
+        """Mean fold ROC-AUC per candidate, submitting only the uncached folds"""
+        folds = self._folds(resource)
+        pending, results = [], {}
+        for c, params in enumerate(candidates):
+            for f, (train, test) in enumerate(folds):
+                key = self._key(params, resource, f)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    results[c, f] = (cached['auc'], cached['fit_seconds'], True)
+                else:
+                    future = self.pool.submit(_fit_fold, self.estimator, params, train, test)
+                    pending.append((c, f, key, future))
+        for c, f, key, future in pending:
+            score, seconds = future.result()
+            self.cache.put(key, {'auc': score, 'fit_seconds': seconds})
+            results[c, f] = (score, seconds, False)
+
+        scored = []
+        for c in range(len(candidates)):
+            fold_results = [results[c, f] for f in range(len(folds))]
+            scored.append({
+                'resource': resource,
+                'mean_auc': float(np.mean([r[0] for r in fold_results])),
+                'fit_seconds': float(sum(r[1] for r in fold_results)),
+                'cached_folds': sum(r[2] for r in fold_results)
+            })
+        return scored
+
+    def run(self) -> Dict:
+        """Best params, their full-data CV score, and the timing of every candidate"""
+        start = time.perf_counter()
+        schedule = halving_schedule(len(self.candidates), len(self.y), self.factor, self.min_resource)
+        survivors = list(range(len(self.candidates)))
+        history = {c: [] for c in survivors}
+        for r, resource in enumerate(schedule):
+            scored = self._score_round([self.candidates[c] for c in survivors], resource)
+            for c, result in zip(survivors, scored):
+                history[c].append(result)
+            ranked = sorted(zip(survivors, scored), key=lambda pair: -pair[1]['mean_auc'])
+            keep = len(ranked) if r == len(schedule) - 1 else max(1, math.ceil(len(ranked) / self.factor))
+            survivors = [c for c, _ in ranked[:keep]]
+            print(f"   {self.name}: round {r + 1}/{len(schedule)} on {resource} rows, "
+                  f"{len(ranked)} candidates -> best ROC-AUC {ranked[0][1]['mean_auc']:.4f}")
+
+        best = survivors[0]
+        return {
+            'best_params': self.candidates[best],
+            'best_cv_auc': history[best][-1]['mean_auc'],
+            'schedule': schedule,
+            'wall_clock_seconds': time.perf_counter() - start,
+            'fits': sum(len(h) for h in history.values()) * self.cv,
+            'cached_fits': sum(r['cached_folds'] for h in history.values() for r in h),
+            'candidates': [{
+                'params': {k: v if isinstance(v, (int, float, str, bool, type(None))) else repr(v)
+                           for k, v in self.candidates[c].items()},
+                'rounds': history[c],
+                'fit_seconds': sum(r['fit_seconds'] for r in history[c])
+            } for c in sorted(history)]
+        }
+
+def run_search(searches: Dict, X: pd.DataFrame, y, cpus: int = None, cache_dir: str = CACHE_DIR,
+               cv: int = 5, factor: int = 3) -> Dict:
+    """
+    Search every family in `searches` ({name: (estimator, param_grid)}) concurrently.
+    The estimators are fitted single-threaded, `cpus` at a time (os.cpu_count() by default).
+    """
+    cpus = cpus or os.cpu_count() or 1
+    cache = FoldCache(cache_dir)
+    data_key = data_hash(X, y)
+    y = np.asarray(y)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=cpus, initializer=_init_worker, initargs=(X, y)) as pool:
+        families = {
+            name: HalvingSearch(name, estimator, grid, pool, cache, data_key, y, cv=cv, factor=factor)
+            for name, (estimator, grid) in searches.items()
+        }
+        # One driver thread per family; the fits themselves all queue on the shared pool
+        with ThreadPoolExecutor(max_workers=len(families)) as drivers:
+            running = {name: drivers.submit(search.run) for name, search in families.items()}
+            results = {name: future.result() for name, future in running.items()}
+    return {
+        'wall_clock_seconds': time.perf_counter() - start,
+        'cpu_budget': cpus,
+        'data_sha256': data_key,
+        'families': results
+    }
@@ -1,50 +1,147 @@
 """
 Model Explainability using SHAP
-Generates feature importance explanations for predictions
+Generates feature importance explanations for predictions and writes them as
+compact explanation bundles (see backend/app/services/explanation_bundle.py)
 """
 
-import shap
+import argparse
 import joblib
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import os
+import sys
+import xgboost as xgb
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from app.services.explanation_bundle import file_sha256, load_bundle, write_bundle
+from app.services.tree_explainer import TreeShapExplainer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from training_data import COLUMNAR_DIR, DATASET_MANIFEST, load_manifest, load_split
+
+MODELS_DIR = 'backend/ml_pipeline/models'
+BUNDLES_DIR = f'{MODELS_DIR}/explanations'
+# Raw-frame training data of the calibrated API model (model_xgb.joblib)
+API_BACKGROUND_PATH = 'backend/data/synthetic_credit_data.csv'
+TREE_COLUMNS = ['fold', 'tree', 'node', 'feature', 'split', 'yes', 'no', 'missing', 'value', 'cover']
 
 def load_model_and_data():
-    """Load trained model and test data"""
+    """Load trained model and test data; also returns the data file the bundle is keyed on"""
     print("Loading model and data...")
-    model = joblib.load('backend/ml_pipeline/models/best_model.pkl')
-    X_test = pd.read_csv('backend/ml_pipeline/data/X_test.csv')
-    feature_cols = joblib.load('backend/ml_pipeline/models/feature_columns.pkl')
+    model = joblib.load(f'{MODELS_DIR}/best_model.pkl')
+    if load_manifest() is None:
+        raise FileNotFoundError(f"No columnar dataset in {COLUMNAR_DIR}; run data_preprocessing.py first")
+    X_test, _ = load_split('test')
+    # The schema header carries every column's checksum
+    data_path = f'{COLUMNAR_DIR}/{DATASET_MANIFEST}'
+    feature_cols = joblib.load(f'{MODELS_DIR}/feature_columns.pkl')
     print(f"✅ Loaded model and {len(X_test)} test samples")
-    return model, X_test, feature_cols
+    return model, X_test, feature_cols, data_path
 
-def generate_shap_values(model, X_data, sample_size=100):
-    """Generate SHAP values for model explanations"""
-    print(f"\nGenerating SHAP values for {sample_size} samples...")
-    
-    # Take a sample for faster computation
+def sample_background(X_data, sample_size=100):
+    """Fixed background sample (same rows on every run for the same data)"""
     X_sample = X_data.sample(min(sample_size, len(X_data)), random_state=42)
-    
-    # Create explainer based on model type
-    model_type = type(model).__name__
-    
-    if 'XGB' in model_type:
-        explainer = shap.TreeExplainer(model)
-    elif 'RandomForest' in model_type:
-        explainer = shap.TreeExplainer(model)
-    else:  # Logistic Regression
-        explainer = shap.LinearExplainer(model, X_sample)
-    
-    shap_values = explainer.shap_values(X_sample)
-    
+    return X_sample, X_sample.index.to_numpy()
+
+def generate_shap_values(model, X_sample):
+    """
+    SHAP values [rows, features] and the expected value (log-odds for tree models).
+    XGBoost models use the booster's exact native TreeSHAP; other models fall back to shap.
+    """
+    print(f"\nGenerating SHAP values for {len(X_sample)} samples...")
+
+    if hasattr(model, 'calibrated_classifiers_'):
+        contributions, base = TreeShapExplainer.from_model(model).contributions(X_sample)
+        shap_values, expected_value = contributions, float(base.mean())
+    elif 'XGB' in type(model).__name__:
+        contribs = model.get_booster().predict(xgb.DMatrix(X_sample), pred_contribs=True)
+        shap_values, expected_value = contribs[:, :-1], float(contribs[:, -1].mean())
+    else:
+        import shap  # Only needed for non-XGBoost models
+        if 'RandomForest' in type(model).__name__:
+            explainer = shap.TreeExplainer(model)
+        else:  # Logistic Regression
+            explainer = shap.LinearExplainer(model, X_sample)
+        shap_values = explainer.shap_values(X_sample)
+        expected_value = explainer.expected_value
+        # Binary classifiers: keep the positive (default) class
+        if isinstance(shap_values, list):
+            shap_values, expected_value = shap_values[1], expected_value[1]
+        if len(np.shape(shap_values)) == 3:
+            shap_values, expected_value = shap_values[:, :, 1], np.ravel(expected_value)[1]
+        expected_value = float(np.ravel(expected_value)[0])
+
     print("✅ SHAP values generated")
-    return explainer, shap_values, X_sample
+    return np.asarray(shap_values), expected_value
 
-def plot_shap_summary(shap_values, X_sample, output_dir='backend/ml_pipeline/models'):
+def tree_node_table(model):
+    """Every node of every tree as one numeric row (TREE_COLUMNS); feature -1 marks a leaf"""
+    if hasattr(model, 'calibrated_classifiers_'):
+        boosters = [c.estimator.named_steps['classifier'].get_booster() for c in model.calibrated_classifiers_]
+    elif 'XGB' in type(model).__name__:
+        boosters = [model.get_booster()]
+    else:
+        return None
+
+    tables = []
+    for fold, booster in enumerate(boosters):
+        trees = booster.trees_to_dataframe()
+        names = booster.feature_names or []
+        index = {name: i for i, name in enumerate(names)}
+        node_of = lambda ids: pd.to_numeric(ids.str.split('-').str[1], errors='coerce').fillna(-1).to_numpy()
+        is_leaf = (trees['Feature'] == 'Leaf').to_numpy()
+        feature = np.array([
+            -1 if leaf else index.get(f, int(f[1:]) if f[1:].isdigit() else -1)
+            for f, leaf in zip(trees['Feature'], is_leaf)
+        ])
+        tables.append(np.column_stack([
+            np.full(len(trees), fold), trees['Tree'], trees['Node'], feature,
+            trees['Split'].fillna(0.0), node_of(trees['Yes'].fillna('')), node_of(trees['No'].fillna('')),
+            node_of(trees['Missing'].fillna('')),
+            trees['Gain'],  # Leaf value on leaves, split gain elsewhere
+            trees['Cover']
+        ]).astype(float))
+    return np.vstack(tables)
+
+def build_explanation_bundle(model, model_path, X_data, feature_cols, name, sample_size=200,
+                             data_path=None, leaf_tables=False, force=False):
+    """
+    Write (or reuse) the explanation bundle for one model.
+    An existing bundle is reused when the model file, source data and sample size are unchanged.
+    """
+    directory = f'{BUNDLES_DIR}/{name}'
+    data_sha256 = file_sha256(data_path) if data_path else None
+
+    bundle = None if force else load_bundle(directory, model_path)
+    if bundle is not None and bundle.manifest.get('data_sha256') == data_sha256 \
+            and bundle.manifest.get('sample_size') == sample_size \
+            and (bundle.has_array('tree_nodes') or not leaf_tables):
+        print(f"♻️  Reusing explanation bundle {directory} (model unchanged)")
+        return bundle, X_data.loc[np.asarray(bundle.array('background_index'))]
+
+    X_sample, index = sample_background(X_data, sample_size)
+    shap_values, expected_value = generate_shap_values(model, X_sample)
+    tree_nodes = tree_node_table(model) if leaf_tables else None
+    bundle = write_bundle(
+        directory, model_path, feature_cols, expected_value, shap_values, index,
+        tree_nodes=tree_nodes, tree_columns=TREE_COLUMNS if tree_nodes is not None else None,
+        metadata={'data_sha256': data_sha256, 'sample_size': sample_size}
+    )
+    print(f"✅ Explanation bundle written to {directory}")
+    return bundle, X_sample
+
+def plot_shap_summary(shap_values, X_sample, output_dir=MODELS_DIR):
     """Create SHAP summary plot"""
+    try:
+        import shap
+    except ImportError:
+        print("⚠️ shap not installed; skipping summary plot")
+        return
     os.makedirs(output_dir, exist_ok=True)
-    
+
     plt.figure(figsize=(10, 8))
     shap.summary_plot(shap_values, X_sample, show=False)
     plt.tight_layout()
@@ -52,55 +149,40 @@ def plot_shap_summary(shap_values, X_sample, output_dir='backend/ml_pipeline/mod
     plt.close()
     print("✅ SHAP summary plot saved")
 
-def get_global_feature_importance(shap_values, feature_cols):
-    """Calculate global feature importance from SHAP values"""
-    # Handle both 2D and 3D SHAP values arrays
-    if isinstance(shap_values, list):
-        shap_values = shap_values[1]  # For binary classification, take positive class
-    
-    if len(shap_values.shape) == 3:
-        shap_values = shap_values[:, :, 1]  # Take positive class
-    
-    # Calculate mean absolute SHAP values
-    feature_importance = np.abs(shap_values).mean(axis=0)
-    
-    importance_df = pd.DataFrame({
-        'feature': feature_cols,
-        'importance': feature_importance
-    }).sort_values('importance', ascending=False)
-    
-    return importance_df
-
-def explain_single_prediction(model, explainer, X_sample, idx=0):
-    """Explain a single prediction"""
+def get_global_feature_importance(bundle):
+    """Global feature importance (mean |SHAP|) from an explanation bundle"""
+    return pd.DataFrame(bundle.global_importance())[['feature', 'importance']]
+
+def explain_single_prediction(model, bundle, X_sample, idx=0):
+    """Explain a single prediction from the bundle's cached SHAP values"""
     print(f"\nExplaining prediction for sample {idx}...")
-    
+
     # Get single sample
     sample = X_sample.iloc[[idx]]
-    
+
     # Get prediction
     prediction = model.predict(sample)[0]
     probability = model.predict_proba(sample)[0]
-    
-    # Get SHAP values for this sample
-    shap_value = explainer.shap_values(sample)
-    
+
+    # SHAP values for this sample were computed when the bundle was built
+    shap_value = np.asarray(bundle.array('background_contributions')[idx])
+
     print(f"   Prediction: {'Default' if prediction == 1 else 'No Default'}")
     print(f"   Probability: {probability[1]:.4f}")
-    
+
     return {
         'prediction': int(prediction),
         'probability': float(probability[1]),
         'shap_values': shap_value
     }
 
-def save_global_importance(importance_df, output_dir='backend/ml_pipeline/models'):
+def save_global_importance(importance_df, output_dir=MODELS_DIR):
     """Save global feature importance"""
     os.makedirs(output_dir, exist_ok=True)
-    
+
     importance_df.to_csv(f'{output_dir}/global_feature_importance.csv', index=False)
     print(f"✅ Global feature importance saved")
-    
+
     # Plot top features
     plt.figure(figsize=(10, 6))
     top_features = importance_df.head(15)
@@ -114,43 +196,64 @@ def save_global_importance(importance_df, output_dir='backend/ml_pipeline/models
     plt.close()
     print("✅ Feature importance plot saved")
 
-def main_explainability_pipeline():
+def build_api_bundle(sample_size=200, leaf_tables=False, force=False):
+    """Bundle for the calibrated XGBoost pipeline served by the API, over its raw input features"""
+    model_path = f'{MODELS_DIR}/model_xgb.joblib'
+    model = joblib.load(model_path)
+    X_raw = pd.read_csv(API_BACKGROUND_PATH)
+    explainer = TreeShapExplainer.from_model(model)
+    bundle, _ = build_explanation_bundle(
+        model, model_path, X_raw, explainer.raw_features, 'model_xgb', sample_size=sample_size,
+        data_path=API_BACKGROUND_PATH, leaf_tables=leaf_tables, force=force
+    )
+    return bundle
+
+def main_explainability_pipeline(sample_size=200, leaf_tables=False, force=False):
     """Main explainability pipeline"""
     print("="*60)
     print("MODEL EXPLAINABILITY PIPELINE (SHAP)")
     print("="*60)
-    
+
     # Load model and data
-    model, X_test, feature_cols = load_model_and_data()
-    
-    # Generate SHAP values
-    explainer, shap_values, X_sample = generate_shap_values(model, X_test, sample_size=200)
-    
+    model, X_test, feature_cols, data_path = load_model_and_data()
+
+    # SHAP values, cached in the explanation bundle
+    bundle, X_sample = build_explanation_bundle(
+        model, f'{MODELS_DIR}/best_model.pkl', X_test, feature_cols, 'best_model',
+        sample_size=sample_size, data_path=data_path,
+        leaf_tables=leaf_tables, force=force
+    )
+    shap_values = np.asarray(bundle.array('background_contributions'))
+
     # Plot SHAP summary
     plot_shap_summary(shap_values, X_sample)
-    
+
     # Get global feature importance
-    importance_df = get_global_feature_importance(shap_values, feature_cols)
+    importance_df = get_global_feature_importance(bundle)
     print("\n📊 Top 10 Most Important Features:")
     print(importance_df.head(10).to_string(index=False))
-    
+
     # Save importance
     save_global_importance(importance_df)
-    
-    # Save explainer for API use
-    joblib.dump(explainer, 'backend/ml_pipeline/models/shap_explainer.pkl')
-    print("\n✅ SHAP explainer saved for API use")
-    
+
+    # Bundle for API use (replaces the pickled shap_explainer.pkl)
+    build_api_bundle(sample_size=sample_size, leaf_tables=leaf_tables, force=force)
+
     # Example: Explain a few predictions
     print("\n" + "="*60)
     print("EXAMPLE PREDICTIONS")
     print("="*60)
     for i in range(min(3, len(X_sample))):
-        explain_single_prediction(model, explainer, X_sample, idx=i)
-    
+        explain_single_prediction(model, bundle, X_sample, idx=i)
+
     print("\n" + "="*60)
     print("✨ EXPLAINABILITY ANALYSIS COMPLETE!")
     print("="*60)
 
 if __name__ == "__main__":
-    main_explainability_pipeline()
+    parser = argparse.ArgumentParser(description="Build explanation bundles")
+    parser.add_argument('--sample-size', type=int, default=200)
+    parser.add_argument('--leaf-tables', action='store_true', help="Also store flattened tree node tables")
+    parser.add_argument('--force', action='store_true', help="Recompute even if the bundles are current")
+    args = parser.parse_args()
+    main_explainability_pipeline(args.sample_size, args.leaf_tables, args.force)
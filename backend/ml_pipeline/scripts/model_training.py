@@ -7,142 +7,137 @@ import pandas as pd
 import numpy as np
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import cross_val_score, GridSearchCV
-from sklearn.metrics import (
-    classification_report, confusion_matrix, roc_auc_score,
-    roc_curve, precision_recall_curve, accuracy_score
-)
+from sklearn.base import clone
 import xgboost as xgb
 import joblib
 import matplotlib.pyplot as plt
 import seaborn as sns
+import argparse
 import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hyperparameter_search import CACHE_DIR, run_search
+from streaming_evaluation import METRICS_PATH, StreamingEvaluator, merge_metrics
+from training_data import COLUMNAR_DIR, load_manifest, load_split
+
+# Test rows scored per predict_proba call during evaluation
+EVAL_CHUNK_ROWS = 100_000
 
 def load_processed_data():
-    """Load preprocessed training and test data"""
+    """Load preprocessed training and test data (memory-mapped columnar files)"""
     print("Loading preprocessed data...")
-    X_train = pd.read_csv('backend/ml_pipeline/data/X_train.csv')
-    X_test = pd.read_csv('backend/ml_pipeline/data/X_test.csv')
-    y_train = pd.read_csv('backend/ml_pipeline/data/y_train.csv').values.ravel()
-    y_test = pd.read_csv('backend/ml_pipeline/data/y_test.csv').values.ravel()
+    manifest = load_manifest()
+    if manifest is None:
+        raise FileNotFoundError(f"No columnar dataset in {COLUMNAR_DIR}; run data_preprocessing.py first")
+    X_train, y_train = load_split('train', manifest=manifest)
+    X_test, y_test = load_split('test', manifest=manifest)
     print(f"✅ Loaded train: {len(X_train)}, test: {len(X_test)}")
     return X_train, X_test, y_train, y_test
 
-def train_logistic_regression(X_train, y_train):
-    """Train Logistic Regression model"""
-    print("\n" + "="*60)
-    print("Training Logistic Regression...")
-    print("="*60)
-    
-    # Hyperparameter tuning
-    param_grid = {
-        'C': [0.01, 0.1, 1, 10],
-        'penalty': ['l2'],
-        'solver': ['lbfgs'],
-        'max_iter': [1000]
-    }
-    
-    lr = LogisticRegression(random_state=42)
-    grid_search = GridSearchCV(lr, param_grid, cv=5, scoring='roc_auc', n_jobs=-1, verbose=1)
-    grid_search.fit(X_train, y_train)
-    
-    print(f"✅ Best parameters: {grid_search.best_params_}")
-    print(f"✅ Best cross-validation ROC-AUC: {grid_search.best_score_:.4f}")
-    
-    return grid_search.best_estimator_
+def search_spaces(y_train):
+    """Estimator and param grid per model family (fitted single-threaded during the search)"""
+    # Calculate scale_pos_weight for class imbalance
+    scale_pos_weight = (y_train == 0).sum() / (y_train == 1).sum()
 
-def train_random_forest(X_train, y_train):
-    """Train Random Forest model"""
-    print("\n" + "="*60)
-    print("Training Random Forest...")
-    print("="*60)
-    
-    # Hyperparameter tuning
-    param_grid = {
-        'n_estimators': [100, 200],
-        'max_depth': [10, 20, None],
-        'min_samples_split': [2, 5],
-        'min_samples_leaf': [1, 2],
-        'class_weight': ['balanced']
+    return {
+        "Logistic Regression": (LogisticRegression(random_state=42), {
+            'C': [0.01, 0.1, 1, 10],
+            'penalty': ['l2'],
+            'solver': ['lbfgs'],
+            'max_iter': [1000]
+        }),
+        "Random Forest": (RandomForestClassifier(random_state=42, n_jobs=1), {
+            'n_estimators': [100, 200],
+            'max_depth': [10, 20, None],
+            'min_samples_split': [2, 5],
+            'min_samples_leaf': [1, 2],
+            'class_weight': ['balanced']
+        }),
+        "XGBoost": (xgb.XGBClassifier(random_state=42, eval_metric='logloss', n_jobs=1), {
+            'max_depth': [3, 5, 7],
+            'learning_rate': [0.01, 0.1],
+            'n_estimators': [100, 200],
+            'scale_pos_weight': [float(scale_pos_weight)],
+            'subsample': [0.8, 1.0],
+            'colsample_bytree': [0.8, 1.0]
+        }),
     }
-    
-    rf = RandomForestClassifier(random_state=42)
-    grid_search = GridSearchCV(rf, param_grid, cv=5, scoring='roc_auc', n_jobs=-1, verbose=1)
-    grid_search.fit(X_train, y_train)
-    
-    print(f"✅ Best parameters: {grid_search.best_params_}")
-    print(f"✅ Best cross-validation ROC-AUC: {grid_search.best_score_:.4f}")
-    
-    return grid_search.best_estimator_
 
-def train_xgboost(X_train, y_train):
-    """Train XGBoost model"""
+def train_models(X_train, y_train, cpus=None, cache_dir=CACHE_DIR):
+    """
+    Search all model families concurrently (see hyperparameter_search.py), then refit
+    each family's best candidate on the full training set.
+    """
     print("\n" + "="*60)
-    print("Training XGBoost...")
+    print("Hyperparameter search (successive halving, all families in parallel)...")
     print("="*60)
-    
-    # Calculate scale_pos_weight for class imbalance
-    scale_pos_weight = (y_train == 0).sum() / (y_train == 1).sum()
-    
-    # Hyperparameter tuning
-    param_grid = {
-        'max_depth': [3, 5, 7],
-        'learning_rate': [0.01, 0.1],
-        'n_estimators': [100, 200],
-        'scale_pos_weight': [scale_pos_weight],
-        'subsample': [0.8, 1.0],
-        'colsample_bytree': [0.8, 1.0]
-    }
-    
-    xgb_model = xgb.XGBClassifier(random_state=42, use_label_encoder=False, eval_metric='logloss')
-    grid_search = GridSearchCV(xgb_model, param_grid, cv=5, scoring='roc_auc', n_jobs=-1, verbose=1)
-    grid_search.fit(X_train, y_train)
-    
-    print(f"✅ Best parameters: {grid_search.best_params_}")
-    print(f"✅ Best cross-validation ROC-AUC: {grid_search.best_score_:.4f}")
-    
-    return grid_search.best_estimator_
 
-def evaluate_model(model, X_test, y_test, model_name):
-    """Evaluate model performance"""
+    spaces = search_spaces(y_train)
+    search = run_search(spaces, X_train, y_train, cpus=cpus, cache_dir=cache_dir)
+
+    models = {}
+    for name, (estimator, _) in spaces.items():
+        found = search['families'][name]
+        print(f"\n{name}")
+        print(f"✅ Best parameters: {found['best_params']}")
+        print(f"✅ Best cross-validation ROC-AUC: {found['best_cv_auc']:.4f}")
+        print(f"   {found['fits']} fold fits, {found['cached_fits']} from cache, "
+              f"{found['wall_clock_seconds']:.1f} s")
+
+        start = time.perf_counter()
+        model = clone(estimator).set_params(**found['best_params'])
+        if 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=search['cpu_budget'])
+        model.fit(X_train, y_train)
+        found['refit_seconds'] = time.perf_counter() - start
+        models[name] = model
+
+    print(f"\n✅ Search finished in {search['wall_clock_seconds']:.1f} s on {search['cpu_budget']} CPU(s)")
+    return models, search
+
+def evaluate_model(model, X_test, y_test, model_name, business_types=None, chunk_rows=EVAL_CHUNK_ROWS):
+    """
+    Evaluate model performance chunk by chunk (see streaming_evaluation.py), so the
+    (memory-mapped) test split is never scored in one piece. `business_types` decodes
+    business_type_encoded for the per-type approval rates.
+    """
     print(f"\n{'='*60}")
     print(f"Evaluating {model_name}")
     print(f"{'='*60}")
     
-    # Predictions
-    y_pred = model.predict(X_test)
-    y_pred_proba = model.predict_proba(X_test)[:, 1]
-    
-    # Metrics
-    accuracy = accuracy_score(y_test, y_pred)
-    roc_auc = roc_auc_score(y_test, y_pred_proba)
+    evaluator = StreamingEvaluator()
+    y_test = np.asarray(y_test)
+    for start in range(0, len(X_test), chunk_rows):
+        X_chunk = X_test.iloc[start:start + chunk_rows]
+        groups = None
+        if business_types is not None and 'business_type_encoded' in X_chunk:
+            groups = np.asarray(business_types)[X_chunk['business_type_encoded'].to_numpy(dtype=int)]
+        evaluator.update(y_test[start:start + chunk_rows], model.predict_proba(X_chunk)[:, 1], groups)
+    metrics = evaluator.summary()
     
     print(f"\n📊 Performance Metrics:")
-    print(f"   Accuracy: {accuracy:.4f}")
-    print(f"   ROC-AUC: {roc_auc:.4f}")
+    print(f"   Accuracy: {metrics['accuracy']:.4f}")
+    print(f"   ROC-AUC: {metrics['auc']:.4f}")
+    print(f"   Brier score: {metrics['brier_score']:.4f}")
     
     print(f"\n📋 Classification Report:")
-    print(classification_report(y_test, y_pred, target_names=['No Default', 'Default']))
+    print(evaluator.report())
     
     print(f"\n📈 Confusion Matrix:")
-    cm = confusion_matrix(y_test, y_pred)
-    print(cm)
+    print(evaluator.confusion)
     
-    # Calculate additional metrics
-    tn, fp, fn, tp = cm.ravel()
-    specificity = tn / (tn + fp)
-    sensitivity = tp / (tp + fn)
-    
-    print(f"\n   Sensitivity (Recall): {sensitivity:.4f}")
-    print(f"   Specificity: {specificity:.4f}")
+    print(f"\n   Sensitivity (Recall): {metrics['recall']:.4f}")
+    print(f"   Specificity: {metrics['specificity']:.4f}")
     
     return {
         'model_name': model_name,
-        'accuracy': accuracy,
-        'roc_auc': roc_auc,
-        'confusion_matrix': cm,
-        'y_pred': y_pred,
-        'y_pred_proba': y_pred_proba
+        'accuracy': metrics['accuracy'],
+        'roc_auc': metrics['auc'],
+        'confusion_matrix': evaluator.confusion,
+        'metrics': metrics
     }
 
 def compare_models(results):
@@ -184,7 +179,27 @@ def plot_feature_importance(model, feature_cols, model_name, output_dir='backend
         plt.close()
         print(f"✅ Saved feature importance plot")
 
-def main_training_pipeline():
+def save_training_metrics(search, results, path=METRICS_PATH):
+    """Merge search timings and test scores into metrics.json under "training", keeping other keys"""
+    families = {}
+    for r in results:
+        found = search['families'][r['model_name']]
+        families[r['model_name']] = {
+            **{k: v for k, v in found.items() if k != 'candidates'},
+            'test_auc': float(r['roc_auc']),
+            'test_accuracy': float(r['accuracy']),
+            'test_metrics': r['metrics'],
+            'candidates': found['candidates']
+        }
+    merge_metrics({'training': {
+        'wall_clock_seconds': search['wall_clock_seconds'],
+        'cpu_budget': search['cpu_budget'],
+        'data_sha256': search['data_sha256'],
+        'families': families
+    }}, path)
+    print(f"✅ Training timings written to {path}")
+
+def main_training_pipeline(cpus=None, cache_dir=CACHE_DIR):
     """Main training pipeline"""
     print("\n" + "="*60)
     print("CREDIT RISK MODEL TRAINING PIPELINE")
@@ -197,26 +212,26 @@ def main_training_pipeline():
     feature_cols = joblib.load('backend/ml_pipeline/models/feature_columns.pkl')
     
     # Train models
-    lr_model = train_logistic_regression(X_train, y_train)
-    rf_model = train_random_forest(X_train, y_train)
-    xgb_model = train_xgboost(X_train, y_train)
+    models, search = train_models(X_train, y_train, cpus=cpus, cache_dir=cache_dir)
+    lr_model = models["Logistic Regression"]
+    rf_model = models["Random Forest"]
+    xgb_model = models["XGBoost"]
     
-    # Evaluate models
-    lr_results = evaluate_model(lr_model, X_test, y_test, "Logistic Regression")
-    rf_results = evaluate_model(rf_model, X_test, y_test, "Random Forest")
-    xgb_results = evaluate_model(xgb_model, X_test, y_test, "XGBoost")
+    # Evaluate models (business types decoded for the approval rates)
+    business_types = joblib.load('backend/ml_pipeline/models/label_encoders.pkl')['business_type'].classes_
+    lr_results = evaluate_model(lr_model, X_test, y_test, "Logistic Regression", business_types)
+    rf_results = evaluate_model(rf_model, X_test, y_test, "Random Forest", business_types)
+    xgb_results = evaluate_model(xgb_model, X_test, y_test, "XGBoost", business_types)
     
     results = [lr_results, rf_results, xgb_results]
     
     # Compare models
     best_model_name = compare_models(results)
     
+    # Record search timings alongside the test scores
+    save_training_metrics(search, results)
+
     # Select best model
-    models = {
-        "Logistic Regression": lr_model,
-        "Random Forest": rf_model,
-        "XGBoost": xgb_model
-    }
     best_model = models[best_model_name]
     
     # Save best model
@@ -239,4 +254,8 @@ def main_training_pipeline():
     print("="*60)
 
 if __name__ == "__main__":
-    main_training_pipeline()
+    parser = argparse.ArgumentParser(description="Train and compare credit risk models")
+    parser.add_argument('--cpus', type=int, default=None, help="CPU budget shared by all searches (default: all)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="Fold result cache")
+    args = parser.parse_args()
+    main_training_pipeline(args.cpus, args.cache_dir)
@@ -0,0 +1,288 @@
+"""
+Streaming (chunked) model evaluation
+
+A StreamingEvaluator accumulates everything metrics.json reports from one chunk of
+(label, predicted PD, business type) at a time: ROC-AUC from per-score positive /
+negative counts merged in sorted order, the confusion matrix at the decision
+threshold, calibration bins, Brier score and log loss, and approval rates per
+business type. Memory is bounded by the number of distinct scores, not rows; past
+MAX_DISTINCT_SCORES the scores are bucketed into a fixed histogram instead, so a
+holdout of any size can be evaluated in one pass.
+
+The command line scores a holdout file (CSV / NDJSON) or a directory of generated
+shards (generate_dataset.py --shards-dir) with every model in one scan and merges the
+results into metrics.json:
+
+    python backend/generate_dataset.py --num-records 5000000 --seed 7 --shards-dir /tmp/holdout
+    python backend/ml_pipeline/scripts/streaming_evaluation.py --holdout /tmp/holdout
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from sharded_generation import MANIFEST
+
+METRICS_PATH = 'backend/ml_pipeline/metrics.json'
+MODELS_DIR = 'backend/ml_pipeline/models'
+
+# metrics.json key -> served model evaluated by default
+DEFAULT_MODELS = {
+    'xgboost': f'{MODELS_DIR}/model_xgb.joblib',
+    'logistic_regression': f'{MODELS_DIR}/model_lr.joblib',
+}
+FAIRNESS_MODEL = 'xgboost'
+
+TARGET_COL = 'default_flag'
+GROUP_COL = 'business_type'
+CHUNK_ROWS = 100_000
+
+# Predicted default above this PD (what predict() does for a binary classifier)
+DECISION_THRESHOLD = 0.5
+# Same cut-off as the credit service's APPROVE recommendation (APPROVE_BELOW_PD)
+APPROVE_BELOW_PD = 0.25
+
+CALIBRATION_BINS = 10
+# Distinct scores kept exactly for the AUC; beyond that they share HISTOGRAM_BINS buckets
+MAX_DISTINCT_SCORES = 1 << 20
+HISTOGRAM_BINS = 1 << 16
+
+LOG_LOSS_EPS = 1e-15
+
+class StreamingEvaluator:
+    """Binary classification metrics accumulated over chunks; update() then summary()"""
+
+    def __init__(self, threshold: float = DECISION_THRESHOLD, approve_below: float = APPROVE_BELOW_PD,
+                 calibration_bins: int = CALIBRATION_BINS, max_distinct_scores: int = MAX_DISTINCT_SCORES,
+                 histogram_bins: int = HISTOGRAM_BINS):
+        self.threshold = threshold
+        self.approve_below = approve_below
+        self.calibration_bins = calibration_bins
+        self.max_distinct_scores = max_distinct_scores
+        self.histogram_bins = histogram_bins
+        self.resolution = None  # Set once scores are bucketed (the AUC becomes approximate)
+        # Ascending distinct scores with their positive / negative counts
+        self.scores = np.zeros(0)
+        self.positives = np.zeros(0, dtype=np.int64)
+        self.negatives = np.zeros(0, dtype=np.int64)
+        self.confusion = np.zeros((2, 2), dtype=np.int64)  # [actual, predicted]
+        self.bin_count = np.zeros(calibration_bins, dtype=np.int64)
+        self.bin_pd_sum = np.zeros(calibration_bins)
+        self.bin_default_sum = np.zeros(calibration_bins, dtype=np.int64)
+        self.squared_error_sum = 0.0
+        self.log_loss_sum = 0.0
+        self.groups: Dict[str, np.ndarray] = {}  # business type -> [rows, approved, defaults]
+
+    @property
+    def rows(self) -> int:
+        return int(self.confusion.sum())
+
+    def update(self, y_true, y_proba, groups=None):
+        """Add one chunk: labels (0/1), predicted PDs and optionally each row's group"""
+        y = np.asarray(y_true).astype(np.int64).ravel()
+        p = np.asarray(y_proba, dtype=float).ravel()
+        if len(y) != len(p):
+            raise ValueError(f"{len(y)} labels for {len(p)} predictions")
+        if not len(y):
+            return
+        predicted = (p > self.threshold).astype(np.int64)
+        self.confusion += np.bincount(2 * y + predicted, minlength=4).reshape(2, 2)
+
+        bins = np.minimum((p * self.calibration_bins).astype(np.int64), self.calibration_bins - 1)
+        self.bin_count += np.bincount(bins, minlength=self.calibration_bins)
+        self.bin_pd_sum += np.bincount(bins, weights=p, minlength=self.calibration_bins)
+        self.bin_default_sum += np.bincount(bins, weights=y, minlength=self.calibration_bins).astype(np.int64)
+        self.squared_error_sum += float(np.square(p - y).sum())
+        clipped = np.clip(p, LOG_LOSS_EPS, 1 - LOG_LOSS_EPS)
+        self.log_loss_sum -= float(np.where(y == 1, np.log(clipped), np.log1p(-clipped)).sum())
+
+        self._merge_scores(p, y)
+
+        if groups is not None:
+            codes, names = pd.factorize(np.asarray(groups).ravel(), use_na_sentinel=False)
+            counts = np.stack([
+                np.bincount(codes, minlength=len(names)),
+                np.bincount(codes, weights=p < self.approve_below, minlength=len(names)),
+                np.bincount(codes, weights=y, minlength=len(names)),
+            ], axis=1).astype(np.int64)
+            for name, row in zip(names, counts):
+                key = str(name)
+                self.groups[key] = self.groups[key] + row if key in self.groups else row
+
+    def _merge_scores(self, p, y):
+        if self.resolution is not None:
+            p = self._bucket(p)
+        scores = np.concatenate([self.scores, p])
+        positives = np.concatenate([self.positives, y])
+        negatives = np.concatenate([self.negatives, 1 - y])
+        self.scores, index = np.unique(scores, return_inverse=True)
+        self.positives = np.bincount(index, weights=positives, minlength=len(self.scores)).astype(np.int64)
+        self.negatives = np.bincount(index, weights=negatives, minlength=len(self.scores)).astype(np.int64)
+        if self.resolution is None and len(self.scores) > self.max_distinct_scores:
+            self.resolution = self.histogram_bins
+            self.scores, index = np.unique(self._bucket(self.scores), return_inverse=True)
+            self.positives = np.bincount(index, weights=self.positives).astype(np.int64)
+            self.negatives = np.bincount(index, weights=self.negatives).astype(np.int64)
+
+    def _bucket(self, p):
+        """Lower edge of each score's histogram bucket (order-preserving)"""
+        return np.floor(np.clip(p, 0.0, 1.0) * self.resolution) / self.resolution
+
+    def roc_auc(self) -> float:
+        """
+        P(score of a default > score of a non-default), ties counting half: the area under
+        the ROC curve. Exact until scores are bucketed, then within the tied fraction.
+        """
+        total_pos, total_neg = int(self.positives.sum()), int(self.negatives.sum())
+        if not total_pos or not total_neg:
+            return float('nan')
+        negatives_below = np.cumsum(self.negatives) - self.negatives
+        wins = (self.positives * (negatives_below + 0.5 * self.negatives)).sum()
+        return float(wins / total_pos / total_neg)
+
+    def summary(self) -> Dict:
+        rows = self.rows
+        (tn, fp), (fn, tp) = self.confusion.tolist()
+
+        def ratio(a, b):
+            return a / b if b else 0.0
+
+        precision, recall = ratio(tp, tp + fp), ratio(tp, tp + fn)
+        calibration = []
+        for i in range(self.calibration_bins):
+            count = int(self.bin_count[i])
+            calibration.append({
+                'bin_lower': round(i / self.calibration_bins, 4),
+                'bin_upper': round((i + 1) / self.calibration_bins, 4),
+                'count': count,
+                'mean_predicted_pd': ratio(float(self.bin_pd_sum[i]), count),
+                'observed_default_rate': ratio(int(self.bin_default_sum[i]), count),
+            })
+        ece = sum(abs(b['mean_predicted_pd'] - b['observed_default_rate']) * b['count'] for b in calibration)
+        groups = {name: {'rows': int(n), 'approval_rate': round(ratio(int(approved), int(n)), 4),
+                         'default_rate': round(ratio(int(defaults), int(n)), 4)}
+                  for name, (n, approved, defaults) in sorted(self.groups.items())}
+        return {
+            'auc': self.roc_auc(),
+            'accuracy': ratio(tn + tp, rows),
+            'rows': rows,
+            'defaults': fn + tp,
+            'precision': precision,
+            'recall': recall,
+            'specificity': ratio(tn, tn + fp),
+            'f1': ratio(2 * precision * recall, precision + recall),
+            'brier_score': ratio(self.squared_error_sum, rows),
+            'log_loss': ratio(self.log_loss_sum, rows),
+            'expected_calibration_error': ratio(ece, rows),
+            'decision_threshold': self.threshold,
+            'confusion_matrix': {'tn': tn, 'fp': fp, 'fn': fn, 'tp': tp},
+            'calibration': calibration,
+            'auc_histogram_bins': self.resolution,
+            'approve_below_pd': self.approve_below,
+            'approval_rate': ratio(sum(int(c[1]) for c in self.groups.values()), rows) if self.groups else None,
+            'business_types': groups,
+        }
+
+    def report(self) -> str:
+        """Per-class precision / recall / F1 table, laid out like sklearn's classification_report"""
+        (tn, fp), (fn, tp) = self.confusion.tolist()
+        lines = [f"{'':>14}{'precision':>10}{'recall':>10}{'f1-score':>10}{'support':>10}", ""]
+        for name, hit, false_alarm, miss in (('No Default', tn, fn, fp), ('Default', tp, fp, fn)):
+            precision = hit / (hit + false_alarm) if hit + false_alarm else 0.0
+            recall = hit / (hit + miss) if hit + miss else 0.0
+            f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+            lines.append(f"{name:>14}{precision:10.2f}{recall:10.2f}{f1:10.2f}{hit + miss:10d}")
+        lines += ["", f"{'accuracy':>14}{'':>20}{(tn + tp) / max(self.rows, 1):10.2f}{self.rows:10d}"]
+        return "\n".join(lines)
+
+def holdout_files(path: str):
+    """The holdout's files in order: one file, or a shard directory's parts"""
+    if not os.path.isdir(path):
+        return [path]
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            return [os.path.join(path, part['file']) for part in json.load(f)['parts']]
+    except (OSError, ValueError, KeyError):
+        return sorted(glob.glob(os.path.join(path, 'part-*.csv')))
+
+def iter_holdout(path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Raw application frames of at most chunk_rows rows from a CSV / NDJSON file or shard directory"""
+    for file in holdout_files(path):
+        if file.endswith(('.ndjson', '.jsonl')):
+            chunks = pd.read_json(file, lines=True, chunksize=chunk_rows)
+        else:
+            # 'None' is a collateral type, not a missing value
+            chunks = pd.read_csv(file, chunksize=chunk_rows, keep_default_na=False)
+        with chunks:
+            yield from chunks
+
+def evaluate_holdout(models: Dict, chunks, target: str = TARGET_COL, group: Optional[str] = GROUP_COL,
+                     **evaluator_args) -> Dict[str, StreamingEvaluator]:
+    """One pass over `chunks` (raw frames), scoring every model (name -> predict_proba model) per chunk"""
+    evaluators = {name: StreamingEvaluator(**evaluator_args) for name in models}
+    for chunk in chunks:
+        groups = chunk[group].to_numpy() if group and group in chunk else None
+        for name, model in models.items():
+            evaluators[name].update(chunk[target].to_numpy(), model.predict_proba(chunk)[:, 1], groups)
+    return evaluators
+
+def merge_metrics(updates: Dict, path: str = METRICS_PATH):
+    """Replace the top-level keys in `updates` in metrics.json (atomically), keeping the others"""
+    try:
+        with open(path) as f:
+            metrics = json.load(f)
+    except (OSError, ValueError):
+        metrics = {}
+    metrics.update(updates)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    staging = f"{path}.tmp-{os.getpid()}"
+    with open(staging, 'w') as f:
+        json.dump(metrics, f, indent=4)
+    os.replace(staging, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate models over a holdout in chunks and write metrics.json")
+    parser.add_argument('--holdout', required=True, help="CSV / NDJSON file or generated shard directory")
+    parser.add_argument('--model', action='append', metavar='NAME=PATH',
+                        help=f"metrics.json key and joblib model (default: {', '.join(DEFAULT_MODELS)})")
+    parser.add_argument('--fairness-model', default=FAIRNESS_MODEL,
+                        help="Model whose approval rates become fairness_approval_rates")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--output', default=METRICS_PATH)
+    args = parser.parse_args()
+
+    import joblib
+
+    paths = dict(spec.split('=', 1) for spec in args.model) if args.model else DEFAULT_MODELS
+    models = {name: joblib.load(path) for name, path in paths.items()}
+    print(f"Evaluating {', '.join(models)} on {args.holdout} in chunks of {args.chunk_rows:,} rows...")
+    start = time.perf_counter()
+    evaluators = evaluate_holdout(models, iter_holdout(args.holdout, args.chunk_rows))
+    seconds = time.perf_counter() - start
+
+    updates = {}
+    for name, evaluator in evaluators.items():
+        summary = evaluator.summary()
+        summary['holdout'] = args.holdout
+        updates[name] = summary
+        print(f"✅ {name}: AUC {summary['auc']:.4f}, accuracy {summary['accuracy']:.4f} "
+              f"on {summary['rows']:,} rows")
+    fairness = updates.get(args.fairness_model)
+    if fairness is not None and fairness['business_types']:
+        updates['fairness_approval_rates'] = {name: g['approval_rate'] for name, g in fairness['business_types'].items()}
+    merge_metrics(updates, args.output)
+    rows = evaluators[next(iter(evaluators))].rows if evaluators else 0
+    print(f"✅ Metrics written to {args.output} ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Columnar on-disk training data
+One .npy file per column per split (train/test), plus dataset.json: the schema header
+with the splits, their row counts, column dtypes and checksums, and the versions of
+the encoders and scaler that produced them. Files are written sequentially, so
+producing them never needs more memory than one chunk of rows; loading memory-maps
+them, so reading a split parses nothing and copies nothing.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+COLUMNAR_DIR = 'backend/ml_pipeline/data/columnar'
+DATASET_MANIFEST = 'dataset.json'
+DATASET_FORMAT = 1
+
+class ColumnarWriter:
+    """
+    Append row chunks of one split to per-column .npy files.
+    The row count must be known up front: each file's header is written first and
+    the column's bytes are streamed after it.
+    """
+
+    def __init__(self, directory: str, split: str, columns: Dict[str, np.dtype], rows: int):
+        self.directory = os.path.join(directory, split)
+        self.split = split
+        self.columns = {name: np.dtype(dtype) for name, dtype in columns.items()}
+        self.rows = rows
+        self.written = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self._files = {}
+        for name, dtype in self.columns.items():
+            f = open(os.path.join(self.directory, f"{name}.npy"), "wb")
+            np.lib.format.write_array_header_1_0(f, {
+                'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (rows,)
+            })
+            self._files[name] = f
+        self._digests = {name: hashlib.sha256() for name in self.columns}
+
+    def append(self, frame: pd.DataFrame):
+        if self.written + len(frame) > self.rows:
+            raise ValueError(f"{self.split}: more than the declared {self.rows} rows")
+        for name, dtype in self.columns.items():
+            data = np.ascontiguousarray(frame[name].to_numpy(), dtype=dtype).tobytes()
+            self._files[name].write(data)
+            self._digests[name].update(data)
+        self.written += len(frame)
+
+    def close(self) -> Dict:
+        """Close the files; returns the split's manifest entry"""
+        for f in self._files.values():
+            f.close()
+        if self.written != self.rows:
+            raise ValueError(f"{self.split}: wrote {self.written} rows, declared {self.rows}")
+        return {
+            'rows': self.rows,
+            'columns': [{'name': name, 'dtype': dtype.str, 'sha256': self._digests[name].hexdigest()}
+                        for name, dtype in self.columns.items()]
+        }
+
+def write_frame(directory: str, split: str, X: pd.DataFrame, y, target: str) -> Dict:
+    """Write an in-memory split (features plus target column) in one go"""
+    columns = {name: X[name].dtype for name in X.columns}
+    columns[target] = np.asarray(y).dtype
+    writer = ColumnarWriter(directory, split, columns, len(X))
+    writer.append(X.assign(**{target: np.asarray(y)}))
+    return writer.close()
+
+def encoder_versions(encoders: Dict, scaler, artifacts_dir: str) -> Dict:
+    """Which fitted transformers produced the data: library version, classes, artifact hashes"""
+    def artifact_sha256(name):
+        path = os.path.join(artifacts_dir, name)
+        return hashlib.sha256(open(path, 'rb').read()).hexdigest() if os.path.exists(path) else None
+
+    return {
+        'sklearn': sklearn.__version__,
+        'label_encoders_sha256': artifact_sha256('label_encoders.pkl'),
+        'scaler_sha256': artifact_sha256('scaler.pkl'),
+        'classes': {col: [str(c) for c in le.classes_] for col, le in encoders.items()},
+        'scaled_columns': [str(c) for c in getattr(scaler, 'feature_names_in_', [])],
+    }
+
+def write_manifest(directory: str, splits: Dict[str, Dict], target: str, feature_columns: List[str],
+                   metadata: Dict = None):
+    """dataset.json is written last, so a directory without it holds no complete dataset"""
+    manifest = {
+        'format': DATASET_FORMAT,
+        'target': target,
+        'feature_columns': list(feature_columns),
+        'splits': splits,
+        **(metadata or {})
+    }
+    staging = os.path.join(directory, f"{DATASET_MANIFEST}.tmp-{os.getpid()}")
+    with open(staging, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(staging, os.path.join(directory, DATASET_MANIFEST))
+    return manifest
+
+def load_manifest(directory: str = COLUMNAR_DIR) -> Optional[Dict]:
+    """The dataset's schema header, or None if there is no complete dataset in `directory`"""
+    try:
+        with open(os.path.join(directory, DATASET_MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('format') == DATASET_FORMAT else None
+
+def load_split(split: str, directory: str = COLUMNAR_DIR, manifest: Dict = None) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    (features, target) of one split. Every column is a read-only memory map of its .npy
+    file and the DataFrame wraps them without copying.
+    """
+    manifest = manifest or load_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(f"No columnar dataset in {directory}")
+    columns = {}
+    for column in manifest['splits'][split]['columns']:
+        values = np.load(os.path.join(directory, split, f"{column['name']}.npy"), mmap_mode='r')
+        if values.dtype.str != column['dtype']:
+            raise ValueError(f"{split}/{column['name']}.npy is {values.dtype.str}, schema says {column['dtype']}")
+        columns[column['name']] = values
+    target = columns.pop(manifest['target'])
+    return pd.DataFrame({name: columns[name] for name in manifest['feature_columns']}, copy=False), target
@@ -1,128 +1,178 @@
-import numpy as np
-from sklearn.linear_model import LogisticRegression
-import pandas as pd
-import pickle
 import os
+import sys
+import json
+import hashlib
+import math
+import threading
+from datetime import datetime
+
+# numpy, pandas and scikit-learn are imported inside the methods that need them:
+# importing this module is on every Flask worker's startup path and must stay cheap.
+
+ARTIFACT_DIR = os.path.join(os.path.dirname(__file__), 'model_artifacts')
+ARTIFACT_MANIFEST = 'credit_scoring_model.json'
+TRAINING_DATA_PATH = os.path.join(os.path.dirname(__file__), 'synthetic_training_data.csv')
+NUM_FEATURES = 18
+
+# Numeric inputs in feature order: (unified key, legacy key, legacy default, offset, scale).
+# Each is normalized as clip((value - offset) / scale, 0, 1).
+NUMERIC_INPUTS = [
+    ('amt_income_total', 'annualRevenue', 0, 0, 1000000),
+    ('amt_credit', 'loanAmount', 0, 0, 2000000),
+    ('amt_annuity', 'monthly_cashflow', 0, 0, 100000), # Rough proxy
+    ('amt_goods_price', 'collateral_value', 0, 0, 2000000),
+    ('emp_length', 'yearsInBusiness', 0, 0, 40), # 40 years max
+    ('fico_score', 'creditScore', 600, 300, 850 - 300),
+    ('dti', 'debt_to_income_ratio', 0, 0, 100), # DTI can be > 100% sometimes? Cap at 100
+]
+
+class CompiledLogisticScorer:
+    """
+    A fitted binary logistic regression reduced to its coefficients.
+    Scores are computed exactly as LogisticRegression.predict_proba does
+    (X @ coef.T + intercept, then scipy's expit), so probabilities are
+    bit-identical, without sklearn's per-call validation.
+    Single rows skip scipy: its expit is 1 / (1 + exp(-x)) with the C library's
+    exp, which is what math.exp calls, so importing scipy waits for the first batch.
+    """
+
+    def __init__(self, coef, intercept, classes):
+        import numpy as np
+
+        self.coef = np.asarray(coef, dtype=float).reshape(1, -1)
+        self.coef_T = self.coef.T
+        self.intercept = np.asarray(intercept, dtype=float).reshape(1)
+        self.classes = np.asarray(classes)
+
+    @classmethod
+    def from_model(cls, model):
+        """None unless `model` is a binary linear classifier with predict_proba"""
+        coef = getattr(model, 'coef_', None)
+        if coef is None or len(getattr(model, 'classes_', [])) != 2 or not hasattr(model, 'predict_proba'):
+            return None
+        return cls(coef, model.intercept_, model.classes_)
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np
+
+        with np.load(path) as arrays:
+            return cls(arrays['coef'], arrays['intercept'], arrays['classes'])
+
+    def save(self, path):
+        import numpy as np
+
+        with open(path, 'wb') as f:
+            np.savez(f, coef=self.coef, intercept=self.intercept, classes=self.classes)
+
+    @property
+    def num_features(self):
+        return self.coef.shape[1]
+
+    def score_batch(self, X):
+        """P(classes[1]) for every row of an (n x num_features) matrix"""
+        import numpy as np
+
+        from scipy.special import expit
+
+        X = np.asarray(X, dtype=float)
+        scores = (X @ self.coef_T + self.intercept).reshape(-1)
+        return expit(scores, out=scores)
+
+    def score_one(self, features):
+        """P(classes[1]) for a single feature vector (or 1 x num_features matrix)"""
+        import numpy as np
+
+        x = np.asarray(features, dtype=float).reshape(1, -1)
+        z = float((x @ self.coef_T + self.intercept)[0, 0])
+        return 1.0 / (1.0 + math.exp(-z))
 
 class CreditScoringModel:
-    def __init__(self):
-        self.model = LogisticRegression()
+    def __init__(self, artifact_dir=ARTIFACT_DIR):
+        self.artifact_dir = artifact_dir
+        self.model = None
+        self.scorer = None
+        self.model_version = None
         self.is_trained = False
-        # Initialize with some dummy training data to ensure it works immediately
-        self._train_dummy_model()
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        """
+        Load the active model artifact (once). Called lazily by predict();
+        call it explicitly before forking workers so they share the loaded model.
+        """
+        if self.is_trained:
+            return self
+        with self._load_lock:
+            if self.is_trained:
+                return self
+            manifest = read_manifest(self.artifact_dir)
+            if manifest is not None and manifest.get('scorer_file'):
+                # Exported coefficients: no sklearn import or unpickling on the startup path
+                self.scorer = CompiledLogisticScorer.load(os.path.join(self.artifact_dir, manifest['scorer_file']))
+                self.model_version = manifest['version']
+                self.is_trained = True
+            elif manifest is not None:
+                import joblib
+                path = os.path.join(self.artifact_dir, manifest['model_file'])
+                # Coefficient arrays are memory-mapped rather than copied into each worker
+                self.model = joblib.load(path, mmap_mode='r')
+                self.scorer = CompiledLogisticScorer.from_model(self.model)
+                self.model_version = manifest['version']
+                self.is_trained = True
+            else:
+                print(f"Warning: No model artifact in {self.artifact_dir}. "
+                      f"Run `python backend/model.py train`; training in-process for now.")
+                self.model = self._train_dummy_model()
+                self.scorer = CompiledLogisticScorer.from_model(self.model)
+                self.model_version = 'untracked'
+                self.is_trained = self.model is not None
+        return self
 
-    def _train_dummy_model(self):
+    def _train_dummy_model(self, data_path=TRAINING_DATA_PATH):
+        from sklearn.linear_model import LogisticRegression
+        import pandas as pd
+
+        model = LogisticRegression()
         try:
             # Load Synthetic Data if exists
-            data_path = os.path.join(os.path.dirname(__file__), 'synthetic_training_data.csv')
-            
             if os.path.exists(data_path):
                 print(f"Loading training data from {data_path}...")
                 df = pd.read_csv(data_path)
                 
-                # Preprocess Training Data
-                X = []
-                y = []
-                
-                for _, row in df.iterrows():
-                    # Construct feature vector matching preprocess()
-                    feats = self.preprocess(row.to_dict())
-                    X.append(feats[0])
-                    # Target: 0 = Repaid (Good), 1 = Default (Bad).
-                    # Model expects: 1 = Approve (Good), 0 = Reject (Bad).
-                    # So we INVERT the target.
-                    y.append(0 if row['target'] == 1 else 1)
+                # Preprocess Training Data (one columnar pass, same features as preprocess())
+                X = encode_features(df)
+                # Target: 0 = Repaid (Good), 1 = Default (Bad).
+                # Model expects: 1 = Approve (Good), 0 = Reject (Bad).
+                # So we INVERT the target.
+                y = (df['target'] != 1).astype(int).to_numpy()
                 
-                self.model.fit(X, y)
-                self.is_trained = True
+                model.fit(X, y)
                 print(f"Model trained on {len(df)} records with Unified Schema.")
                 
             else:
                 print("Warning: Training data not found. Using fallback.")
                 # Basic fallback
-                self.model.fit([[0]*18, [1]*18], [0, 1])
-                self.is_trained = True
+                model.fit([[0]*NUM_FEATURES, [1]*NUM_FEATURES], [0, 1])
+
+            return model
                 
         except Exception as e:
             print(f"Error training model: {e}")
-            self.is_trained = False
+            return None
 
     def preprocess(self, data):
-        """
-        Features (Unified Schema - 18 features): 
-        [
-            NormIncome, NormCredit, NormAnnuity, NormGoodsPrice,
-            NormDaysEmployed, NormFICO, NormDTI, Term_60,
-            Grade_A, Grade_B, Grade_C, Grade_D, Grade_E, Grade_F,
-            Type_Cash, Type_Revolving,
-            Ownership_Own, Ownership_Rent
-        ]
-        """
-        try:
-            # 1. Parse Unified Inputs (Lending Club / Home Credit keys)
-            # Map legacy keys if present (for backward compat during migration)
-            income = float(data.get('amt_income_total') or data.get('annualRevenue', 0))
-            credit = float(data.get('amt_credit') or data.get('loanAmount', 0))
-            annuity = float(data.get('amt_annuity') or data.get('monthly_cashflow', 0)) # Rough proxy
-            goods_price = float(data.get('amt_goods_price') or data.get('collateral_value', 0))
-            
-            days_employed = float(data.get('emp_length') or data.get('yearsInBusiness', 0))
-            fico = float(data.get('fico_score') or data.get('creditScore', 600))
-            dti = float(data.get('dti') or data.get('debt_to_income_ratio', 0))
-            
-            term = data.get('term', '36 months')
-            grade = data.get('grade', 'C') # Default C
-            contract_type = data.get('name_contract_type', 'Cash loans')
-            ownership = data.get('home_ownership', 'RENT')
-
-            # 2. Normalization
-            norm_income = np.clip(income / 1000000, 0, 1)
-            norm_credit = np.clip(credit / 2000000, 0, 1)
-            norm_annuity = np.clip(annuity / 100000, 0, 1)
-            norm_goods = np.clip(goods_price / 2000000, 0, 1)
-            
-            norm_days = np.clip(days_employed / 40, 0, 1) # 40 years max
-            norm_fico = np.clip((fico - 300) / (850 - 300), 0, 1)
-            norm_dti = np.clip(dti / 100, 0, 1) # DTI can be > 100% sometimes? Cap at 100
-
-            # 3. Encoding
-            term_60 = 1 if '60' in str(term) else 0
-            
-            # Grade One-Hot
-            g_a = 1 if grade == 'A' else 0
-            g_b = 1 if grade == 'B' else 0
-            g_c = 1 if grade == 'C' else 0
-            g_d = 1 if grade == 'D' else 0
-            g_e = 1 if grade == 'E' else 0
-            g_f = 1 if grade == 'F' or grade == 'G' else 0
-            
-            # Contract Type
-            t_cash = 1 if contract_type == 'Cash loans' else 0
-            t_rev = 1 if contract_type == 'Revolving loans' else 0
-            
-            # Ownership
-            o_own = 1 if ownership == 'OWN' or ownership == 'MORTGAGE' else 0
-            o_rent = 1 if ownership == 'RENT' else 0
-
-            features = [
-                norm_income, norm_credit, norm_annuity, norm_goods,
-                norm_days, norm_fico, norm_dti, term_60,
-                g_a, g_b, g_c, g_d, g_e, g_f,
-                t_cash, t_rev,
-                o_own, o_rent
-            ]
-            
-            return np.array([features])
-            
-        except Exception as e:
-            print(f"Preprocessing Error: {e}")
-            return np.zeros((1, 18))
+        """Feature vector (1 x 18) for a single record; see encode_features()"""
+        return encode_features([data])
 
     def predict(self, data):
+        self.load()
         features = self.preprocess(data)
         
         # Get probability of class 1 (Approval)
-        if hasattr(self.model, "predict_proba"):
+        if self.scorer is not None:
+            probability = self.scorer.score_one(features)
+        elif hasattr(self.model, "predict_proba"):
             probability = self.model.predict_proba(features)[0][1]
         else:
             probability = 0.5 # Fallback
@@ -147,5 +197,179 @@ class CreditScoringModel:
             "insights": insights
         }
 
-# Singleton instance
+    def predict_proba_batch(self, data):
+        """Approval probability for many records (DataFrame or list of dicts) in one pass"""
+        self.load()
+        features = encode_features(data)
+        if self.scorer is not None:
+            return self.scorer.score_batch(features)
+        return self.model.predict_proba(features)[:, 1]
+
+def _column(data, key, default):
+    """One input column as an array; `default` fills a missing key like dict.get()"""
+    import numpy as np
+
+    if hasattr(data, 'columns'):
+        if key in data.columns:
+            return data[key].to_numpy()
+        return np.full(len(data), default, dtype=object if default is None else None)
+    # Filled element by element so a list or array value stays one element (np.array would nest it)
+    column = np.empty(len(data), dtype=object)
+    for i, record in enumerate(data):
+        column[i] = record.get(key, default)
+    return column
+
+def _truthy(values):
+    """Elementwise `bool(value)`, i.e. where `value or fallback` keeps the value"""
+    import numpy as np
+
+    if values.dtype == bool:
+        return values
+    if values.dtype.kind in 'iuf':
+        return values != 0  # NaN is truthy, as in Python
+    try:
+        return values.astype(bool)
+    except (TypeError, ValueError):
+        # A value without a truth value (e.g. a multi-element array) is kept, so float() rejects it
+        keep = np.ones(len(values), dtype=bool)
+        for i, value in enumerate(values):
+            try:
+                keep[i] = bool(value)
+            except Exception:
+                pass
+        return keep
+
+def _to_float(values):
+    """Elementwise float(); returns the floats and a mask of values that could not be converted"""
+    import numpy as np
+
+    failed = np.zeros(len(values), dtype=bool)
+    try:
+        return values.astype(float), failed
+    except Exception:
+        out = np.zeros(len(values))
+        for i, value in enumerate(values):
+            try:
+                out[i] = float(value)
+            except Exception:  # Anything preprocess() used to catch: the record encodes as zeros
+                failed[i] = True
+        return out, failed
+
+def encode_features(data):
+    """
+    Encode many records into the (n x 18) model matrix in one columnar pass.
+    `data` is a DataFrame or a list of dicts using the unified (Lending Club /
+    Home Credit) keys, with the legacy frontend keys as fallbacks.
+
+    Features (Unified Schema - 18 features):
+    [
+        NormIncome, NormCredit, NormAnnuity, NormGoodsPrice,
+        NormDaysEmployed, NormFICO, NormDTI, Term_60,
+        Grade_A, Grade_B, Grade_C, Grade_D, Grade_E, Grade_F,
+        Type_Cash, Type_Revolving,
+        Ownership_Own, Ownership_Rent
+    ]
+    Records with unparseable numbers encode as all zeros.
+    """
+    import numpy as np
+
+    n = len(data)
+    X = np.empty((n, NUM_FEATURES))
+    failed = np.zeros(n, dtype=bool)
+
+    # 1. Parse + normalize numeric inputs; a falsy unified value falls back to the legacy key
+    for j, (key, legacy_key, default, offset, scale) in enumerate(NUMERIC_INPUTS):
+        values = _column(data, key, None)
+        keep = _truthy(values)
+        use_legacy = ~keep
+        raw = np.empty(n)
+        raw[keep], failed_keep = _to_float(values[keep])
+        raw[use_legacy], failed_legacy = _to_float(_column(data, legacy_key, default)[use_legacy])
+        failed[keep] |= failed_keep
+        failed[use_legacy] |= failed_legacy
+        X[:, j] = np.clip((raw - offset) / scale, 0, 1)
+
+    # 2. Encoding
+    # String columns are compared as fixed-width numpy strings, not Python objects
+    term = _column(data, 'term', '36 months').astype(str)
+    X[:, 7] = np.char.find(term, '60') >= 0
+
+    # Grade One-Hot (G folds into F)
+    grade = _column(data, 'grade', 'C').astype(str) # Default C
+    for j, letter in enumerate('ABCDE'):
+        X[:, 8 + j] = grade == letter
+    X[:, 13] = (grade == 'F') | (grade == 'G')
+
+    # Contract Type
+    contract_type = _column(data, 'name_contract_type', 'Cash loans').astype(str)
+    X[:, 14] = contract_type == 'Cash loans'
+    X[:, 15] = contract_type == 'Revolving loans'
+
+    # Ownership
+    ownership = _column(data, 'home_ownership', 'RENT').astype(str)
+    X[:, 16] = (ownership == 'OWN') | (ownership == 'MORTGAGE')
+    X[:, 17] = ownership == 'RENT'
+
+    if failed.any():
+        print(f"Preprocessing Error: {int(failed.sum())} record(s) with non-numeric inputs encoded as zeros")
+        X[failed] = 0
+    return X
+
+def read_manifest(artifact_dir=ARTIFACT_DIR):
+    """Metadata of the active artifact, or None if no model has been built"""
+    path = os.path.join(artifact_dir, ARTIFACT_MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def build_artifact(data_path=TRAINING_DATA_PATH, artifact_dir=ARTIFACT_DIR):
+    """
+    Offline training command: fit the model and publish a versioned artifact.
+    The version is derived from the training data, so rebuilding on unchanged
+    data reproduces the same file; the manifest is swapped in atomically.
+    """
+    import joblib
+    import sklearn
+
+    with open(data_path, 'rb') as f:
+        data_hash = hashlib.sha256(f.read()).hexdigest()
+    version = data_hash[:12]
+
+    model = CreditScoringModel(artifact_dir)._train_dummy_model(data_path)
+    if model is None:
+        raise RuntimeError(f"Training failed on {data_path}")
+
+    os.makedirs(artifact_dir, exist_ok=True)
+    model_file = f'credit_scoring_model-{version}.joblib'
+    joblib.dump(model, os.path.join(artifact_dir, model_file))
+    # Coefficients exported for the compiled scoring path
+    scorer_file = f'credit_scoring_model-{version}.npz'
+    CompiledLogisticScorer.from_model(model).save(os.path.join(artifact_dir, scorer_file))
+
+    manifest = {
+        'version': version,
+        'model_file': model_file,
+        'scorer_file': scorer_file,
+        'num_features': NUM_FEATURES,
+        'training_data': os.path.basename(data_path),
+        'training_data_sha256': data_hash,
+        'sklearn_version': sklearn.__version__,
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z'
+    }
+    tmp_path = os.path.join(artifact_dir, ARTIFACT_MANIFEST + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp_path, os.path.join(artifact_dir, ARTIFACT_MANIFEST))
+
+    print(f"✅ Model artifact {version} written to {artifact_dir}")
+    return manifest
+
+# Singleton instance (loads its artifact on first use)
 ml_service = CreditScoringModel()
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ['train']:
+        print("Usage: python backend/model.py train [training_data.csv]")
+        sys.exit(1)
+    build_artifact(*sys.argv[2:3])
@@ -0,0 +1,70 @@
+"""
+Sharded, deterministic synthetic data generation
+
+N records are cut into fixed-size shards. Shard i draws from the i-th stream spawned
+from SeedSequence(seed), so its rows depend only on (seed, shard size, i): never on
+how many workers ran or in which order they finished. Generators plug in a block
+function `generate_block(rng, num_records, first_id) -> DataFrame`.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+SHARD_RECORDS = 1_000_000
+MANIFEST = '_manifest.json'
+
+def shard_plan(num_records, shard_records=SHARD_RECORDS):
+    """(shard index, first row offset, row count) for every shard"""
+    return [(i, start, min(shard_records, num_records - start))
+            for i, start in enumerate(range(0, num_records, shard_records))]
+
+def iter_shards(generate_block, num_records, seed=42, shard_records=SHARD_RECORDS):
+    """Generate the shards one after another in this process (single-file output)"""
+    plan = shard_plan(num_records, shard_records)
+    streams = np.random.SeedSequence(seed).spawn(len(plan))
+    for index, start, count in plan:
+        yield generate_block(np.random.default_rng(streams[index]), count, first_id=start + 1)
+
+def _write_shard(generate_block, stream, index, start, count, output_dir, target):
+    df = generate_block(np.random.default_rng(stream), count, first_id=start + 1)
+    name = f'part-{index:05d}.csv'
+    df.to_csv(os.path.join(output_dir, name), index=False)
+    return {
+        'file': name,
+        'first_id': start + 1,
+        'rows': len(df),
+        'positives': int(df[target].sum()) if target else None
+    }
+
+def write_partitioned(generate_block, num_records, output_dir, seed=42, shard_records=SHARD_RECORDS,
+                      workers=None, target=None):
+    """
+    Generate every shard on a process pool, each worker writing its shard to
+    output_dir/part-XXXXX.csv. _manifest.json (parts, row counts, seed) is written last.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(output_dir):
+        if name == MANIFEST or (name.startswith('part-') and name.endswith('.csv')):
+            os.remove(os.path.join(output_dir, name))
+
+    plan = shard_plan(num_records, shard_records)
+    streams = np.random.SeedSequence(seed).spawn(len(plan))
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = [pool.submit(_write_shard, generate_block, streams[index], index, start, count, output_dir, target)
+                   for index, start, count in plan]
+        parts = [future.result() for future in futures]
+
+    manifest = {
+        'num_records': num_records,
+        'seed': seed,
+        'shard_records': shard_records,
+        'parts': parts
+    }
+    if target:
+        manifest['positive_rate'] = sum(p['positives'] for p in parts) / max(num_records, 1)
+    with open(os.path.join(output_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
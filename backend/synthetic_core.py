@@ -0,0 +1,133 @@
+"""
+Columnar generator core shared by generate_synthetic_data.py (unified LC/HC schema)
+and the top-level generate_data.py (business schema)
+
+Each schema is a block function `(rng, num_records, first_id) -> DataFrame` built
+from whole-column draws on a numpy Generator, so both plug into sharded_generation.
+"""
+
+import numpy as np
+import pandas as pd
+
+BUSINESS_TYPES = ['Manufacturing', 'Trading', 'Services']
+REPAYMENT_HISTORY = (['Good', 'Average', 'Poor'], [0.7, 0.2, 0.1])
+
+# Lending Club style grades by FICO: lower bound (exclusive) of A..E, F below
+GRADES = np.array(['A', 'B', 'C', 'D', 'E', 'F'])
+GRADE_FLOORS = [750, 700, 660, 620, 580]
+GRADE_BASE_RATES = np.array([7.0, 10.0, 13.0, 17.0, 20.0, 25.0])
+GRADE_RISK_WEIGHTS = np.array([0, 1, 3, 5, 7, 10])
+
+def business_profile(rng, n):
+    """Columns both schemas carry for B2B context"""
+    return {
+        'business_type': rng.choice(BUSINESS_TYPES, size=n),
+        'repayment_history': rng.choice(REPAYMENT_HISTORY[0], p=REPAYMENT_HISTORY[1], size=n),
+    }
+
+def grade_codes(fico):
+    """Index into GRADES: A if fico > 750, B if > 700, ... F otherwise"""
+    return np.searchsorted(-np.asarray(GRADE_FLOORS), -np.asarray(fico), side='right')
+
+def annuity(principal, months, rate=0.10):
+    """Simplified PMT approximation: principal plus flat interest, spread over the term"""
+    return principal * (1 + rate) / months
+
+def unified_records(rng, num_records, first_id=1):
+    """Unified schema (Lending Club / Home Credit fields plus business enrichment)"""
+    n = num_records
+
+    # --- 1. Borrower Demographics (Shared LC/HC) ---
+    # AMT_INCOME_TOTAL (Annual Revenue proxy), min 25k
+    base_income = rng.lognormal(mean=11, sigma=1.5, size=n)
+    amt_income_total = np.maximum(25000, np.round(base_income * (1 + rng.integers(0, 25, size=n) * 0.05), 2))
+
+    # DAYS_EMPLOYED / emp_length (Years in Business proxy)
+    years_in_business = rng.integers(0, 30, size=n)
+    home_ownership = rng.choice(['OWN', 'MORTGAGE', 'RENT'], p=[0.5, 0.3, 0.2], size=n)
+
+    # --- 2. Loan Details (Shared LC/HC) ---
+    amt_credit = np.round(amt_income_total * rng.uniform(0.1, 2.0, size=n), 2)
+    term = rng.choice([' 36 months', ' 60 months'], p=[0.7, 0.3], size=n)
+    months = np.where(term == ' 36 months', 36, 60)
+    amt_annuity = np.round(annuity(amt_credit, months), 2)
+
+    # AMT_GOODS_PRICE (Collateral Value proxy), closely correlated with credit amount
+    amt_goods_price = np.round(amt_credit * rng.uniform(0.0, 1.5, size=n), 2)
+    name_contract_type = rng.choice(['Cash loans', 'Revolving loans'], p=[0.9, 0.1], size=n)
+
+    # --- 3. Risk Metrics (Lending Club) ---
+    fico_score = np.clip(rng.normal(700, 100, size=n).astype(int), 300, 850)
+    dti = np.round(rng.uniform(0, 40, size=n), 2)  # Typical range 0-40%
+    grade = grade_codes(fico_score)
+    int_rate = np.round(GRADE_BASE_RATES[grade] + rng.uniform(-1, 1, size=n), 2)
+
+    # --- 4. Custom Business Features (Project Specific) ---
+    operating_expenses = np.round((amt_income_total / 12) * 0.7, 2)
+    monthly_cashflow = np.round((amt_income_total / 12) - operating_expenses, 2)
+    profile = business_profile(rng, n)
+
+    # --- 5. Target Logic ---
+    risk_score = GRADE_RISK_WEIGHTS[grade].astype(float)
+    risk_score += 3 * (dti > 30)
+    risk_score += 2 * (amt_goods_price < amt_credit)  # Under-collateralized
+    risk_score += 5 * (profile['repayment_history'] == 'Poor')
+    risk_score += 2 * ((name_contract_type == 'Cash loans') & (years_in_business < 2))
+    risk_score += rng.normal(0, 2, size=n)  # Random noise
+
+    return pd.DataFrame({
+        # Identifiers
+        'sk_id_curr': np.arange(100000 + first_id - 1, 100000 + first_id - 1 + n),
+
+        # Application / LC Features
+        'amt_income_total': amt_income_total,
+        'amt_credit': amt_credit,
+        'amt_annuity': amt_annuity,
+        'amt_goods_price': amt_goods_price,
+        'name_contract_type': name_contract_type,
+        'term': term,
+        'int_rate': int_rate,
+        'grade': GRADES[grade],
+        'fico_score': fico_score,
+        'dti': dti,
+        'emp_length': years_in_business,
+        'home_ownership': home_ownership,
+
+        # Custom / Enrichment
+        'business_type': profile['business_type'],
+        'monthly_cashflow': monthly_cashflow,
+        'operating_expenses': operating_expenses,
+        'repayment_history': profile['repayment_history'],
+
+        # Target (1 = Default)
+        'target': (risk_score > 10).astype(int)
+    })
+
+def business_records(rng, num_records, first_id=1):
+    """Business schema (dataset/business_credit_data.csv)"""
+    n = num_records
+    profile = business_profile(rng, n)
+    years_in_operation = rng.integers(1, 20, size=n)
+    annual_revenue = rng.integers(50000, 5000000, size=n)
+    credit_score = rng.integers(300, 850, size=n)
+    debt_to_income_ratio = np.round(rng.uniform(0.1, 0.8, size=n), 2)
+
+    # Risk score: >= 5 defaults, 3-4 defaults with probability 0.3, below that repays
+    score = (3 * (credit_score < 600) + 2 * (debt_to_income_ratio > 0.5)
+             + 4 * (profile['repayment_history'] == 'Poor') + 1 * (years_in_operation < 2))
+    default_flag = np.where(score >= 5, 1, np.where(score >= 3, (rng.random(n) < 0.3).astype(int), 0))
+
+    return pd.DataFrame({
+        'applicant_id': [f'APP-{i:04d}' for i in range(first_id, first_id + n)],
+        'business_type': profile['business_type'],
+        'years_in_operation': years_in_operation,
+        'annual_revenue': annual_revenue,
+        'monthly_cashflow': (annual_revenue / 12 * rng.uniform(0.1, 0.4, size=n)).astype(int),
+        'loan_amount_requested': rng.integers(10000, 1000000, size=n),
+        'credit_score': credit_score,
+        'existing_loans': rng.choice([0, 1, 2, 3], p=[0.4, 0.3, 0.2, 0.1], size=n),
+        'collateral_value': rng.integers(0, 500000, size=n),
+        'repayment_history': profile['repayment_history'],
+        'debt_to_income_ratio': debt_to_income_ratio,
+        'default_flag': default_flag
+    })
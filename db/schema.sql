@@ -21,4 +21,7 @@ CREATE TABLE IF NOT EXISTS applications (
 
 -- Indices
 CREATE INDEX IF NOT EXISTS idx_applications_user_id ON applications(user_id);
+-- Keyset pagination of the admin listing: newest first by (created_at, id), optionally per status
+CREATE INDEX IF NOT EXISTS idx_applications_created_at_id ON applications(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_applications_status_created_at_id ON applications(status, created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
@@ -1,4 +1,6 @@
 const API_BASE_URL = window.API_CONFIG ? window.API_CONFIG.BASE_URL : '/api';
+// Rows per admin listing request (the server caps it at ADMIN_PAGE_SIZE_MAX = 500)
+const ADMIN_PAGE_SIZE = 500;
 
 document.addEventListener('DOMContentLoaded', async () => {
     // Basic check if user is logged in (client-side only for now)
@@ -27,17 +29,24 @@ async function loadAllApplications() {
     grid.innerHTML = '<p style="color:white;">Loading applications...</p>';
 
     try {
-        // Fetch from new Admin Endpoint
+        // Fetch from new Admin Endpoint, following X-Next-Cursor until the last page
         // Note: For demo simplicity, we use the same auth token. In prod, check permissions.
-        const response = await fetch(`${API_BASE_URL}/admin/applications`, {
-            headers: {
-                'Authorization': `Bearer ${localStorage.getItem('token')}`
-            }
-        });
-
-        if (!response.ok) throw new Error('Failed to load applications');
-
-        const apps = await response.json();
+        const apps = [];
+        let cursor = null;
+        do {
+            const params = new URLSearchParams({ limit: ADMIN_PAGE_SIZE });
+            if (cursor) params.set('cursor', cursor);
+            const response = await fetch(`${API_BASE_URL}/admin/applications?${params}`, {
+                headers: {
+                    'Authorization': `Bearer ${localStorage.getItem('token')}`
+                }
+            });
+
+            if (!response.ok) throw new Error('Failed to load applications');
+
+            apps.push(...await response.json());
+            cursor = response.headers.get('X-Next-Cursor');
+        } while (cursor);
 
         if (apps.length === 0) {
             grid.innerHTML = '<p style="color: var(--color-text-secondary);">No applications found in the system.</p>';